@@ -0,0 +1,157 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db
+from models import Category, Product
+import menu_events
+
+# Operações administrativas em lote sobre os produtos e a ordem do cardápio.
+# Em vez de um SELECT + commit por produto (/admin/toggle), o lote inteiro vira
+# um único UPDATE numa transação: o cache do menu é invalidado uma vez e os
+# eventos SSE saem juntos depois do commit.
+
+router = APIRouter(prefix="/admin")
+
+BULK_FIELDS = ("is_available", "price")
+
+
+class ProductChange(BaseModel):
+    id: int
+    is_available: Optional[bool] = None
+    price: Optional[float] = Field(default=None, ge=0)
+
+
+class ProductFilter(BaseModel):
+    sub_category: Optional[str] = None
+    category_id: Optional[int] = None
+
+
+class ProductValues(BaseModel):
+    is_available: Optional[bool] = None
+    price: Optional[float] = Field(default=None, ge=0)
+
+
+class BulkProductUpdate(BaseModel):
+    # Ou uma lista de mudanças por id, ou um filtro + valores para todos os que casarem
+    changes: List[ProductChange] = Field(default_factory=list, max_length=1000)
+    filter: Optional[ProductFilter] = None
+    set: Optional[ProductValues] = None
+
+
+def requested_values(payload: BulkProductUpdate):
+    # -> (condições do WHERE, função id -> valores desejados, ids pedidos)
+    if payload.changes and payload.filter is not None:
+        raise HTTPException(status_code=400, detail="Use 'changes' ou 'filter', não os dois")
+
+    if payload.changes:
+        wanted = {}
+        for change in payload.changes:
+            wanted.setdefault(change.id, {}).update(change.model_dump(include=set(BULK_FIELDS), exclude_none=True))
+        return [Product.id.in_(wanted)], lambda product_id: wanted[product_id], list(wanted)
+
+    if payload.filter is None:
+        raise HTTPException(status_code=400, detail="Informe 'changes' ou 'filter'")
+    conditions = [getattr(Product, name) == value
+                  for name, value in payload.filter.model_dump(exclude_none=True).items()]
+    if not conditions:
+        raise HTTPException(status_code=400, detail="Filtro vazio")
+    values = payload.set.model_dump(exclude_none=True) if payload.set else {}
+    if not values:
+        raise HTTPException(status_code=400, detail="Informe os valores em 'set'")
+    return conditions, lambda product_id: values, None
+
+
+def column_value(field, new_values, row_count):
+    # O mesmo valor para todas as linhas do UPDATE vira constante; o resto vira
+    # CASE id WHEN ... THEN ... ELSE <valor atual>
+    distinct = set(new_values.values())
+    if len(new_values) == row_count and len(distinct) == 1:
+        return distinct.pop()
+    return case(new_values, value=Product.id, else_=getattr(Product, field))
+
+
+@router.patch("/products")
+async def bulk_update_products(payload: BulkProductUpdate, db: AsyncSession = Depends(get_db)):
+    conditions, values_for, requested_ids = requested_values(payload)
+
+    # Estado atual (com lock no Postgres) para aplicar só o que muda e reportar antes/depois
+    rows = (await db.execute(
+        select(Product.id, Product.name, Product.is_available, Product.price)
+        .where(*conditions)
+        .with_for_update()
+    )).all()
+
+    changed = []
+    new_by_field = {field: {} for field in BULK_FIELDS}
+    for row in rows:
+        before = {"is_available": bool(row.is_available), "price": row.price}
+        after = {**before, **values_for(row.id)}
+        if after == before:
+            continue
+        for field in BULK_FIELDS:
+            if after[field] != before[field]:
+                new_by_field[field][row.id] = after[field]
+        changed.append({"id": row.id, "name": row.name, "before": before, "after": after})
+
+    if changed:
+        values = {field: column_value(field, new, len(changed)) for field, new in new_by_field.items() if new}
+        await db.execute(
+            update(Product)
+            .where(Product.id.in_([c["id"] for c in changed]))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        for c in changed:
+            menu_events.queue_product_event(db.sync_session, {"id": c["id"], **c["after"]})
+    await db.commit()  # um commit: uma invalidação do cache do cardápio
+
+    found = {row.id for row in rows}
+    return {
+        "matched": len(rows),
+        "changed": changed,
+        "unchanged": len(rows) - len(changed),
+        "not_found": [i for i in requested_ids if i not in found] if requested_ids is not None else [],
+    }
+
+
+class Reorder(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=1000)
+
+
+async def apply_display_order(db: AsyncSession, model, ids, *conditions):
+    # Reordena num único UPDATE com CASE; ids omitidos vão para o fim, na ordem atual
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Ids repetidos")
+    current = (await db.scalars(
+        select(model.id).where(*conditions).order_by(model.display_order, model.id)
+    )).all()
+    unknown = set(ids) - set(current)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Ids inválidos: {', '.join(map(str, sorted(unknown)))}")
+
+    order = list(ids) + [i for i in current if i not in set(ids)]
+    positions = {item_id: position for position, item_id in enumerate(order, start=1)}
+    await db.execute(
+        update(model)
+        .where(model.id.in_(order))
+        .values(display_order=case(positions, value=model.id))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()  # invalida o cache do cardápio uma vez
+    return {"order": order}
+
+
+@router.put("/categories/order")
+async def reorder_categories(payload: Reorder, db: AsyncSession = Depends(get_db)):
+    return await apply_display_order(db, Category, payload.ids)
+
+
+@router.put("/categories/{category_id}/products/order")
+async def reorder_products(category_id: int, payload: Reorder, db: AsyncSession = Depends(get_db)):
+    if await db.get(Category, category_id) is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return await apply_display_order(db, Product, payload.ids, Product.category_id == category_id)
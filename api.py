@@ -0,0 +1,114 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db
+from models import Category, Product
+import http_cache
+import menu_cache
+import menu_data
+import metrics
+import search
+
+# API JSON somente leitura do cardápio (quiosques / PDV).
+# As respostas são serializadas uma vez por versão do menu e combinação de
+# filtros, e servidas do menu_cache com ETag, 304 e compressão.
+
+router = APIRouter(prefix="/api")
+
+
+def parse_fields(fields: Optional[str]):
+    if not fields:
+        return menu_data.PRODUCT_FIELDS
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(menu_data.PRODUCT_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Campos inválidos: {', '.join(sorted(unknown))}")
+    # "id" sempre presente; ordem estável para a chave do cache
+    requested.add("id")
+    return tuple(f for f in menu_data.PRODUCT_FIELDS if f in requested)
+
+
+def to_json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def serialize_products(products, fields):
+    return [menu_data.product_to_dict(p, fields) for p in products]
+
+
+def category_products_query(category_id, available=None):
+    # Filtro de disponibilidade no banco, pelo índice (category_id, is_available, sub_category)
+    query = select(Product).where(Product.category_id == category_id)
+    if available is not None:
+        query = query.where(Product.is_available == available)
+    return query.order_by(Product.display_order, Product.id)
+
+
+async def cached_json(request: Request, key: str, build):
+    version = menu_cache.current_version()
+    page = menu_cache.get_page(version, key)
+    if page is None:
+        data = await build()
+        with metrics.phase("serialize"):
+            body = to_json(data)
+        page = menu_cache.store_page(version, body, key)
+    return http_cache.cached_response(request, page, Response, media_type="application/json")
+
+
+@router.get("/menu")
+async def get_menu(request: Request, fields: Optional[str] = None, available: Optional[bool] = None,
+                   db: AsyncSession = Depends(get_db)):
+    product_fields = parse_fields(fields)
+
+    async def build():
+        return {
+            "categories": [
+                {
+                    "id": item["category"].id,
+                    "name": item["category"].name,
+                    "products": serialize_products(item["products"], product_fields),
+                }
+                for item in await menu_data.load_menu(db, available)
+            ]
+        }
+
+    return await cached_json(request, f"api:menu:{','.join(product_fields)}:{available}", build)
+
+
+@router.get("/categories/{category_id}/products")
+async def get_category_products(request: Request, category_id: int, fields: Optional[str] = None,
+                                available: Optional[bool] = None, db: AsyncSession = Depends(get_db)):
+    product_fields = parse_fields(fields)
+
+    async def build():
+        category = await db.get(Category, category_id)
+        if not category:
+            raise HTTPException(status_code=404, detail="Category not found")
+        products = (await db.scalars(category_products_query(category_id, available))).all()
+        return {
+            "id": category.id,
+            "name": category.name,
+            "products": serialize_products(products, product_fields),
+        }
+
+    return await cached_json(request, f"api:category:{category_id}:{','.join(product_fields)}:{available}", build)
+
+
+@router.get("/search")
+async def search_products(q: str = Query(min_length=1, max_length=100), limit: int = Query(default=20, ge=1, le=100),
+                          fields: Optional[str] = None, available: Optional[bool] = None,
+                          db: AsyncSession = Depends(get_db)):
+    # Índice em memória (search.py): só vai ao banco quando o menu mudou em massa
+    product_fields = parse_fields(fields)
+    await search.ensure_current(db)
+    results = search.index.search(q, limit, available)
+    body = {
+        "query": q,
+        "results": [{**{f: doc[f] for f in product_fields}, "score": round(score, 3)} for doc, score in results],
+    }
+    with metrics.phase("serialize"):
+        return Response(to_json(body), media_type="application/json")
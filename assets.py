@@ -0,0 +1,128 @@
+import hashlib
+import os
+import re
+from urllib.parse import quote
+
+from compression import CompressedStaticFiles
+
+# Servidor de assets com URLs versionadas pelo conteúdo.
+# No startup calculamos o hash de cada arquivo publicável (images/, static/ e o bundle JS)
+# e expomos "/assets/<caminho>.<hash>.<ext>" com cache imutável de 1 ano.
+# O mount legado "/static" serve apenas arquivos dessas mesmas origens (nada de
+# campeao.db ou *.py da raiz), inclusive os criados depois do startup (fotos
+# novas da ingestão de imagens), que ainda não estão no manifesto.
+
+ASSET_SOURCES = ("images", "static", "campeao.js")
+ASSETS_PREFIX = "/assets/"
+STATIC_PREFIX = "/static/"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Arquivos que já têm hash no nome (ex.: images/variants/carne-320.6edbbbaba6.avif)
+HASHED_NAME = re.compile(r"\.[0-9a-f]{10}\.[A-Za-z0-9]+$")
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:10]
+
+
+def hashed_name(rel_path, file_hash):
+    if HASHED_NAME.search(rel_path):
+        return rel_path
+    stem, ext = os.path.splitext(rel_path)
+    return f"{stem}.{file_hash}{ext}"
+
+
+class AssetManifest:
+    def __init__(self, root=".", sources=ASSET_SOURCES):
+        self.root = root
+        self.sources = sources
+        self.urls = {}    # caminho lógico ("images/x.png") -> URL pública versionada
+        self.hashed = {}  # caminho versionado -> caminho lógico
+
+    def _iter_files(self):
+        for source in self.sources:
+            full = os.path.join(self.root, source)
+            if os.path.isfile(full):
+                yield source
+                continue
+            for dirpath, _, filenames in os.walk(full):
+                for filename in filenames:
+                    rel = os.path.relpath(os.path.join(dirpath, filename), self.root)
+                    yield rel.replace(os.sep, "/")
+
+    def scan(self):
+        urls, hashed = {}, {}
+        for rel in self._iter_files():
+            name = hashed_name(rel, content_hash(os.path.join(self.root, rel)))
+            urls[rel] = ASSETS_PREFIX + quote(name)
+            hashed[name] = rel
+        self.urls, self.hashed = urls, hashed
+        return self
+
+    def url(self, path):
+        # Aceita "/static/images/x.png" (formato de Product.image_url) ou "images/x.png"
+        if not path:
+            return path
+        rel = path[len(STATIC_PREFIX):] if path.startswith(STATIC_PREFIX) else path.lstrip("/")
+        return self.urls.get(rel, path)
+
+    def __len__(self):
+        return len(self.urls)
+
+
+class AssetFiles(CompressedStaticFiles):
+    # Com hashed=True serve somente arquivos do manifesto, pelas URLs versionadas
+    # (cache imutável); com hashed=False pelos caminhos originais, de qualquer
+    # arquivo dentro das origens do manifesto.
+
+    def __init__(self, manifest: AssetManifest, hashed: bool = True):
+        super().__init__(directory=manifest.root)
+        self.manifest = manifest
+        self.hashed = hashed
+
+    def lookup_path(self, path):
+        rel = path.replace(os.sep, "/")
+        if self.hashed:
+            rel = self.manifest.hashed.get(rel)
+        elif rel not in self.manifest.urls:
+            return self._lookup_source(rel)
+        if rel is None:
+            return "", None
+
+        full_path = os.path.join(self.directory, rel)
+        try:
+            return full_path, os.stat(full_path)
+        except FileNotFoundError:
+            return "", None
+
+    def _lookup_source(self, rel):
+        # Fora do manifesto: só dentro de uma das origens, sem arquivos ocultos e sem
+        # sair dela por ".." ou symlink (como o StaticFiles, mas por origem)
+        parts = rel.split("/")
+        if any(part in ("", ".", "..") or part.startswith(".") for part in parts):
+            return "", None
+        for source in self.manifest.sources:
+            if rel != source and not rel.startswith(source + "/"):
+                continue
+            base = os.path.realpath(os.path.join(self.directory, source))
+            full_path = os.path.realpath(os.path.join(self.directory, rel))
+            if rel != source and os.path.commonpath([full_path, base]) != base:
+                return "", None
+            try:
+                return full_path, os.stat(full_path)
+            except (FileNotFoundError, NotADirectoryError):
+                return "", None
+        return "", None
+
+    def precompress_all(self):
+        for name in (self.manifest.hashed if self.hashed else self.manifest.urls):
+            self.precompress(name)
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = IMMUTABLE if self.hashed else "no-cache"
+        return response
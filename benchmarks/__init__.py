@@ -0,0 +1,5 @@
+# Benchmarks do app.
+#   python -m benchmarks.load ...   carga nos endpoints com catálogo sintético (JSON com p50/p95/p99)
+#   python -m benchmarks.seed ...   só gera o banco sintético
+# Os bench_*.py comparam implementações específicas (python benchmarks/bench_x.py);
+# latency_proxy.py atrasa a conexão com o banco para simular rede.
@@ -0,0 +1,88 @@
+import asyncio
+import sys
+import time
+sys.path.append('.')
+
+import compression
+from main import app, startup_db_client
+
+# Benchmark: bytes trafegados e CPU por requisição, sem compressão (comportamento
+# antigo) vs. gzip/brotli pré-calculados vs. compressão a cada requisição.
+# Chama o app ASGI diretamente, para medir só o custo do servidor.
+# Uso: python benchmarks/bench_compression.py [requisições]
+
+PATHS = ["/", "/static/campeao.js"]
+
+
+async def asgi_get(path, headers):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def measure(path, accept_encoding, n):
+    headers = {"accept-encoding": accept_encoding}
+    body = await asgi_get(path, headers)  # aquece caches
+
+    start = time.process_time()
+    for _ in range(n):
+        await asgi_get(path, headers)
+    cpu_us = (time.process_time() - start) / n * 1e6
+    return body, cpu_us
+
+
+def measure_per_request_compression(body, encoding, n):
+    start = time.process_time()
+    for _ in range(n):
+        compression.compress(body, encoding)
+    return (time.process_time() - start) / n * 1e6
+
+
+async def run(n):
+    await startup_db_client()
+    encodings = ["identity"] + list(compression.supported_encodings())
+
+    print(f"{'rota':<22}{'encoding':<12}{'bytes':>10}{'economia':>10}{'CPU/req (us)':>15}")
+    for path in PATHS:
+        plain, baseline_cpu = await measure(path, "identity", n)
+        for accept_encoding in encodings:
+            body, cpu_us = await measure(path, accept_encoding, n)
+            saved = 100 * (1 - len(body) / len(plain))
+            print(f"{path:<22}{accept_encoding:<12}{len(body):>10}{saved:>9.1f}%{cpu_us:>15.1f}")
+
+        # Quanto custaria comprimir a cada requisição (ex.: GZipMiddleware)
+        for encoding in compression.supported_encodings():
+            extra = measure_per_request_compression(plain, encoding, max(n // 10, 1))
+            print(f"{path:<22}{encoding + '*':<12}{'':>10}{'':>10}{baseline_cpu + extra:>15.1f}")
+    print("* estimativa com compressão a cada requisição, em vez de uma vez por versão")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    asyncio.run(run(n))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import asyncio
+import statistics
+import sys
+import time
+sys.path.append('.')
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import menu_data
+from database import SessionLocal, engine, get_db
+from models import Category, Product
+
+# Benchmark: consultas do cardápio com a Session síncrona dentro de rotas async
+# (comportamento antigo, bloqueia o event loop) vs. AsyncSession (aiosqlite/asyncpg).
+# Dispara requisições concorrentes de /menu e, em paralelo, mede a latência de
+# uma rota trivial (/ping) para mostrar o quanto o loop fica travado.
+# Sem cache: cada requisição vai ao banco. Para medir contra o Postgres, defina
+# DATABASE_URL antes de rodar; benchmarks/latency_proxy.py simula a rede até o banco.
+# No SQLite local não há espera de I/O para sobrepor e o async sai um pouco mais
+# lento (custo do aiosqlite); o ganho aparece com latência de rede.
+# Uso: python benchmarks/bench_db.py [requisições] [concorrência]
+
+app = FastAPI()
+
+
+def get_sync_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def load_menu_sync(db):
+    # Cópia da consulta antiga (db.query síncrono)
+    categories = sorted(db.query(Category).all(), key=lambda c: (c.display_order, c.id))
+    products = db.query(Product).all()
+    return [{"category": c, "products": [p for p in products if p.category_id == c.id]} for c in categories]
+
+
+@app.get("/sync/menu")
+async def sync_menu(db=Depends(get_sync_db)):
+    return sum(len(item["products"]) for item in load_menu_sync(db))
+
+
+@app.get("/async/menu")
+async def async_menu(db: AsyncSession = Depends(get_db)):
+    return sum(len(item["products"]) for item in await menu_data.load_menu(db))
+
+
+@app.get("/ping")
+async def ping():
+    return "pong"
+
+
+async def timed_get(client, path, latencies):
+    start = time.perf_counter()
+    response = await client.get(path)
+    response.raise_for_status()
+    latencies.append(time.perf_counter() - start)
+
+
+async def pinger(client, latencies, done):
+    while not done.is_set():
+        await timed_get(client, "/ping", latencies)
+        await asyncio.sleep(0.001)
+
+
+async def run(mode, n, concurrency):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(f"/{mode}/menu")  # aquece pool/conexões
+
+        semaphore = asyncio.Semaphore(concurrency)
+        menu_latencies, ping_latencies = [], []
+
+        async def one():
+            async with semaphore:
+                await timed_get(client, f"/{mode}/menu", menu_latencies)
+
+        done = asyncio.Event()
+        ping_task = asyncio.create_task(pinger(client, ping_latencies, done))
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(n)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await ping_task
+
+    pct = lambda values, q: sorted(values)[min(len(values) - 1, int(q * len(values)))] * 1000
+    print(f"{mode:>5} (c={concurrency}): {n / elapsed:8.0f} req/s | /menu p50={pct(menu_latencies, 0.5):6.1f}ms "
+          f"p99={pct(menu_latencies, 0.99):6.1f}ms | /ping p50={pct(ping_latencies, 0.5):6.1f}ms "
+          f"p99={pct(ping_latencies, 0.99):6.1f}ms max={max(ping_latencies) * 1000:6.1f}ms "
+          f"({len(ping_latencies)} pings, média {statistics.mean(ping_latencies) * 1000:.1f}ms)")
+
+
+async def main(n, concurrency):
+    # A Session síncrona faz o checkout do pool dentro do event loop: com mais
+    # requisições simultâneas do que conexões, o checkout trava o loop e nenhuma
+    # conexão volta ao pool (deadlock até o pool_timeout). Sync e async rodam com
+    # a mesma concorrência, limitada ao pool; o async roda também com a pedida.
+    capped = min(concurrency, engine.pool.size())
+    print(f"{n} requisições, concorrência {capped}" + (f" (pedida {concurrency}, pool {engine.pool.size()})" if capped < concurrency else ""))
+    for mode in ("sync", "async"):
+        await run(mode, n, capped)
+    if capped < concurrency:
+        await run("async", n, concurrency)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(main(n, concurrency))
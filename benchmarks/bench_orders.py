@@ -0,0 +1,92 @@
+import asyncio
+import sys
+import time
+sys.path.append('.')
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import order_writer
+import orders
+from database import get_db
+from models import Order, OrderItem
+
+# Benchmark: rajada de pedidos com um commit por requisição (ORM) vs. fila +
+# gravação em lote (order_writer). Mede a latência de POST /orders e o tempo até
+# todos os pedidos estarem gravados. Grava de verdade: use uma cópia do banco
+# (python migrations.py já aplicado) via DATABASE_URL.
+# Uso: DATABASE_URL=sqlite:////tmp/campeao.db python benchmarks/bench_orders.py [pedidos] [concorrência]
+
+ORDER = {
+    "customer_name": "Benchmark",
+    "customer_phone": "0000",
+    "items": [{"product_id": 6, "quantity": 2}, {"product_id": 20, "quantity": 1}],
+}
+
+app = FastAPI()
+app.include_router(orders.router)
+
+
+@app.post("/direct/orders")
+async def create_order_direct(payload: orders.OrderIn, db: AsyncSession = Depends(get_db)):
+    # Comportamento ingênuo: INSERT + commit dentro da requisição
+    catalog = await orders.load_catalog(db)
+    order = Order(customer_name=payload.customer_name, customer_phone=payload.customer_phone, status="Pendente")
+    order.items = [
+        OrderItem(product_id=i.product_id, quantity=i.quantity, unit_price=catalog[i.product_id][1])
+        for i in payload.items
+    ]
+    order.total_amount = sum(i.unit_price * i.quantity for i in order.items)
+    db.add(order)
+    await db.commit()
+    return {"id": order.id}
+
+
+async def burst(client, path, n, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(path, json=ORDER)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(n)))
+    return sorted(latencies)
+
+
+def report(name, n, accepted, durable, latencies):
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"{name:>7}: aceitos em {accepted:.2f}s, gravados em {durable:.2f}s ({n / durable:.0f} pedidos/s) | "
+          f"POST p50={pct(0.5):.1f}ms p99={pct(0.99):.1f}ms")
+
+
+async def main(n, concurrency):
+    print(f"{n} pedidos, concorrência {concurrency}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/direct/orders", json=ORDER)  # aquece catálogo e pool
+
+        start = time.perf_counter()
+        latencies = await burst(client, "/direct/orders", n, concurrency)
+        elapsed = time.perf_counter() - start
+        report("direto", n, elapsed, elapsed, latencies)
+
+        writer = order_writer.writer
+        writer.start()
+        start = time.perf_counter()
+        latencies = await burst(client, "/orders", n, concurrency)
+        accepted = time.perf_counter() - start
+        await writer.stop()
+        durable = time.perf_counter() - start
+        report("em lote", n, accepted, durable, latencies)
+        print("writer:", writer.get_stats())
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(main(n, concurrency))
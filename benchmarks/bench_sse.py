@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+# Teste de carga do /events/menu: abre N conexões SSE contra um servidor já em
+# execução, alterna a disponibilidade de um produto e mede quanto tempo o evento
+# leva para chegar em cada cliente.
+# Uso: uvicorn main:app --port 8000  (em outro terminal)
+#      python benchmarks/bench_sse.py --clients 2000 --product 6
+
+
+async def listen(client, url, ready, received, toggled_at):
+    async with client.stream("GET", url) as response:
+        ready.release()
+        async for line in response.aiter_lines():
+            if line.startswith("data:") and toggled_at:
+                received.append(time.perf_counter() - toggled_at[0])
+                return
+
+
+async def run(base_url, clients, product_id):
+    limits = httpx.Limits(max_connections=clients + 10, max_keepalive_connections=clients + 10)
+    async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+        ready = asyncio.Semaphore(0)
+        received, toggled_at = [], []
+
+        start = time.perf_counter()
+        tasks = [
+            asyncio.create_task(listen(client, f"{base_url}/events/menu", ready, received, toggled_at))
+            for _ in range(clients)
+        ]
+        for _ in range(clients):
+            await ready.acquire()
+        print(f"{clients} conexões abertas em {time.perf_counter() - start:.2f}s")
+        print("broker:", (await client.get(f"{base_url}/admin/events/stats")).json())
+
+        toggled_at.append(time.perf_counter())
+        await client.post(f"{base_url}/admin/toggle/{product_id}")
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=60)
+
+        # Devolve o produto ao estado original
+        await client.post(f"{base_url}/admin/toggle/{product_id}")
+
+    received.sort()
+    p = lambda q: received[min(len(received) - 1, int(q * len(received)))] * 1000
+    print(f"entregues: {len(received)}/{clients}")
+    print(f"latência (ms): p50={p(0.50):.1f} p95={p(0.95):.1f} p99={p(0.99):.1f} "
+          f"max={received[-1] * 1000:.1f} média={statistics.mean(received) * 1000:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga do stream SSE do cardápio")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--product", type=int, default=6)
+    args = parser.parse_args()
+    asyncio.run(run(args.url.rstrip("/"), args.clients, args.product))
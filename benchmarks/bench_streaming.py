@@ -0,0 +1,93 @@
+import asyncio
+import statistics
+import sys
+import time
+import tracemalloc
+sys.path.append('.')
+
+import menu_cache
+from database import AsyncSessionLocal
+from main import HTMLContent, app, render_menu_page, startup_db_client
+
+# Benchmark: página do cardápio com cache frio, montada inteira antes do envio
+# (comportamento antigo: string única + lstrip + encode) vs. StreamingResponse.
+# Mede o tempo até o primeiro byte (TTFB), o tempo total e o pico de memória
+# alocada por requisição (tracemalloc). Chama o app ASGI diretamente.
+# Uso: python benchmarks/bench_streaming.py [requisições] [--cold-fragments]
+
+
+@app.get("/__bench/buffered")
+async def buffered_menu():
+    async with AsyncSessionLocal() as db:
+        body = (await render_menu_page(db)).lstrip().encode("utf-8")
+    return HTMLContent(body)
+
+
+async def asgi_get(path):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"accept-encoding", b"identity")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+
+    async def receive():
+        await asyncio.Event().wait()  # nunca desconecta
+
+    async def send(message):
+        nonlocal first_byte, size
+        if message["type"] == "http.response.body" and message.get("body"):
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            size += len(message["body"])
+
+    await app(scope, receive, send)
+    return first_byte - start, time.perf_counter() - start, size
+
+
+def reset_cache(cold_fragments):
+    menu_cache.bump_version()
+    if cold_fragments:
+        menu_cache.cards.clear()
+        menu_cache.sections.clear()
+
+
+async def measure(path, n, cold_fragments):
+    ttfb, total, peaks = [], [], []
+    for _ in range(n):
+        reset_cache(cold_fragments)
+        tracemalloc.start()
+        first, elapsed, size = await asgi_get(path)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        ttfb.append(first)
+        total.append(elapsed)
+    return statistics.median(ttfb) * 1000, statistics.median(total) * 1000, statistics.median(peaks) / 1024, size
+
+
+async def run(n, cold_fragments):
+    await startup_db_client()
+    await asgi_get("/")  # aquece conexões e o shell (lru_cache)
+
+    print(f"{n} requisições, cache da página frio, fragmentos {'frios' if cold_fragments else 'quentes'}")
+    print(f"{'modo':<12}{'TTFB (ms)':>12}{'total (ms)':>12}{'pico (KiB)':>12}{'bytes':>10}")
+    for name, path in (("buffered", "/__bench/buffered"), ("streaming", "/")):
+        ttfb, total, peak, size = await measure(path, n, cold_fragments)
+        print(f"{name:<12}{ttfb:>12.2f}{total:>12.2f}{peak:>12.0f}{size:>10}")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    n = int(args[0]) if args else 50
+    asyncio.run(run(n, "--cold-fragments" in sys.argv))
@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+import time
+
+# Proxy TCP que atrasa cada pacote em --delay-ms (nos dois sentidos), para simular
+# a latência de rede até um Postgres gerenciado numa máquina local. Roda em outro
+# processo: a rota síncrona do bench_db trava o event loop, e um proxy no mesmo
+# loop pararia junto.
+# Uso: python benchmarks/latency_proxy.py --target /tmp/pgdata/.s.PGSQL.5432 --delay-ms 1
+#      DATABASE_URL=postgresql://postgres@127.0.0.1:6544/postgres python benchmarks/bench_db.py 2000 10
+
+
+async def pump(reader, writer, delay):
+    # Atraso fixo sem limitar a vazão: cada pedaço sai delay depois de ter chegado
+    queue = asyncio.Queue()
+
+    async def receive():
+        while data := await reader.read(65536):
+            queue.put_nowait((time.monotonic() + delay, data))
+        queue.put_nowait((None, b""))
+
+    receiving = asyncio.create_task(receive())
+    try:
+        while True:
+            due, data = await queue.get()
+            if due is None:
+                break
+            await asyncio.sleep(max(0.0, due - time.monotonic()))
+            writer.write(data)
+            await writer.drain()
+    finally:
+        receiving.cancel()
+        writer.close()
+
+
+async def serve(port, target, delay):
+    async def handle(client_reader, client_writer):
+        if target.startswith("/"):
+            server_reader, server_writer = await asyncio.open_unix_connection(target)
+        else:
+            host, _, target_port = target.rpartition(":")
+            server_reader, server_writer = await asyncio.open_connection(host, int(target_port))
+        await asyncio.gather(
+            pump(client_reader, server_writer, delay),
+            pump(server_reader, client_writer, delay),
+            return_exceptions=True,
+        )
+
+    server = await asyncio.start_server(handle, "127.0.0.1", port)
+    print(f"Proxy 127.0.0.1:{port} -> {target} (+{delay * 1000:.1f}ms por sentido)")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=6544)
+    parser.add_argument("--target", required=True, help="host:porta ou caminho do socket unix do Postgres")
+    parser.add_argument("--delay-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(serve(args.port, args.target, args.delay_ms / 1000))
@@ -0,0 +1,332 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks import seed
+
+# Carga nos endpoints do app com um catálogo sintético.
+# Cada endpoint recebe N requisições de C clientes concorrentes; o relatório traz
+# p50/p95/p99, requisições/s e o pico de RSS durante a medição, e é salvo em JSON
+# para comparar versões (--baseline mostra a variação contra um resultado anterior).
+#   python -m benchmarks.load --products 20000 --requests 500 --concurrency 20
+#   python -m benchmarks.load --mode uvicorn --workers 2 --out bench.json --baseline bench-anterior.json
+# Modos: "inprocess" (app ASGI chamado direto, sem rede) e "uvicorn" (servidor
+# local em subprocesso, via HTTP). O RSS vem de /proc (Linux); fora dele fica null.
+# Sai com código 1 se algum endpoint passar de --max-error-rate respostas não-2xx.
+
+ENDPOINTS = {
+    "page": ("GET", "/"),
+    "menu": ("GET", "/api/menu"),
+    "menu_available": ("GET", "/api/menu?available=true&fields=id,name,price"),
+    "category": ("GET", "/api/categories/{category_id}/products"),
+    "toggle": ("POST", "/admin/toggle/{product_id}"),
+    "order": ("POST", "/orders"),
+}
+# Leituras primeiro: o toggle invalida o cache e mudaria o que as leituras medem
+DEFAULT_ENDPOINTS = ("page", "menu", "menu_available", "category", "toggle")
+RSS_SAMPLE_SECONDS = 0.01
+MAX_ERROR_RATE = 0.01
+
+
+def page_size():
+    return os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_tree(pid):
+    # O processo e os filhos (workers do uvicorn)
+    pids = [pid]
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return pids
+    for task in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children = f.read().split()
+        except OSError:
+            continue
+        for child in children:
+            pids.extend(process_tree(int(child)))
+    return pids
+
+
+def rss_bytes(pid):
+    total = 0
+    for p in process_tree(pid):
+        try:
+            with open(f"/proc/{p}/statm") as f:
+                total += int(f.read().split()[1]) * page_size()
+        except OSError:
+            pass
+    return total or None
+
+
+class RssSampler:
+    # Pico de RSS enquanto um endpoint está sob carga
+    def __init__(self, pid):
+        self.pid = pid
+        self.peak = None
+        self._task = None
+
+    async def _run(self):
+        while True:
+            rss = rss_bytes(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            await asyncio.sleep(RSS_SAMPLE_SECONDS)
+
+    def __enter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def request_for(name, i, ids):
+    method, path = ENDPOINTS[name]
+    path = path.format(category_id=ids["categories"][i % len(ids["categories"])],
+                       product_id=ids["toggle"][i % len(ids["toggle"])])
+    body = None
+    if name == "order":
+        body = {"customer_name": "Benchmark", "customer_phone": "0000",
+                "items": [{"product_id": ids["order"][i % len(ids["order"])], "quantity": 1}]}
+    return method, path, body
+
+
+async def measure(client, name, ids, n, concurrency, warmup, pid):
+    for i in range(warmup):
+        method, path, body = request_for(name, i, ids)
+        await client.request(method, path, json=body)
+
+    latencies, errors = [], 0
+    counter = iter(range(n))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, path, body = request_for(name, i, ids)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                await response.aread()
+                ok = 200 <= response.status_code < 300
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    with RssSampler(pid) as sampler:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 3) if v is not None else None
+    return {
+        "endpoint": name,
+        "method": ENDPOINTS[name][0],
+        "path": ENDPOINTS[name][1],
+        "requests": n,
+        "errors": errors,
+        "rps": round(n / elapsed, 1),
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+        "mean_ms": ms(statistics.fmean(latencies) if latencies else None),
+        "peak_rss_mb": round(sampler.peak / 2**20, 1) if sampler.peak else None,
+    }
+
+
+def catalog_ids(url):
+    from sqlalchemy import create_engine, select
+    from models import Category, Product
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        categories = conn.execute(select(Category.id).order_by(Category.id)).scalars().all()
+        products = conn.execute(select(Product.id, Product.is_available).order_by(Product.id)).all()
+    engine.dispose()
+    # Toggle e pedidos em metades disjuntas do catálogo: o toggle deixa produtos
+    # indisponíveis, e um pedido com eles vira 409 em vez de medir a gravação
+    toggle = [product_id for i, (product_id, _) in enumerate(products) if i % 2 == 0]
+    order = [product_id for i, (product_id, available) in enumerate(products) if i % 2 == 1 and available]
+    return {"categories": categories, "toggle": toggle, "order": order}
+
+
+async def run_inprocess(args, ids):
+    # DATABASE_URL já aponta para o banco sintético antes do import do app
+    import main
+
+    for handler in main.app.router.on_startup:
+        await handler()
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for name in args.endpoints:
+            results.append(await measure(client, name, ids, args.requests, args.concurrency, args.warmup, os.getpid()))
+            print_result("inprocess", results[-1])
+    for handler in main.app.router.on_shutdown:
+        await handler()
+    return results
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(base_url, server, timeout=30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise SystemExit("uvicorn encerrou antes de ficar pronto")
+            try:
+                await client.get("/admin/cache/stats")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise SystemExit("uvicorn não respondeu a tempo")
+
+
+async def run_uvicorn(args, ids, env):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    results = []
+    try:
+        await wait_ready(base_url, server)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            for name in args.endpoints:
+                results.append(await measure(client, name, ids, args.requests, args.concurrency, args.warmup, server.pid))
+                print_result("uvicorn", results[-1])
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return results
+
+
+def print_result(mode, r):
+    print(f"{mode:<10}{r['endpoint']:<16}{r['rps']:>9.1f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}"
+          f"{r['p99_ms']:>9.2f}{r['errors']:>7}{r['peak_rss_mb'] or 0:>9.1f}")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(baseline, results):
+    # Variação percentual contra um JSON anterior (mesmo modo e endpoint)
+    previous = {(r["mode"], r["endpoint"]): r for r in baseline["results"]}
+    print(f"\nComparação com {baseline['meta'].get('revision')} ({baseline['meta'].get('date')}):")
+    for r in results:
+        old = previous.get((r["mode"], r["endpoint"]))
+        if old is None:
+            continue
+        delta = lambda key: (r[key] - old[key]) / old[key] * 100 if old.get(key) else 0.0
+        print(f"  {r['mode']:<10}{r['endpoint']:<16} req/s {delta('rps'):+6.1f}%   p95 {delta('p95_ms'):+6.1f}%   p99 {delta('p99_ms'):+6.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.load", description="Carga nos endpoints com catálogo sintético")
+    parser.add_argument("--db", default=seed.DEFAULT_DB, help="Caminho SQLite ou URL do banco (recriado com o catálogo)")
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Permite apagar um banco Postgres já populado")
+    parser.add_argument("--requests", type=int, default=500, help="Requisições por endpoint")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn", "both"), default="inprocess")
+    parser.add_argument("--workers", type=int, default=1, help="Workers do uvicorn")
+    parser.add_argument("--endpoints", nargs="+", choices=tuple(ENDPOINTS), default=list(DEFAULT_ENDPOINTS))
+    parser.add_argument("--out", help="Arquivo JSON com o resultado")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--max-error-rate", type=float, default=MAX_ERROR_RATE,
+                        help="Fração máxima de respostas não-2xx por endpoint (padrão 0.01)")
+    args = parser.parse_args(argv)
+
+    # Antes de qualquer import de database/models: os engines leem DATABASE_URL no import
+    url = seed.database_url(args.db)
+    os.environ["DATABASE_URL"] = url
+    os.environ.pop("STATIC_EXPORT_DIR", None)
+    env = dict(os.environ)
+
+    start = time.perf_counter()
+    seed.seed_catalog(url, args.products, args.categories, args.seed, args.reset)
+    print(f"Catálogo: {args.products} produtos, {args.categories} categorias ({time.perf_counter() - start:.1f} s) em {url}")
+    ids = catalog_ids(url)
+
+    print(f"{'modo':<10}{'endpoint':<16}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'erros':>7}{'RSS MB':>9}")
+    results = []
+    # O uvicorn roda antes: o modo inprocess importa o app e muda o estado deste processo
+    if args.mode in ("uvicorn", "both"):
+        results += [{"mode": "uvicorn", **r} for r in asyncio.run(run_uvicorn(args, ids, env))]
+        if args.mode == "both":
+            seed.seed_catalog(url, args.products, args.categories, args.seed, reset=True)
+    if args.mode in ("inprocess", "both"):
+        results += [{"mode": "inprocess", **r} for r in asyncio.run(run_inprocess(args, ids))]
+
+    report = {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": url.split("://", 1)[0],
+            "products": args.products,
+            "categories": args.categories,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultado salvo em {args.out}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(json.load(f), results)
+
+    failed = [r for r in results if r["errors"] > args.max_error_rate * r["requests"]]
+    for r in failed:
+        print(f"❌ {r['mode']} {r['endpoint']}: {r['errors']}/{r['requests']} respostas não-2xx "
+              f"(limite {args.max_error_rate:.1%})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import argparse
+import glob
+import os
+import random
+import sys
+
+from sqlalchemy import create_engine, func, insert, select
+
+# Catálogo sintético para benchmarks, criado pelo schema atual (migrations.upgrade)
+# e com dados determinísticos (mesma semente = mesmo banco).
+#   python -m benchmarks.seed --products 20000 [--categories 12] [--db /tmp/bench.db]
+# --db aceita um caminho SQLite ou uma URL SQLAlchemy (Postgres precisa estar vazio,
+# a menos que se passe --reset, que apaga cardápio e pedidos).
+
+DEFAULT_DB = "/tmp/campeao-bench.db"
+SUB_CATEGORIES = (None, "Cervejas", "Refrigerantes", "Águas", "Sucos", "Porções")
+WORDS = ("Espetinho", "Carne", "Frango", "Queijo", "Linguiça", "Coração", "Kafta", "Cerveja",
+         "Guaraná", "Suco", "Caipirinha", "Picanha", "Mandioca", "Farofa", "Vinagrete", "Pão de Alho")
+BATCH = 5000
+
+
+def database_url(db):
+    return db if "://" in db else f"sqlite:///{os.path.abspath(db)}"
+
+
+def sample_images(root="."):
+    # Imagens reais do repositório, para a página exercitar <picture>/srcset
+    return sorted(
+        "/static/" + os.path.relpath(path, root).replace(os.sep, "/")
+        for pattern in ("images/*.png", "images/*.jpg", "images/*.jpeg", "images/*.webp")
+        for path in glob.glob(os.path.join(root, pattern))
+    )
+
+
+def seed_catalog(url, products=5000, categories=8, seed=42, reset=False):
+    # Imports tardios: database.py cria os engines a partir de DATABASE_URL no import,
+    # e o benchmark de carga define essa variável antes
+    from models import Category, Product
+    import migrations
+
+    if url.startswith("sqlite:///") and os.path.exists(url[len("sqlite:///"):]):
+        os.remove(url[len("sqlite:///"):])
+
+    engine = create_engine(url)
+    rng = random.Random(seed)
+    images = sample_images()
+    with engine.begin() as conn:
+        migrations.upgrade(conn)
+        if conn.execute(select(func.count()).select_from(Product.__table__)).scalar():
+            if not reset:
+                raise SystemExit(f"{url} já tem produtos; use --reset para apagar o cardápio e os pedidos")
+            for table in ("order_items", "orders", "products", "categories"):
+                conn.exec_driver_sql(f"DELETE FROM {table}")
+
+        category_ids = conn.execute(
+            insert(Category.__table__).returning(Category.__table__.c.id),
+            [{"name": f"Categoria {i:03d}", "display_order": i} for i in range(1, categories + 1)],
+        ).scalars().all()
+
+        rows = []
+        for i in range(1, products + 1):
+            rows.append({
+                "name": f"{rng.choice(WORDS)} {rng.choice(WORDS).lower()} {i}",
+                "description": " ".join(rng.choice(WORDS).lower() for _ in range(rng.randint(3, 12))),
+                "price": round(rng.uniform(3, 120), 2),
+                "category_id": category_ids[i % len(category_ids)],
+                "image_url": images[i % len(images)] if images and i % 3 == 0 else None,
+                "is_available": rng.random() > 0.1,
+                "sub_category": rng.choice(SUB_CATEGORIES),
+                "display_order": i,
+            })
+            if len(rows) == BATCH:
+                conn.execute(insert(Product.__table__), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Product.__table__), rows)
+    engine.dispose()
+    return {"url": url, "products": products, "categories": categories, "seed": seed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.seed", description="Gera um catálogo sintético")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Caminho SQLite ou URL do banco")
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Apaga o cardápio e os pedidos existentes")
+    args = parser.parse_args(argv)
+
+    info = seed_catalog(database_url(args.db), args.products, args.categories, args.seed, args.reset)
+    print(f"✅ {info['products']} produtos em {info['categories']} categorias: {info['url']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import urllib.request
+
+# Build dos assets do front, para a página não depender de scripts de terceiros:
+#  --css     gera static/css/app.css com o Tailwind CLI, só com as classes
+#            usadas nos templates de main.py (ver styles/tailwind.css)
+#  --vendor  baixa de novo as Google Fonts para static/fonts e static/css/fonts.css
+# Sem flags, executa os dois. Os arquivos gerados ficam no repositório e são
+# servidos por /assets; rodar de novo só é preciso para atualizá-los.
+# Uso: python build_static.py [--css] [--vendor]
+
+CSS_INPUT = os.path.join("styles", "tailwind.css")
+CSS_OUTPUT = os.path.join("static", "css", "app.css")
+
+FONTS_DIR = os.path.join("static", "fonts")
+FONTS_CSS_OUTPUT = os.path.join("static", "css", "fonts.css")
+FONTS_CSS_URL = "https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Montserrat:wght@300;400;600;700&display=swap"
+FONT_SUBSETS = ("latin", "latin-ext")
+# A Google só entrega woff2 para navegadores que ela reconhece
+BROWSER_UA = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+
+def build_css():
+    tailwind = shutil.which("tailwindcss")
+    if tailwind is None:
+        print("Tailwind CLI não encontrado. Instale com: pip install tailwindcss-bin")
+        return False
+
+    os.makedirs(os.path.dirname(CSS_OUTPUT), exist_ok=True)
+    subprocess.run([tailwind, "-i", CSS_INPUT, "-o", CSS_OUTPUT, "--minify"], check=True)
+    print(f"CSS gerado: {CSS_OUTPUT} ({os.path.getsize(CSS_OUTPUT) // 1024} KB)")
+    return True
+
+
+def download(url):
+    request = urllib.request.Request(url, headers={"User-Agent": BROWSER_UA})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def vendor_fonts():
+    css = download(FONTS_CSS_URL).decode("utf-8")
+    os.makedirs(FONTS_DIR, exist_ok=True)
+
+    # Cada bloco vem precedido do subset: /* latin */ @font-face { ... }
+    blocks = re.findall(r"/\* ([\w-]+) \*/\s*(@font-face\s*{[^}]*})", css)
+    saved = {}
+    local_css = []
+    for subset, block in blocks:
+        if subset not in FONT_SUBSETS:
+            continue
+        remote = re.search(r"url\((https://[^)]+\.woff2)\)", block).group(1)
+        if remote not in saved:
+            data = download(remote)
+            family = re.search(r"font-family:\s*'([^']+)'", block).group(1)
+            # Hash no nome: o arquivo é servido como está, com cache imutável (assets.py)
+            name = f"{family.lower().replace(' ', '-')}-{subset}.{hashlib.sha256(data).hexdigest()[:10]}.woff2"
+            with open(os.path.join(FONTS_DIR, name), "wb") as f:
+                f.write(data)
+            saved[remote] = name
+        local_css.append(f"/* {subset} */\n" + block.replace(remote, f"../fonts/{saved[remote]}"))
+
+    with open(FONTS_CSS_OUTPUT, "w", encoding="utf-8") as f:
+        f.write("\n".join(local_css) + "\n")
+    print(f"Fontes salvas: {len(saved)} arquivos, CSS em {FONTS_CSS_OUTPUT}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera CSS e copia localmente as dependências do front")
+    parser.add_argument("--css", action="store_true", help="gera static/css/app.css com o Tailwind CLI")
+    parser.add_argument("--vendor", action="store_true", help="baixa de novo as Google Fonts")
+    args = parser.parse_args()
+    run_all = not (args.css or args.vendor)
+
+    if args.css or run_all:
+        build_css()
+    if args.vendor or run_all:
+        vendor_fonts()
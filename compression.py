@@ -0,0 +1,151 @@
+import gzip
+import mimetypes
+import os
+import threading
+import zlib
+
+from fastapi import Response
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele servimos só gzip
+    brotli = None
+
+# Compressão pré-calculada (gzip + brotli) com negociação de Accept-Encoding.
+# Nada é comprimido por requisição: os assets estáticos são comprimidos uma
+# vez (no startup ou no primeiro acesso) e o cardápio uma vez por versão.
+
+COMPRESSIBLE_EXTENSIONS = {".js", ".css", ".html", ".svg", ".json", ".txt", ".map"}
+MIN_SIZE = 1024
+
+
+def supported_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str):
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():  # ordem = preferência do servidor
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, static: bool = False) -> bytes:
+    if encoding == "br":
+        # Qualidade máxima só para assets estáticos (comprimidos uma única vez)
+        return brotli.compress(body, quality=11 if static else 5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9 if static else 6, mtime=0)
+    raise ValueError(f"Encoding não suportado: {encoding}")
+
+
+async def compress_stream(chunks, encoding):
+    # Compressão incremental para respostas em streaming: cada pedaço é enviado
+    # com flush, então o navegador já pode renderizar o que chegou
+    if encoding is None:
+        async for chunk in chunks:
+            yield chunk
+        return
+
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=5)
+        flush = lambda chunk: compressor.process(chunk) + compressor.flush()
+        finish = compressor.finish
+    elif encoding == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = formato gzip
+        flush = lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+    else:
+        raise ValueError(f"Encoding não suportado: {encoding}")
+
+    async for chunk in chunks:
+        data = flush(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    # Cada representação precisa de um ETag forte próprio
+    if encoding is None:
+        return etag
+    return etag[:-1] + "-" + encoding + '"'
+
+
+def is_compressible(path: str, size: int) -> bool:
+    return size >= MIN_SIZE and os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+class CompressedStaticFiles(StaticFiles):
+    # StaticFiles que entrega versões gzip/br guardadas em memória
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._compressed = {}
+        self._lock = threading.Lock()
+
+    def precompress(self, path: str):
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None or not is_compressible(full_path, stat_result.st_size):
+            return
+        for encoding in supported_encodings():
+            self._get_compressed(full_path, stat_result, encoding)
+
+    def _get_compressed(self, full_path, stat_result, encoding):
+        key = (full_path, encoding)
+        cached = self._compressed.get(key)
+        version = (stat_result.st_mtime_ns, stat_result.st_size)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with open(full_path, "rb") as f:
+            body = compress(f.read(), encoding, static=True)
+        with self._lock:
+            self._compressed[key] = (version, body)
+        return body
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        encoding = None
+        compressible = status_code == 200 and is_compressible(str(full_path), stat_result.st_size)
+        if compressible:
+            encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+            if compressible:
+                response.headers["Vary"] = "Accept-Encoding"
+            return response
+
+        plain = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        headers = {
+            "ETag": encoded_etag(plain.headers["etag"], encoding),
+            "Last-Modified": plain.headers["last-modified"],
+            "Content-Encoding": encoding,
+            "Vary": "Accept-Encoding",
+        }
+        if self.is_not_modified(Headers(headers), request_headers):
+            return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "Content-Encoding"})
+
+        media_type = mimetypes.guess_type(str(full_path))[0] or "application/octet-stream"
+        body = self._get_compressed(str(full_path), stat_result, encoding)
+        return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
@@ -1,14 +1,21 @@
 ﻿import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+import metrics
+import menu_version  # registra o contador compartilhado do cardápio em toda Session
+
 # Database URL from environment or fallback to SQLite
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./campeao.db")
 
 # Fix for Heroku/Render PostgreSQL URLs (replace postgres:// with postgresql://)
 if SQLALCHEMY_DATABASE_URL.startswith("postgres://"):
     SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgres://", "postgresql://", 1)
+# Sem driver explícito, o SQLAlchemy 2.1 usa o psycopg 3; o requirements instala o psycopg2
+if SQLALCHEMY_DATABASE_URL.startswith("postgresql://"):
+    SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1)
 
 if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
     engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
@@ -29,4 +36,46 @@ else:
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine assíncrono para as rotas (não bloqueia o event loop durante as queries):
+# aiosqlite no fallback SQLite, asyncpg no Postgres. O engine síncrono acima
+# continua servindo os scripts de manutenção e o create_all do startup.
+def to_async_url(url: str) -> str:
+    # Troca só o driver: "postgres://", "postgresql://" e qualquer "postgresql+<driver>://"
+    # (psycopg2, psycopg, pg8000) viram asyncpg; o resto da URL fica como está
+    scheme, sep, rest = url.partition("://")
+    backend = scheme.split("+", 1)[0]
+    if backend == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if backend in ("postgres", "postgresql"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+ASYNC_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URL)
+
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+else:
+    connect_args = {}
+    if ".pooler.supabase.com" in SQLALCHEMY_DATABASE_URL:
+        # O pooler (PgBouncer em modo transaction) não suporta prepared statements em cache
+        connect_args = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        connect_args=connect_args,
+    )
+
+# expire_on_commit=False: os handlers leem os atributos depois do commit sem
+# disparar lazy loads (que exigiriam await)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
+
+# Dependência para o banco de dados
+async def get_db():
+    with metrics.phase("session"):
+        async with AsyncSessionLocal() as db:
+            yield db
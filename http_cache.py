@@ -0,0 +1,59 @@
+import hashlib
+
+from fastapi import Response
+
+from compression import choose_encoding
+
+# Helpers de cache HTTP (ETag / 304 Not Modified).
+# Sem Last-Modified: a data da última mudança não é guardada no banco, e o relógio
+# de cada processo daria datas diferentes entre workers e a cada restart. O ETag
+# vem do conteúdo, então é o mesmo em qualquer worker.
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match usa comparação fraca: W/"x" equivale a "x"
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def is_not_modified(headers, etag: str) -> bool:
+    # If-Modified-Since é ignorado: a resposta não tem Last-Modified
+    if_none_match = headers.get("if-none-match")
+    return if_none_match is not None and _etag_matches(if_none_match, etag)
+
+
+def validator_headers(etag: str) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+    }
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag))
+
+
+def cached_response(request, page, response_class=Response, **kwargs):
+    # Resposta a partir de uma entrada do menu_cache (CachedPage): 304 quando o
+    # cliente já tem a representação, senão o corpo pré-comprimido negociado
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    body, etag = page.encoded(encoding)
+    if is_not_modified(request.headers, etag):
+        return not_modified_response(etag)
+
+    headers = validator_headers(etag)
+    headers["Vary"] = "Accept-Encoding"
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return response_class(body, headers=headers, **kwargs)
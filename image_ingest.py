@@ -0,0 +1,281 @@
+import collections
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from models import Product
+from text_match import fold, trigrams
+
+# Ingestão incremental das fotos dos produtos (python menu.py images [--dry-run]).
+# Um manifesto guarda, por arquivo de images/ (subpastas por loja inclusive),
+# tamanho, mtime e o hash do conteúdo. A cada execução só os arquivos novos ou
+# alterados são lidos; os demais saem do manifesto sem abrir o arquivo.
+#
+# Vinculação: só arquivos novos procuram produto, pelo nome do arquivo, num
+# índice de nomes normalizados (sem acento, com números e unidades juntos):
+# primeiro o nome exato, depois por tokens com tolerância a erro de digitação.
+# Nome que serve igualmente para mais de um produto é reportado como ambíguo e
+# não é vinculado.
+# Arquivos cuja URL já está em algum produto não são revinculados (mantém os
+# ajustes manuais). Imagens idênticas são deduplicadas: o produto aponta para a
+# primeira cópia, e o navegador baixa o conteúdo uma vez só. Produtos que
+# apontavam para um arquivo removido passam para outra cópia idêntica ou ficam
+# sem imagem. Tudo é gravado com um único UPDATE em lote por chave primária.
+#
+# O manifesto é só um cache: se for apagado, a próxima execução relê tudo e o
+# resultado é o mesmo.
+
+IMAGES_DIR = "images"
+MANIFEST_PATH = ".image_ingest.json"
+URL_PREFIX = "/static/images/"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.avif')
+SKIP_DIRS = ("variants",)  # saída do optimize_images.py
+SKIP_FILES = ("Favicon.png",)
+MIN_MATCH = 0.6  # coeficiente de Dice entre os tokens do arquivo e os do produto
+TOKEN_SIMILARITY = 0.5  # Jaccard de trigramas para aceitar um token com erro de digitação
+HASH_WORKERS = 8
+UNITS = frozenset({"ml", "l", "g", "kg", "un"})
+
+
+def name_tokens(text):
+    # Sem acento e com número e unidade juntos ("350 ml" e "350ml" viram "350ml").
+    # Sem remover stopwords, ao contrário da busca: num nome de produto "com" e
+    # "sem" distinguem itens ("Água Com Gás" x "Água Sem Gás")
+    tokens = []
+    for token in fold(text).split():
+        if token in UNITS and tokens and tokens[-1].isdigit():
+            tokens[-1] += token
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_files(root):
+    # -> {caminho relativo ("loja/foto.jpg"): (tamanho, mtime_ns)}, sem abrir os arquivos
+    files = {}
+    pending = [(root, "")]
+    while pending:
+        path, prefix = pending.pop()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        pending.append((entry.path, f"{prefix}{entry.name}/"))
+                elif entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.name not in SKIP_FILES:
+                    stat = entry.stat()
+                    files[prefix + entry.name] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {rel: tuple(entry) for rel, entry in json.load(f)["files"].items()}
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(files, path=MANIFEST_PATH):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    data = json.dumps({"files": {rel: list(entry) for rel, entry in sorted(files.items())}}, ensure_ascii=False)
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class NameIndex:
+    # Nomes dos produtos normalizados, montado uma vez por execução
+    def __init__(self, products):
+        self.exact = collections.defaultdict(list)  # nome normalizado -> product_ids
+        self.tokens = {}  # product_id -> set de tokens
+        self.postings = collections.defaultdict(set)  # token -> product_ids
+        self.trigrams = collections.defaultdict(set)  # trigrama -> tokens
+        for product_id, name in products:
+            tokens = name_tokens(name)
+            self.exact[" ".join(tokens)].append(product_id)
+            self.tokens[product_id] = set(tokens)
+            for token in tokens:
+                if token not in self.postings:
+                    for gram in trigrams(token):
+                        self.trigrams[gram].add(token)
+                self.postings[token].add(product_id)
+
+    def _resolve(self, token):
+        # Token do vocabulário mais parecido (ex.: "antartica" -> "antarctica")
+        if token in self.postings:
+            return token
+        if len(token) < 4 or token.isdigit():
+            return None
+        grams = trigrams(token)
+        overlap = collections.Counter()
+        for gram in grams:
+            overlap.update(self.trigrams.get(gram, ()))
+        best, best_similarity = None, TOKEN_SIMILARITY
+        for candidate, shared in sorted(overlap.items()):
+            similarity = shared / (len(grams) + len(candidate) + 1 - shared)
+            if similarity > best_similarity:
+                best, best_similarity = candidate, similarity
+        return best
+
+    def match(self, text):
+        # -> ([product_ids], pontuação) ou None; mais de um id = nome ambíguo
+        tokens = name_tokens(text)
+        exact = self.exact.get(" ".join(tokens))
+        if exact:
+            return exact, 1.0
+        terms = {term for term in map(self._resolve, tokens) if term is not None}
+        if not terms:
+            return None
+
+        # Dice >= MIN_MATCH exige ao menos `needed` tokens em comum; então todo
+        # candidato tem um dos (len(terms) - needed + 1) tokens mais raros e só as
+        # listas deles são percorridas (tokens comuns como "refrigerante" ficam de fora)
+        n = len(set(tokens))
+        needed = math.ceil(MIN_MATCH * n / (2 - MIN_MATCH))
+        if needed > len(terms):
+            return None
+        rarest = sorted(terms, key=lambda term: len(self.postings[term]))[:len(terms) - needed + 1]
+        candidates = set().union(*(self.postings[term] for term in rarest))
+
+        best, best_score = [], MIN_MATCH
+        for candidate in sorted(candidates):
+            product_tokens = self.tokens[candidate]
+            score = 2 * len(terms & product_tokens) / (n + len(product_tokens))
+            if score > best_score:
+                best, best_score = [candidate], score
+            elif score == best_score:
+                best.append(candidate)
+        return (best, best_score) if best else None
+
+
+class IngestReport:
+    def __init__(self):
+        self.scanned = 0
+        self.hashed = 0
+        self.new = []  # caminhos relativos
+        self.changed = []
+        self.removed = []
+        self.duplicates = []  # (arquivo, cópia canônica)
+        self.links = []  # (product_id, nome, url antiga, url nova, arquivo)
+        self.unmatched = []
+        self.ambiguous = []  # (arquivo, nomes dos produtos empatados)
+        self.unlinked = []  # (product_id, nome, url removida)
+
+    def summary(self):
+        return (f"{self.scanned} arquivos, {self.hashed} lidos, {len(self.new)} novos, {len(self.changed)} alterados, "
+                f"{len(self.removed)} removidos, {len(self.duplicates)} duplicados, {len(self.links)} vínculos, "
+                f"{len(self.unlinked)} desvinculados, {len(self.unmatched)} sem correspondência, "
+                f"{len(self.ambiguous)} ambíguos")
+
+    def lines(self):
+        for rel, canonical in self.duplicates:
+            yield f"  = {rel} (idêntica a {canonical})"
+        for _, name, old, new, rel in self.links:
+            target = new[len(URL_PREFIX):]
+            yield f"  → {name}: {target}" + (f" (via {rel})" if rel != target else "") + (f" (antes {old})" if old else "")
+        for _, name, url in self.unlinked:
+            yield f"  ✗ {name}: {url} foi removida"
+        for rel in self.unmatched:
+            yield f"  ? {rel}: nenhum produto correspondente"
+        for rel, candidates in self.ambiguous:
+            yield f"  ? {rel}: ambíguo entre {', '.join(candidates)}"
+
+
+def ingest_images(db: Session, root=IMAGES_DIR, manifest_path=MANIFEST_PATH, dry_run=False, relink=False):
+    # relink: procura produto para todos os arquivos, não só os novos (ex.: depois
+    # de cadastrar produtos para fotos que já estavam na pasta)
+    report = IngestReport()
+    previous = load_manifest(manifest_path)
+    current = scan_files(root)
+    report.scanned = len(current)
+
+    files = {}
+    to_hash = []
+    for rel, (size, mtime_ns) in current.items():
+        old = previous.get(rel)
+        if old is not None and old[0] == size and old[1] == mtime_ns:
+            files[rel] = old
+        else:
+            to_hash.append(rel)
+            (report.changed if old is not None else report.new).append(rel)
+    # hashlib libera o GIL em blocos grandes: a leitura dos arquivos novos roda em paralelo
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+        for rel, digest in zip(to_hash, pool.map(lambda rel: file_digest(os.path.join(root, rel)), to_hash)):
+            files[rel] = (*current[rel], digest)
+    report.hashed = len(to_hash)
+    report.removed = sorted(set(previous) - set(current))
+    report.new.sort()
+    report.changed.sort()
+    if not (report.new or report.changed or report.removed or relink):
+        return report  # nada mudou na pasta: nem o banco é consultado
+
+    with db.begin():
+        products = db.execute(select(Product.id, Product.name, Product.image_url)).all()
+        image_urls = {product_id: url for product_id, _, url in products}
+        names = {product_id: name for product_id, name, _ in products}
+        referenced = set(image_urls.values())
+
+        # Cópia canônica de cada conteúdo: a que já está em uso por algum produto,
+        # senão a que já estava na pasta, senão a primeira em ordem alfabética
+        canonical = {}
+        for rel in sorted(files, key=lambda rel: (URL_PREFIX + rel not in referenced, rel not in previous, rel)):
+            canonical.setdefault(files[rel][2], rel)
+        for rel in report.new:
+            if canonical[files[rel][2]] != rel:
+                report.duplicates.append((rel, canonical[files[rel][2]]))
+
+        updates = {}  # product_id -> (url nova, arquivo, pontuação)
+        to_match = [rel for rel in (sorted(files) if relink else report.new) if URL_PREFIX + rel not in referenced]
+        index = NameIndex((product_id, name) for product_id, name, _ in products) if products and to_match else None
+        for rel in to_match if index is not None else ():
+            url = URL_PREFIX + canonical[files[rel][2]]
+            found = index.match(os.path.splitext(os.path.basename(rel))[0])
+            if found is None:
+                report.unmatched.append(rel)
+                continue
+            product_ids, score = found
+            if len(product_ids) > 1:
+                report.ambiguous.append((rel, [names[product_id] for product_id in product_ids]))
+                continue
+            product_id = product_ids[0]
+            # Dois arquivos para o mesmo produto (fotos de lojas diferentes): vale o mais parecido
+            if image_urls[product_id] != url and (product_id not in updates or score > updates[product_id][2]):
+                updates[product_id] = (url, rel, score)
+
+        # Produtos que apontavam para arquivos removidos
+        removed_urls = {URL_PREFIX + rel: previous[rel][2] for rel in report.removed}
+        for product_id, url in image_urls.items():
+            if url in removed_urls and product_id not in updates:
+                replacement = canonical.get(removed_urls[url])
+                if replacement is not None:
+                    updates[product_id] = (URL_PREFIX + replacement, replacement, 1.0)
+                else:
+                    updates[product_id] = (None, None, 0.0)
+                    report.unlinked.append((product_id, names[product_id], url))
+
+        for product_id, (url, rel, _) in sorted(updates.items()):
+            if url is not None:
+                report.links.append((product_id, names[product_id], image_urls[product_id], url, rel))
+        if updates and not dry_run:
+            # UPDATE em lote por chave primária (executemany), como no menu_sync
+            db.execute(update(Product), [{"id": product_id, "image_url": url}
+                                         for product_id, (url, _, _) in sorted(updates.items())])
+
+    if not dry_run:
+        save_manifest(files, manifest_path)
+    return report
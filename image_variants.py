@@ -0,0 +1,38 @@
+import json
+import os
+
+# Manifesto das variantes responsivas geradas por optimize_images.py.
+# As chaves são as mesmas URLs gravadas em Product.image_url
+# ("/static/images/<arquivo>"), então o render só precisa de um dict lookup.
+
+IMAGES_DIR = "images"
+VARIANTS_DIR = os.path.join(IMAGES_DIR, "variants")
+MANIFEST_PATH = os.path.join(VARIANTS_DIR, "manifest.json")
+STATIC_PREFIX = "/static/"
+
+# Os cards ocupam 1/2 da largura no mobile e 1/3 a partir de lg (grid do cardápio)
+CARD_SIZES = "(min-width: 1024px) 33vw, 50vw"
+# Ordem de preferência dos <source>: o navegador usa o primeiro que suportar
+FORMATS = ("avif", "webp")
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"images": {}, "icons": {}}
+
+
+def srcset(variants, url=lambda u: u):
+    return ", ".join(f"{url(v['url'])} {v['width']}w" for v in variants)
+
+
+def get_image(manifest, image_url):
+    if not image_url:
+        return None
+    return manifest.get("images", {}).get(image_url)
+
+
+def get_icon(manifest, size):
+    return manifest.get("icons", {}).get(str(size))
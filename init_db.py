@@ -1,9 +1,11 @@
-from database import engine, Base, SessionLocal
+from database import engine, SessionLocal
 from models import Category, Product
+import migrations
 import os
 
 # Create global tables
-Base.metadata.create_all(bind=engine)
+with engine.begin() as conn:
+    migrations.upgrade(conn)
 
 def init_db():
     db = SessionLocal()
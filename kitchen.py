@@ -0,0 +1,132 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from database import get_db
+from models import Order, OrderItem
+from menu_events import EventBroker
+import order_writer
+import orders
+
+# Painel da cozinha.
+# A tela carrega os pedidos em aberto uma vez (GET /kitchen/orders, pelo índice
+# (status, created_at)) e depois só recebe deltas pelo stream SSE: pedidos novos
+# gravados pelo order_writer e mudanças de status. Em "resync" recarrega a lista.
+
+router = APIRouter(prefix="/kitchen")
+
+# Fluxo documentado em Order.status; cada status só avança para o próximo
+STATUS_FLOW = ("Pendente", "Preparando", "Pronto", "Entregue")
+OPEN_STATUSES = STATUS_FLOW[:-1]
+PREVIOUS_STATUS = dict(zip(STATUS_FLOW[1:], STATUS_FLOW))
+
+broker = EventBroker()
+
+
+class StatusChange(BaseModel):
+    status: str
+
+
+def kitchen_order(order_id, public_id, customer_name, status, created_at, items):
+    return {
+        "id": order_id,
+        "public_id": public_id,
+        "customer_name": customer_name,
+        "status": status,
+        "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+        "items": items,
+    }
+
+
+def on_orders_written(written):
+    # Listener do order_writer: pedidos recém-gravados entram no painel
+    for order in written:
+        items = [
+            {"product_id": i["product_id"], "name": orders.product_name(i["product_id"]),
+             "quantity": i["quantity"], "notes": i["notes"]}
+            for i in order["items"]
+        ]
+        broker.publish("order", kitchen_order(order["id"], order["public_id"], order["customer_name"],
+                                              order["status"], order["created_at"], items))
+
+
+order_writer.writer.add_listener(on_orders_written)
+
+
+def open_orders_query(statuses=OPEN_STATUSES, limit=200):
+    return (
+        select(Order)
+        .where(Order.status.in_(statuses))
+        .order_by(Order.created_at)
+        .limit(limit)
+        .options(selectinload(Order.items).selectinload(OrderItem.product))
+    )
+
+
+@router.get("/orders")
+async def list_open_orders(status: Optional[str] = None, limit: int = 200, db: AsyncSession = Depends(get_db)):
+    statuses = OPEN_STATUSES
+    if status is not None:
+        if status not in STATUS_FLOW:
+            raise HTTPException(status_code=400, detail=f"Status inválido: {status}")
+        statuses = (status,)
+
+    result = await db.scalars(open_orders_query(statuses, min(limit, 1000)))
+    return {
+        "last_event_id": broker.get_stats()["last_event_id"],
+        "orders": [
+            kitchen_order(o.id, o.public_id, o.customer_name, o.status, o.created_at, [
+                {"product_id": i.product_id, "name": i.product.name if i.product else None,
+                 "quantity": i.quantity, "notes": i.notes}
+                for i in o.items
+            ])
+            for o in result
+        ],
+    }
+
+
+@router.post("/orders/{order_id}/status")
+async def change_order_status(order_id: int, change: StatusChange, db: AsyncSession = Depends(get_db)):
+    previous = PREVIOUS_STATUS.get(change.status)
+    if previous is None:
+        raise HTTPException(status_code=400, detail=f"Status inválido: {change.status}")
+
+    # Compare-and-set: só avança se o pedido ainda está no status anterior, então
+    # duas telas clicando ao mesmo tempo não pulam etapas
+    result = await db.execute(
+        update(Order)
+        .where(Order.id == order_id, Order.status == previous)
+        .values(status=change.status)
+        .returning(Order.id)
+        .execution_options(synchronize_session=False)
+    )
+    updated = result.first()
+    await db.commit()
+
+    if updated is None:
+        current = await db.scalar(select(Order.status).where(Order.id == order_id))
+        if current is None:
+            raise HTTPException(status_code=404, detail="Order not found")
+        raise HTTPException(status_code=409, detail=f"Pedido está em '{current}', esperado '{previous}'")
+
+    broker.publish("status", {"id": order_id, "status": change.status})
+    return {"id": order_id, "status": change.status}
+
+
+@router.get("/stream")
+async def kitchen_stream(request: Request):
+    last_event_id = request.headers.get("last-event-id")
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    subscriber = broker.subscribe()
+    return StreamingResponse(
+        broker.stream(subscriber, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,51 +1,148 @@
 # Reset deploy trigger: 2026-02-15 03:22
 from fastapi import FastAPI, Depends, Request, HTTPException
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 import logging
+import functools
 
-from database import SessionLocal, engine
-from models import Base, Category, Product
+from database import AsyncSessionLocal, async_engine, get_db
+from models import Product
+import migrations
+import menu_cache
+import http_cache
+import menu_data
+import image_variants
+import assets
+import api
+import orders
+import order_writer
+import kitchen
+import admin
+import menu_events
+import compression
+import static_export
+import menu_version
+import metrics
+import profiler
 
 # Configuração de Logs
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Campeão do Churrasco")
+app.include_router(api.router)
+app.include_router(orders.router)
+app.include_router(kitchen.router)
+app.include_router(admin.router)
+app.include_router(profiler.router)
+# Server-Timing em toda resposta e histogramas por rota para o /metrics
+app.add_middleware(metrics.TimingMiddleware)
+# Profiling sob demanda (desligado sem PROFILER_ENABLED=1 e PROFILER_TOKEN)
+app.add_middleware(profiler.ProfileMiddleware)
 
-# Montagem de arquivos estáticos (servindo tudo da raiz)
-app.mount("/static", StaticFiles(directory="."), name="static")
+# Variantes responsivas das imagens (geradas por optimize_images.py)
+IMAGE_MANIFEST = image_variants.load_manifest()
+
+# Assets publicáveis (images/ e campeao.js) com URL versionada pelo hash do conteúdo.
+# "/assets" tem cache imutável; "/static" segue atendendo as URLs antigas, mas só
+# para arquivos do manifesto (não expõe mais campeao.db nem os .py da raiz).
+ASSETS = assets.AssetManifest().scan()
+asset_files = assets.AssetFiles(ASSETS)
+app.mount("/assets", asset_files, name="assets")
+app.mount("/static", assets.AssetFiles(ASSETS, hashed=False), name="static")
 
 # Inicialização do Banco de Dados no Startup
 @app.on_event("startup")
-def startup_db_client():
+async def startup_db_client():
     logger.info("🔍 Verificando conexão com o banco de dados...")
     try:
-        # Tenta criar as tabelas se não existirem
-        Base.metadata.create_all(bind=engine)
+        # Uma query de versão; só migra quando o schema está atrás (migrations.py)
+        for version, name in await migrations.ensure_current(async_engine):
+            logger.info(f"🔧 Migração aplicada: {version:03d} {name}")
         logger.info("✅ Banco de dados pronto.")
     except Exception as e:
         logger.error(f"❌ ERRO CRÍTICO NA CONEXÃO: {e}")
 
-# Dependência para o banco de dados
-def get_db():
-    db = SessionLocal()
+    # Comprime os assets (bundle JS) uma única vez, antes da primeira requisição
+    asset_files.precompress_all()
+
+# Gravação em lote dos pedidos (order_writer): inicia com o app e drena a fila no desligamento
+@app.on_event("startup")
+async def start_order_writer():
+    order_writer.writer.start()
+
+@app.on_event("shutdown")
+async def stop_order_writer():
+    await order_writer.writer.stop()
+
+# Streams SSE (cardápio e cozinha): encerrados já no sinal de desligamento, senão o
+# uvicorn espera por eles e nunca chega ao shutdown acima (menu_events.close_on_signals)
+@app.on_event("startup")
+async def close_streams_on_signals():
+    menu_events.close_on_signals(menu_events.broker, kitchen.broker)
+
+@app.on_event("shutdown")
+async def close_event_streams():
+    menu_events.broker.close()
+    kitchen.broker.close()
+
+# Invalidação entre workers: cada processo acompanha o contador menu_version e
+# descarta o cache local (e pede resync aos clientes SSE) quando outro processo muda
+# o menu, seja no polling ou num salto do contador visto no commit local (menu_cache)
+menu_cache.add_remote_listener(menu_events.broker.resync)
+
+version_watcher = menu_version.VersionWatcher(async_engine, menu_cache.observe_shared_version)
+
+@app.on_event("startup")
+async def start_version_watcher():
     try:
-        yield db
-    finally:
-        db.close()
+        initial = await version_watcher.poll()
+    except Exception as e:
+        logger.error(f"❌ Não foi possível ler menu_version: {e}")
+        initial = 0
+    menu_cache.seed_shared_version(initial)
+    version_watcher.start()
+
+@app.on_event("shutdown")
+async def stop_version_watcher():
+    await version_watcher.stop()
+
+# Snapshot estático para CDN (static_export): com STATIC_EXPORT_DIR definido, cada
+# mudança do menu regrava index.html + assets versionados nesse diretório
+async def render_menu_snapshot():
+    async with AsyncSessionLocal() as db:
+        return await render_menu_page(db)
+
+snapshot_exporter = None
+if os.getenv(static_export.EXPORT_DIR_ENV):
+    snapshot_exporter = static_export.SnapshotExporter(render_menu_snapshot, ASSETS, os.getenv(static_export.EXPORT_DIR_ENV))
+
+@app.on_event("startup")
+async def start_snapshot_exporter():
+    if snapshot_exporter is not None:
+        snapshot_exporter.start()
+
+@app.on_event("shutdown")
+async def stop_snapshot_exporter():
+    if snapshot_exporter is not None:
+        await snapshot_exporter.stop()
+
+@app.get("/admin/export/stats")
+async def snapshot_export_stats():
+    if snapshot_exporter is None:
+        return {"enabled": False}
+    return {"enabled": True, **snapshot_exporter.get_stats()}
 
 # Rota Admin Toggle
 @app.post("/admin/toggle/{product_id}")
-async def toggle_product_availability(product_id: int, db: Session = Depends(get_db)):
-    product = db.query(Product).filter(Product.id == product_id).first()
+async def toggle_product_availability(product_id: int, db: AsyncSession = Depends(get_db)):
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     product.is_available = not product.is_available
-    db.commit()
+    await db.commit()  # o commit invalida o cache do cardápio (menu_cache)
     return {"status": "success", "is_available": product.is_available}
 
 # Helper to render Logo (SVG)
@@ -74,137 +171,267 @@ def render_logo(size="md", classes=""):
     </div>
     """
 
+# Helper to render CSS/fonts of the <head> (build_static.py).
+# Arquivos do repositório, servidos pelo pipeline com hash: a página não carrega
+# nada de CDN. As animações de entrada não usam biblioteca (revealOnScroll).
+HEAD_STYLESHEETS = ("static/css/app.css", "static/css/fonts.css")
+
+def render_head_assets():
+    return "\n        ".join(f'<link rel="stylesheet" href="{ASSETS.url(path)}">' for path in HEAD_STYLESHEETS)
+
+# Helper to render a product photo with responsive AVIF/WebP variants (optimize_images.py)
+def render_product_image(prod):
+    img_class = "w-full h-full object-cover transition-transform duration-1000 group-hover:scale-110"
+    entry = image_variants.get_image(IMAGE_MANIFEST, prod.image_url)
+    if not entry:
+        return f'<img src="{ASSETS.url(prod.image_url)}" alt="{prod.name}" loading="lazy" decoding="async" class="{img_class}" />'
+
+    sources = "".join(
+        f'<source type="image/{fmt}" srcset="{image_variants.srcset(entry["formats"][fmt], ASSETS.url)}" sizes="{image_variants.CARD_SIZES}" />'
+        for fmt in image_variants.FORMATS if fmt in entry["formats"]
+    )
+    return f"""<picture>{sources}<img src="{ASSETS.url(entry['fallback'])}" alt="{prod.name}" width="{entry['width']}" height="{entry['height']}" loading="lazy" decoding="async" class="{img_class}" /></picture>"""
+
 @app.get("/", response_class=HTMLResponse)
-async def read_root(request: Request, db: Session = Depends(get_db)):
+async def read_root(request: Request):
+    # Cache da página renderizada: só vai ao banco quando a versão do menu muda
+    version = menu_cache.current_version()
+    page = menu_cache.get_page(version)
+    if page is None:
+        # Cache frio: a query roda antes do primeiro byte (uma falha no banco ainda
+        # vira 500, não uma página 200 quebrada); depois a página é transmitida
+        # enquanto é montada e guardada no cache ao final
+        try:
+            async with AsyncSessionLocal() as db:
+                categories_data = await menu_data.load_menu(db)
+        except Exception:
+            logger.exception("Erro ao carregar cardápio")
+            raise HTTPException(status_code=500, detail="Erro ao carregar o cardápio")
+        encoding = compression.choose_encoding(request.headers.get("accept-encoding", ""))
+        headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        body = stream_and_cache_menu_page(version, categories_data)
+        return StreamingResponse(compression.compress_stream(body, encoding), media_type="text/html", headers=headers)
+
+    # GET condicional (304) e corpo pré-comprimido conforme Accept-Encoding
+    return http_cache.cached_response(request, page, HTMLContent)
+
+async def stream_and_cache_menu_page(version, categories_data):
+    parts = []
     try:
-        # Order categories manually to guarantee the pyramid layout
-        all_categories = db.query(Category).all()
-        pref_order = {"Espetinho": 1, "Bebidas": 2, "Acompanhamentos": 3, "Drinks": 4}
-        categories = sorted(all_categories, key=lambda c: pref_order.get(c.name, 99))
-        
-        products = db.query(Product).all()
-        
-        # Pre-process data for the view
-        categories_data = []
-        for cat in categories:
-            prods = [p for p in products if p.category_id == cat.id]
-            categories_data.append({"category": cat, "products": prods})
-        
-        # Default active tab (first one)
-        first_cat_id = categories[0].id if categories else 0
+        async for part in render_menu_stream(categories_data):
+            chunk = part.encode("utf-8")
+            parts.append(chunk)
+            yield chunk
+    except Exception:
+        # Os cabeçalhos (200) já foram enviados: avisa no corpo, sem expor o erro
+        # ao cliente, e a página parcial não vai para o cache
+        logger.exception("Erro ao montar o cardápio")
+        yield "<p>Erro ao carregar o site. Tente novamente em instantes.</p>".encode("utf-8")
+        return
+    menu_cache.store_page(version, b"".join(parts))
+
+# Métricas no formato texto do Prometheus (histogramas por rota/fase + contadores do app)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    cache = menu_cache.get_stats()
+    writer = order_writer.writer.get_stats()
+    return PlainTextResponse(metrics.render([
+        ("menu_cache_hits_total", "counter", "Páginas/respostas servidas do cache", cache["hits"]),
+        ("menu_cache_misses_total", "counter", "Páginas/respostas renderizadas", cache["misses"]),
+        ("menu_cache_invalidations_total", "counter", "Versões do menu descartadas", cache["invalidations"]),
+        ("menu_events_subscribers", "gauge", "Clientes SSE conectados", menu_events.broker.get_stats()["subscribers"]),
+        ("order_writer_queued", "gauge", "Pedidos na fila de gravação", writer["queued"]),
+        ("order_writer_written_total", "counter", "Pedidos gravados", writer["written"]),
+        ("order_writer_rejected_total", "counter", "Pedidos recusados pelo banco", writer["rejected"]),
+    ]), media_type="text/plain; version=0.0.4")
+
+# Admin: estatísticas do cache do cardápio
+@app.get("/admin/cache/stats")
+async def menu_cache_stats():
+    return {**menu_cache.get_stats(), "watcher": version_watcher.get_stats()}
+
+# Eventos ao vivo (SSE): disponibilidade e preço dos produtos
+@app.get("/events/menu")
+async def menu_events_stream(request: Request):
+    last_event_id = request.headers.get("last-event-id")
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    subscriber = menu_events.broker.subscribe()
+    return StreamingResponse(
+        menu_events.broker.stream(subscriber, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/admin/events/stats")
+async def menu_events_stats():
+    return menu_events.broker.get_stats()
+
+async def render_menu_page(db: AsyncSession) -> str:
+    categories_data = await menu_data.load_menu(db)
+    return "".join([part async for part in render_menu_stream(categories_data)])
+
+async def render_menu_stream(categories_data):
+    # Gera a página em pedaços, na ordem do documento
+    before_tabs, before_content, after_content = render_page_shell()
+    yield before_tabs
+
+    # Default active tab (first one)
+    first_cat_id = categories_data[0]["category"].id if categories_data else 0
+
+    # A página é montada a partir de fragmentos em cache (menu_cache.cards /
+    # menu_cache.sections), cada um versionado pelo conteúdo da linha: mudar um
+    # produto re-renderiza só o card dele e a seção que o contém.
+    with metrics.phase("render"):
+        tabs = "".join(render_tab_button(item['category'], item['category'].id == first_cat_id) for item in categories_data)
+    yield tabs
+    yield before_content
+
+    live_cards = set()
+    for item in categories_data:
+        cat = item['category']
+        is_active = (cat.id == first_cat_id)
+
+        with metrics.phase("render"):
+            cards = []
+            card_versions = []
+            for prod in item['products']:
+                row_version = menu_data.product_row_version(prod)
+                cards.append(menu_cache.cards.get_or_render(prod.id, row_version, lambda: render_product_card(prod)))
+                card_versions.append((prod.id, row_version))
+                live_cards.add(prod.id)
+
+            section_version = (cat.name, is_active, tuple(card_versions))
+            section = menu_cache.sections.get_or_render(
+                cat.id, section_version, lambda: render_category_section(cat, is_active, "".join(cards))
+            )
+        yield section
+
+    menu_cache.cards.prune(live_cards)
+    menu_cache.sections.prune(item['category'].id for item in categories_data)
+
+    yield after_content
+
+def render_tab_button(cat, is_active):
+    btn_class = "bg-brand-blue text-white shadow-[0_5px_15px_rgba(0,144,255,0.2)]" if is_active else "text-dark-text/40 dark:text-neutral-400 hover:bg-brand-blue/10 hover:text-brand-blue"
+
+    # Pyramid layout using stable Flexbox (v1.0.6)
+    if cat.name in ["Espetinho", "Bebidas"]:
+        # Two buttons sharing the first row
+        mobile_class = "w-[48%] md:w-auto"
+    else:
+        # Full width buttons for the bottom rows (Pyramid base)
+        mobile_class = "w-full md:w-auto"
+
+    return f"""
+        <button onclick="switchTab({cat.id})" 
+                id="tab-btn-{cat.id}"
+                class="tab-btn {mobile_class} flex items-center justify-center text-[10px] md:text-xs font-bold uppercase tracking-wider px-2 md:px-8 py-3.5 md:py-4 rounded-lg transition-all duration-300 active:scale-95 shadow-sm {btn_class}">
+          {cat.name}
+        </button>
+        """
+
+def render_product_card(prod):
+    avail_class = "opacity-50 grayscale select-none" if not prod.is_available else ""
+    badge_class = "" if not prod.is_available else "hidden"
+    img_html = ""
+    if prod.image_url:
+        img_html = f"""
+        <div class="relative aspect-video overflow-hidden">
+            {render_product_image(prod)}
+            <div class="absolute inset-0 bg-gradient-to-t from-white dark:from-neutral-950 via-transparent to-transparent opacity-40"></div>
+            <div class="absolute top-2 right-2 md:top-4 md:right-4 bg-brand-blue text-white font-bebas text-sm md:text-xl px-2 md:px-4 py-0.5 md:py-1 rounded shadow-lg product-price">R$ {prod.price:.2f}</div>
+        </div>
+        """
+    
+    admin_btn_color = "text-red-500" if prod.is_available else "text-green-500"
+    admin_btn_label = "Desativar" if prod.is_available else "Ativar"
+
+    return f"""
+    <div id="product-card-{prod.id}" 
+         data-subcat="{prod.sub_category or ''}"
+         class="product-card reveal-on-scroll group bg-white/60 dark:bg-neutral-900/60 backdrop-blur-md border border-brand-blue/10 dark:border-white/5 overflow-hidden transition-all duration-500 hover:shadow-[0_25px_50px_-12px_rgba(0,144,255,0.15)] hover:border-brand-blue/40 dark:hover:border-brand-blue/40 md:hover:-translate-y-2 rounded-xl flex flex-col relative {avail_class}">
+        <div class="absolute inset-0 pointer-events-none glass-shimmer opacity-30"></div>
         
-        # Build tabs buttons HTML
-        tabs_btns_html = ""
-        for item in categories_data:
-            cat = item['category']
-            is_active = (cat.id == first_cat_id)
-            btn_class = "bg-brand-blue text-white shadow-[0_5px_15px_rgba(0,144,255,0.2)]" if is_active else "text-dark-text/40 dark:text-neutral-400 hover:bg-brand-blue/10 hover:text-brand-blue"
-            
-            # Pyramid layout using stable Flexbox (v1.0.6)
-            if cat.name in ["Espetinho", "Bebidas"]:
-                # Two buttons sharing the first row
-                mobile_class = "w-[48%] md:w-auto"
-            else:
-                # Full width buttons for the bottom rows (Pyramid base)
-                mobile_class = "w-full md:w-auto"
-                
-            tabs_btns_html += f"""
-            <button onclick="switchTab({cat.id})" 
-                    id="tab-btn-{cat.id}"
-                    class="tab-btn {mobile_class} flex items-center justify-center text-[10px] md:text-xs font-bold uppercase tracking-wider px-2 md:px-8 py-3.5 md:py-4 rounded-lg transition-all duration-300 active:scale-95 shadow-sm {btn_class}">
-              {cat.name}
+        <div id="status-badge-{prod.id}" class="absolute top-2 left-2 z-20 px-2 py-0.5 rounded text-[8px] md:text-[10px] font-black uppercase tracking-widest shadow-lg transition-all {badge_class} bg-red-500 text-white">
+            ESGOTADO
+        </div>
+
+        <div class="admin-only hidden absolute top-2 left-2 z-[30] flex gap-2">
+            <button onclick="toggleAvailability({prod.id})" class="p-2 bg-white/90 dark:bg-neutral-800/90 rounded-lg shadow-xl border border-brand-blue/20 hover:scale-110 active:scale-95 transition-all group/admin-btn">
+                <svg class="w-4 h-4 {admin_btn_color}" fill="none" viewBox="0 0 24 24" stroke="currentColor">
+                    <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M18.364 18.364A9 9 0 005.636 5.636m12.728 12.728A9 9 0 015.636 5.636m12.728 12.728L5.636 5.636" />
+                </svg>
+                <span class="absolute top-full left-0 mt-1 bg-dark-text text-white text-[8px] px-1 py-0.5 rounded opacity-0 group-hover/admin-btn:opacity-100 whitespace-nowrap">{admin_btn_label}</span>
             </button>
-            """
-
-        # Build items content HTML
-        tabs_content_html = ""
-        for item in categories_data:
-            cat = item['category']
-            prods = item['products']
-            is_active = (cat.id == first_cat_id)
-            content_class = "active" if is_active else ""
-            
-            subcat_filter_html = ""
-            if cat.name == 'Bebidas':
-                subcat_filter_html = """
-                <div class="flex flex-wrap gap-2 mb-10 reveal-on-scroll">
-                    <button onclick="filterSubCat('all')" class="subcat-btn active px-4 py-2 rounded-lg text-[10px] font-bold uppercase tracking-wider border border-brand-blue/20 transition-all bg-brand-blue text-white">Todos</button>
-                    <button onclick="filterSubCat('Cervejas')" class="subcat-btn px-4 py-2 rounded-lg text-[10px] font-bold uppercase tracking-wider border border-brand-blue/20 transition-all text-dark-text/60 dark:text-neutral-400 hover:bg-brand-blue/5">Cervejas</button>
-                    <button onclick="filterSubCat('Refrigerantes')" class="subcat-btn px-4 py-2 rounded-lg text-[10px] font-bold uppercase tracking-wider border border-brand-blue/20 transition-all text-dark-text/60 dark:text-neutral-400 hover:bg-brand-blue/5">Refrigerantes</button>
-                    <button onclick="filterSubCat('Águas')" class="subcat-btn px-4 py-2 rounded-lg text-[10px] font-bold uppercase tracking-wider border border-brand-blue/20 transition-all text-dark-text/60 dark:text-neutral-400 hover:bg-brand-blue/5">Águas</button>
-                </div>
-                """
-
-            products_grid_html = ""
-            for prod in prods:
-                avail_class = "opacity-50 grayscale select-none" if not prod.is_available else ""
-                badge_class = "" if not prod.is_available else "hidden"
-                img_html = ""
-                if prod.image_url:
-                    img_html = f"""
-                    <div class="relative aspect-video overflow-hidden">
-                        <img src="{prod.image_url}" alt="{prod.name}" class="w-full h-full object-cover transition-transform duration-1000 group-hover:scale-110" />
-                        <div class="absolute inset-0 bg-gradient-to-t from-white dark:from-neutral-950 via-transparent to-transparent opacity-40"></div>
-                        <div class="absolute top-2 right-2 md:top-4 md:right-4 bg-brand-blue text-white font-bebas text-sm md:text-xl px-2 md:px-4 py-0.5 md:py-1 rounded shadow-lg">R$ {prod.price:.2f}</div>
-                    </div>
-                    """
-                
-                admin_btn_color = "text-red-500" if prod.is_available else "text-green-500"
-                admin_btn_label = "Desativar" if prod.is_available else "Ativar"
-
-                products_grid_html += f"""
-                <div id="product-card-{prod.id}" 
-                     data-subcat="{prod.sub_category or ''}"
-                     class="product-card reveal-on-scroll group bg-white/60 dark:bg-neutral-900/60 backdrop-blur-md border border-brand-blue/10 dark:border-white/5 overflow-hidden transition-all duration-500 hover:shadow-[0_25px_50px_-12px_rgba(0,144,255,0.15)] hover:border-brand-blue/40 dark:hover:border-brand-blue/40 md:hover:-translate-y-2 rounded-xl flex flex-col relative {avail_class}">
-                    <div class="absolute inset-0 pointer-events-none glass-shimmer opacity-30"></div>
-                    
-                    <div id="status-badge-{prod.id}" class="absolute top-2 left-2 z-20 px-2 py-0.5 rounded text-[8px] md:text-[10px] font-black uppercase tracking-widest shadow-lg transition-all {badge_class} bg-red-500 text-white">
-                        ESGOTADO
-                    </div>
+        </div>
 
-                    <div class="admin-only hidden absolute top-2 left-2 z-[30] flex gap-2">
-                        <button onclick="toggleAvailability({prod.id})" class="p-2 bg-white/90 dark:bg-neutral-800/90 rounded-lg shadow-xl border border-brand-blue/20 hover:scale-110 active:scale-95 transition-all group/admin-btn">
-                            <svg class="w-4 h-4 {admin_btn_color}" fill="none" viewBox="0 0 24 24" stroke="currentColor">
-                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M18.364 18.364A9 9 0 005.636 5.636m12.728 12.728A9 9 0 015.636 5.636m12.728 12.728L5.636 5.636" />
-                            </svg>
-                            <span class="absolute top-full left-0 mt-1 bg-dark-text text-white text-[8px] px-1 py-0.5 rounded opacity-0 group-hover/admin-btn:opacity-100 whitespace-nowrap">{admin_btn_label}</span>
-                        </button>
-                    </div>
+        {img_html}
+        
+        <div class="p-4 md:p-8 flex flex-col flex-grow {'pt-6 md:pt-10' if not prod.image_url else ''}">
+            <div class="flex flex-col md:flex-row justify-between items-start mb-2 md:mb-3 gap-1 md:gap-4">
+              <h4 class="font-bebas text-lg md:text-2xl tracking-wide text-dark-text dark:text-neutral-100 group-hover:text-brand-blue transition-colors line-clamp-2">{prod.name}</h4>
+              {f'<span class="text-brand-blue font-bebas text-base md:text-xl whitespace-nowrap product-price">R$ {prod.price:.2f}</span>' if not prod.image_url else ''}
+            </div>
+            <p class="text-[10px] md:text-xs text-dark-text/50 dark:text-neutral-400 font-light leading-relaxed mb-4 md:mb-6 flex-grow line-clamp-3">{prod.description or ""}</p>
+        </div>
+    </div>
+    """
 
-                    {img_html}
-                    
-                    <div class="p-4 md:p-8 flex flex-col flex-grow {'pt-6 md:pt-10' if not prod.image_url else ''}">
-                        <div class="flex flex-col md:flex-row justify-between items-start mb-2 md:mb-3 gap-1 md:gap-4">
-                          <h4 class="font-bebas text-lg md:text-2xl tracking-wide text-dark-text dark:text-neutral-100 group-hover:text-brand-blue transition-colors line-clamp-2">{prod.name}</h4>
-                          {f'<span class="text-brand-blue font-bebas text-base md:text-xl whitespace-nowrap">R$ {prod.price:.2f}</span>' if not prod.image_url else ''}
-                        </div>
-                        <p class="text-[10px] md:text-xs text-dark-text/50 dark:text-neutral-400 font-light leading-relaxed mb-4 md:mb-6 flex-grow line-clamp-3">{prod.description or ""}</p>
-                    </div>
-                </div>
-                """
-
-            tabs_content_html += f"""
-            <div id="tab-content-{cat.id}" class="tab-content {content_class}">
-                <div class="mb-16 last:mb-0">
-                    <div class="flex items-center gap-4 md:gap-6 mb-8">
-                        <h3 class="font-bebas text-3xl md:text-4xl text-brand-blue tracking-widest uppercase">{cat.name}</h3>
-                        <div class="flex-grow h-[1px] bg-gradient-to-r from-brand-blue/20 to-transparent"></div>
-                    </div>
-                    {subcat_filter_html}
-                    <div class="grid grid-cols-2 lg:grid-cols-3 gap-3 md:gap-8 product-grid">
-                        {products_grid_html}
-                    </div>
-                </div>
+def render_category_section(cat, is_active, cards_html):
+    content_class = "active" if is_active else ""
+
+    subcat_filter_html = ""
+    if cat.name == 'Bebidas':
+        subcat_filter_html = """
+        <div class="flex flex-wrap gap-2 mb-10 reveal-on-scroll">
+            <button onclick="filterSubCat('all')" class="subcat-btn active px-4 py-2 rounded-lg text-[10px] font-bold uppercase tracking-wider border border-brand-blue/20 transition-all bg-brand-blue text-white">Todos</button>
+            <button onclick="filterSubCat('Cervejas')" class="subcat-btn px-4 py-2 rounded-lg text-[10px] font-bold uppercase tracking-wider border border-brand-blue/20 transition-all text-dark-text/60 dark:text-neutral-400 hover:bg-brand-blue/5">Cervejas</button>
+            <button onclick="filterSubCat('Refrigerantes')" class="subcat-btn px-4 py-2 rounded-lg text-[10px] font-bold uppercase tracking-wider border border-brand-blue/20 transition-all text-dark-text/60 dark:text-neutral-400 hover:bg-brand-blue/5">Refrigerantes</button>
+            <button onclick="filterSubCat('Águas')" class="subcat-btn px-4 py-2 rounded-lg text-[10px] font-bold uppercase tracking-wider border border-brand-blue/20 transition-all text-dark-text/60 dark:text-neutral-400 hover:bg-brand-blue/5">Águas</button>
+        </div>
+        """
+
+    return f"""
+    <div id="tab-content-{cat.id}" class="tab-content {content_class}">
+        <div class="mb-16 last:mb-0">
+            <div class="flex items-center gap-4 md:gap-6 mb-8">
+                <h3 class="font-bebas text-3xl md:text-4xl text-brand-blue tracking-widest uppercase">{cat.name}</h3>
+                <div class="flex-grow h-[1px] bg-gradient-to-r from-brand-blue/20 to-transparent"></div>
             </div>
-            """
+            {subcat_filter_html}
+            <div class="grid grid-cols-2 lg:grid-cols-3 gap-3 md:gap-8 product-grid">
+                {cards_html}
+            </div>
+        </div>
+    </div>
+    """
 
-    except Exception as e:
-        logger.error(f"Erro ao carregar cardápio: {e}")
-        return HTMLResponse(content=f"Erro ao carregar o site: {e}", status_code=500)
+# Parte fixa da página (head, hero, rodapé, scripts), renderizada uma vez por processo
+# e dividida nos pontos onde entram as abas e o conteúdo do cardápio.
+TABS_SLOT = "<!--tabs-->"
+CONTENT_SLOT = "<!--content-->"
+
+@functools.lru_cache(maxsize=1)
+def render_page_shell():
+    tabs_btns_html = TABS_SLOT
+    tabs_content_html = CONTENT_SLOT
 
     logo_md = render_logo(size="md")
     logo_sm = render_logo(size="sm")
 
+    head_assets = render_head_assets()
+
+    icon_32 = image_variants.get_icon(IMAGE_MANIFEST, 32)
+    icon_180 = image_variants.get_icon(IMAGE_MANIFEST, 180)
+    if icon_32 and icon_180:
+        favicon_links = f"""<link rel="icon" type="image/png" sizes="32x32" href="{ASSETS.url(icon_32)}">
+        <link rel="apple-touch-icon" sizes="180x180" href="{ASSETS.url(icon_180)}">"""
+    else:
+        favicon_links = f'<link rel="icon" type="image/png" href="{ASSETS.url("images/Favicon.png")}">'
+
     html_content = f"""<!DOCTYPE html>
     <html lang="pt-BR" class="scroll-smooth">
     <head>
@@ -212,40 +439,8 @@ async def read_root(request: Request, db: Session = Depends(get_db)):
         <meta name="viewport" content="width=device-width, initial-scale=1.0" />
         <title>Campeão do Churrasco | A Arte da Brasa em Mogi Mirim</title>
         <!-- Version: 1.0.6 - Manual Sort Build -->
-        <link rel="icon" type="image/png" href="/static/images/Favicon.png?v=1.0.6">
-        <link rel="preconnect" href="https://fonts.googleapis.com">
-        <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-        <link href="https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Montserrat:wght@300;400;600;700&display=swap" rel="stylesheet">
-        <script src="https://cdn.tailwindcss.com"></script>
-        <script>
-          tailwind.config = {{
-            darkMode: 'class',
-            theme: {{
-              extend: {{
-                colors: {{
-                  'rich-black': '#FFFFFF', 
-                  'brand-blue': '#0090FF', 
-                  'brand-blue-light': '#E0F2FF', 
-                  'steak-gold': '#D4AF37',
-                  'smoke-grey': '#F3F4F6', 
-                  'dark-text': '#0D0D0D', 
-                  'medium-text': '#4B5563',
-                }},
-                fontFamily: {{
-                  bebas: ['"Bebas Neue"', 'cursive'],
-                  montserrat: ['Montserrat', 'sans-serif'],
-                }},
-                animation: {{ 'shimmer': 'shimmer 3s infinite linear', 'fadeIn': 'fadeIn 0.5s ease-out' }},
-                keyframes: {{
-                  shimmer: {{ '0%': {{ transform: 'translateX(-100%)' }}, '100%': {{ transform: 'translateX(100%)' }} }},
-                  fadeIn: {{ '0%': {{ opacity: '0', transform: 'translateY(10px)' }}, '100%': {{ opacity: '1', transform: 'translateY(0)' }} }}
-                }}
-              }}
-            }}
-          }}
-        </script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/gsap/3.12.2/gsap.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/gsap/3.12.2/ScrollTrigger.min.js"></script>
+        {favicon_links}
+        {head_assets}
         <style>
           .glass-shimmer::after {{ content: ''; position: absolute; top: 0; left: -100%; width: 50%; height: 100%; background: linear-gradient(to right, transparent, rgba(255, 255, 255, 0.4), transparent); transform: skewX(-25deg); animation: shimmer 4s infinite; }}
           .tab-content {{ display: none; }}
@@ -429,15 +624,32 @@ async def read_root(request: Request, db: Session = Depends(get_db)):
                 }}
             }}
 
+            function applyProductUpdate(p) {{
+                const card = document.getElementById(`product-card-${{p.id}}`);
+                const b = document.getElementById(`status-badge-${{p.id}}`);
+                if (!card || !b) return;
+                if (p.is_available) {{ card.classList.remove('opacity-50', 'grayscale', 'select-none'); b.classList.add('hidden'); }}
+                else {{ card.classList.add('opacity-50', 'grayscale', 'select-none'); b.classList.remove('hidden'); }}
+                if (p.price !== undefined) card.querySelectorAll('.product-price').forEach(el => el.textContent = 'R$ ' + p.price.toFixed(2));
+            }}
+
             async function toggleAvailability(id) {{
                 const res = await fetch(`/admin/toggle/${{id}}`, {{ method: 'POST' }});
                 const data = await res.json();
-                if (data.status === 'success') {{
-                    const card = document.getElementById(`product-card-${{id}}`);
-                    const b = document.getElementById(`status-badge-${{id}}`);
-                    if (data.is_available) {{ card.classList.remove('opacity-50', 'grayscale', 'select-none'); b.classList.add('hidden'); }}
-                    else {{ card.classList.add('opacity-50', 'grayscale', 'select-none'); b.classList.remove('hidden'); }}
-                }}
+                if (data.status === 'success') applyProductUpdate({{ id: id, is_available: data.is_available }});
+            }}
+
+            // Atualizações ao vivo (SSE). Em "resync" (eventos perdidos) relê tudo pela API JSON.
+            async function resyncProducts() {{
+                const res = await fetch('/api/menu?fields=is_available,price');
+                const data = await res.json();
+                data.categories.forEach(c => c.products.forEach(applyProductUpdate));
+            }}
+            function listenMenuEvents() {{
+                if (!window.EventSource) return;
+                const es = new EventSource('/events/menu');
+                es.addEventListener('product', e => applyProductUpdate(JSON.parse(e.data)));
+                es.addEventListener('resync', resyncProducts);
             }}
 
             function switchTab(id) {{
@@ -456,24 +668,39 @@ async def read_root(request: Request, db: Session = Depends(get_db)):
                 document.querySelectorAll('.product-card').forEach(c => {{
                     c.style.display = (s === 'all' || c.getAttribute('data-subcat') === s) ? 'flex' : 'none';
                 }});
-                if (window.ScrollTrigger) ScrollTrigger.refresh();
+            }}
+
+            // Entrada dos blocos ao rolar: sobem e aparecem quando entram na tela
+            // (seções de abas ocultas entram ao serem exibidas)
+            function revealOnScroll() {{
+                if (!('IntersectionObserver' in window) || window.matchMedia('(prefers-reduced-motion: reduce)').matches) return;
+                const observer = new IntersectionObserver(entries => entries.forEach(e => {{
+                    if (!e.isIntersecting) return;
+                    e.target.classList.remove('reveal-pending');
+                    observer.unobserve(e.target);
+                }}));
+                document.querySelectorAll('.reveal-on-scroll').forEach(s => {{
+                    s.classList.add('reveal-pending');
+                    observer.observe(s);
+                }});
             }}
 
             document.addEventListener("DOMContentLoaded", () => {{
-                if (window.gsap) {{
-                   gsap.registerPlugin(ScrollTrigger);
-                   gsap.utils.toArray('.reveal-on-scroll').forEach(s => gsap.fromTo(s, {{ y: 30, opacity: 0 }}, {{ y: 0, opacity: 1, duration: 1, scrollTrigger: {{ trigger: s, start: 'top 90%' }} }}));
-                }}
+                revealOnScroll();
                 updateAdminUI();
+                listenMenuEvents();
             }});
         </script>
     </body>
     </html>
     """
-    return HTMLContent(html_content)
+    before_tabs, rest = html_content.lstrip().split(TABS_SLOT)
+    before_content, after_content = rest.split(CONTENT_SLOT)
+    return before_tabs, before_content, after_content
 
 class HTMLContent(HTMLResponse):
-    def __init__(self, content: str, status_code: int = 200):
+    def __init__(self, content, status_code: int = 200, headers: dict = None):
         # Limpeza agressiva de qualquer espaço ou caractere invisível no início do conteúdo
-        clean_content = content.lstrip()
-        super().__init__(content=clean_content, status_code=status_code)
+        # (bytes já chegam limpos do cache e podem estar comprimidos: não mexer)
+        clean_content = content.lstrip() if isinstance(content, str) else content
+        super().__init__(content=clean_content, status_code=status_code, headers=headers)
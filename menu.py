@@ -0,0 +1,124 @@
+import argparse
+import json
+import sys
+import time
+
+from database import SessionLocal, engine
+import menu_sync
+import migrations
+
+# Ferramentas de linha de comando do cardápio.
+#   python menu.py sync menu.json [--dry-run] [--keep-missing]
+#   python menu.py dump [arquivo.json]
+#   python menu.py explain [--analyze] [--sql]
+#   python menu.py export [diretório]
+#   python menu.py images [--dry-run] [--relink]
+
+
+def cmd_sync(args):
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        try:
+            diff = menu_sync.sync_menu(db, args.file, dry_run=args.dry_run, delete_missing=not args.keep_missing)
+        except menu_sync.MenuFileError as e:
+            print(f"❌ {e}")
+            return 1
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for line in diff.lines():
+        print(line)
+    if diff.is_empty():
+        print(f"Cardápio já está sincronizado ({elapsed:.0f} ms).")
+    elif args.dry_run:
+        print(f"Dry-run: {diff.summary()} — nada foi gravado ({elapsed:.0f} ms).")
+    else:
+        print(f"✅ {diff.summary()} ({elapsed:.0f} ms).")
+    return 0
+
+
+def cmd_dump(args):
+    with SessionLocal() as db:
+        data = json.dumps(menu_sync.dump_menu(db), ensure_ascii=False, indent=2)
+    if args.file:
+        with open(args.file, "w", encoding="utf-8") as f:
+            f.write(data + "\n")
+        print(f"Cardápio salvo em {args.file}")
+    else:
+        print(data)
+    return 0
+
+
+def cmd_explain(args):
+    import query_plans
+
+    query_plans.print_report(engine, analyze=args.analyze, show_sql=args.sql)
+    return 0
+
+
+def cmd_export(args):
+    import asyncio
+    import static_export
+    from main import ASSETS, render_menu_snapshot
+
+    start = time.perf_counter()
+    html = asyncio.run(render_menu_snapshot())
+    result = static_export.write_snapshot(html, ASSETS, args.dir)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"✅ Snapshot em {args.dir}: index.html ({result['bytes']} bytes), "
+          f"{result['assets']} assets ({result['copied']} novos) ({elapsed:.0f} ms).")
+    return 0
+
+
+def cmd_images(args):
+    import image_ingest
+
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        report = image_ingest.ingest_images(db, manifest_path=args.manifest, dry_run=args.dry_run, relink=args.relink)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for line in report.lines():
+        print(line)
+    if args.dry_run:
+        print(f"Dry-run: {report.summary()} — nada foi gravado ({elapsed:.0f} ms).")
+    else:
+        print(f"✅ {report.summary()} ({elapsed:.0f} ms).")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="menu", description="Ferramentas do cardápio")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync = commands.add_parser("sync", help="Sincroniza o banco com um arquivo de cardápio (JSON/YAML/CSV)")
+    sync.add_argument("file")
+    sync.add_argument("--dry-run", action="store_true", help="Só mostra o diff, sem gravar")
+    sync.add_argument("--keep-missing", action="store_true", help="Não remove produtos ausentes do arquivo")
+    sync.set_defaults(func=cmd_sync)
+
+    dump = commands.add_parser("dump", help="Exporta o cardápio atual no formato do sync")
+    dump.add_argument("file", nargs="?")
+    dump.set_defaults(func=cmd_dump)
+
+    explain = commands.add_parser("explain", help="Mostra o EXPLAIN das queries do app")
+    explain.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (Postgres)")
+    explain.add_argument("--sql", action="store_true", help="Imprime também o SQL de cada query")
+    explain.set_defaults(func=cmd_explain)
+
+    export = commands.add_parser("export", help="Gera o snapshot estático da página (index.html + assets) para CDN")
+    export.add_argument("dir", nargs="?", default="dist")
+    export.set_defaults(func=cmd_export)
+
+    images = commands.add_parser("images", help="Ingere as fotos novas/alteradas e vincula aos produtos pelo nome")
+    images.add_argument("--manifest", default=".image_ingest.json", help="Cache com o hash de cada arquivo")
+    images.add_argument("--dry-run", action="store_true", help="Só mostra o que mudaria, sem gravar")
+    images.add_argument("--relink", action="store_true", help="Procura produto para todos os arquivos, não só os novos")
+    images.set_defaults(func=cmd_images)
+
+    args = parser.parse_args(argv)
+    migrations.require_current(engine)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import threading
+
+from http_cache import make_etag
+from compression import compress, encoded_etag
+import menu_version
+
+# Cache em memória da página do cardápio (e das respostas da API JSON).
+# Cada corpo renderizado é guardado por "versão do menu" + chave; qualquer escrita
+# em Category/Product incrementa a versão e descarta o que estava em cache.
+# Com vários workers, a escrita também avança o contador compartilhado
+# (menu_version) e os outros processos descartam o cache ao lê-lo.
+
+# Limite de entradas por versão (HTML + combinações de filtros da API)
+MAX_ENTRIES = 256
+
+_lock = threading.Lock()
+_version = 0
+_pages = {}
+_stats = {"hits": 0, "misses": 0, "invalidations": 0, "remote_invalidations": 0}
+# Último valor visto do contador compartilhado (menu_version)
+_shared_version = 0
+# Chamados (sem argumentos) a cada nova versão do menu, ex.: export estático
+_listeners = []
+_remote_listeners = []
+
+
+class CachedPage:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = make_etag(body)
+        self._encoded = {}
+
+    def encoded(self, encoding):
+        # Retorna (corpo, etag) da representação pedida, comprimindo só uma vez
+        if encoding is None:
+            return self.body, self.etag
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = compress(self.body, encoding)
+            self._encoded[encoding] = body
+        return body, encoded_etag(self.etag, encoding)
+
+
+class FragmentCache:
+    # Fragmentos de HTML (cards, seções) indexados por id e versão da linha.
+    # Sobrevivem às trocas de versão do menu: só o que mudou é re-renderizado.
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, row_version, render):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == row_version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        html = render()
+        self._entries[key] = (row_version, html)
+        return html
+
+    def prune(self, live_keys):
+        # Descarta fragmentos de itens que saíram do cardápio
+        live_keys = set(live_keys)
+        for key in [k for k in self._entries if k not in live_keys]:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+cards = FragmentCache()
+sections = FragmentCache()
+
+
+def current_version():
+    return _version
+
+
+def bump_version():
+    global _version
+    with _lock:
+        _version += 1
+        _pages.clear()
+        _stats["invalidations"] += 1
+        version = _version
+    for listener in _listeners:
+        listener()
+    return version
+
+
+def add_listener(callback):
+    # O callback pode ser chamado fora do event loop (commit de sessão síncrona)
+    _listeners.append(callback)
+
+
+def add_remote_listener(callback):
+    # Chamados (sem argumentos) quando outro processo mudou o menu: resync dos
+    # clientes SSE, índice de busca marcado como desatualizado
+    _remote_listeners.append(callback)
+
+
+def observe_shared_version(version, local=False):
+    # Retorna True quando outro processo mudou o menu e o cache local foi descartado.
+    # local=True: versão gravada por um commit deste processo, que já invalidou o
+    # cache. Um commit local avança o contador em exatamente 1; se ele pulou mais
+    # que isso, outro worker mudou o menu desde o último polling e essa mudança
+    # é tratada como remota (senão seria absorvida pelo commit local).
+    global _shared_version
+    with _lock:
+        if version is None or version <= _shared_version:
+            return False
+        remote = not local or version != _shared_version + 1
+        _shared_version = version
+        if remote:
+            _stats["remote_invalidations"] += 1
+    if not remote:
+        return False
+    bump_version()
+    for listener in _remote_listeners:
+        listener()
+    return True
+
+
+def seed_shared_version(version):
+    # Startup: valor do contador de onde o polling parte. Não é uma mudança vista
+    # (o cache ainda está vazio), então não conta como invalidação remota
+    global _shared_version
+    with _lock:
+        _shared_version = max(_shared_version, version)
+
+
+def get_page(version, key="html"):
+    page = _pages.get((version, key))
+    if page is None:
+        _stats["misses"] += 1
+    else:
+        _stats["hits"] += 1
+    return page
+
+
+def store_page(version, body, key="html"):
+    page = CachedPage(body)
+    with _lock:
+        # Se o menu mudou durante a renderização, a página já nasceu velha
+        if version == _version and len(_pages) < MAX_ENTRIES:
+            _pages[(version, key)] = page
+    return page
+
+
+def get_stats():
+    return {
+        "version": _version,
+        "shared_version": _shared_version,
+        "cached_pages": len(_pages),
+        **_stats,
+        "cards": cards.get_stats(),
+        "sections": sections.get_stats(),
+    }
+
+
+# Invalidação automática: qualquer commit que toque no cardápio (admin, menu
+# sync, etc.) avança o contador compartilhado (menu_version) e a versão local.
+def _on_menu_commit(session, shared_version):
+    bump_version()
+    observe_shared_version(shared_version, local=True)
+
+
+menu_version.subscribe("menu_cache", on_commit=_on_menu_commit)
@@ -0,0 +1,44 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Category, Product
+
+# Consultas do cardápio compartilhadas pela página HTML e pela API JSON.
+
+PRODUCT_FIELDS = ("id", "name", "description", "price", "category_id", "image_url", "is_available", "sub_category")
+
+
+def menu_query(available=None):
+    # Uma única query já na ordem da página: categoria, depois produto (display_order;
+    # o id desempata). O join por category_id (+ is_available) usa o índice
+    # ix_products_category_available_sub.
+    join_on = Product.category_id == Category.id
+    if available is not None:
+        join_on = join_on & (Product.is_available == available)
+    return (
+        select(Category, Product)
+        .outerjoin(Product, join_on)
+        .order_by(Category.display_order, Category.id, Product.display_order, Product.id)
+    )
+
+
+async def load_menu(db: AsyncSession, available=None):
+    # Agrupa em uma passada: as linhas já chegam ordenadas por categoria
+    categories_data = []
+    for cat, prod in (await db.execute(menu_query(available))).all():
+        if not categories_data or categories_data[-1]["category"] is not cat:
+            categories_data.append({"category": cat, "products": []})
+        if prod is not None:
+            categories_data[-1]["products"].append(prod)
+    return categories_data
+
+
+def product_to_dict(product, fields=PRODUCT_FIELDS):
+    return {field: getattr(product, field) for field in fields}
+
+
+def product_row_version(product):
+    # "Versão" de uma linha para o cache de fragmentos: muda sempre que algum
+    # campo exibido no card muda
+    return (product.name, product.description, product.price, product.image_url,
+            product.is_available, product.sub_category)
@@ -0,0 +1,226 @@
+import asyncio
+import collections
+import json
+import signal
+
+from sqlalchemy import inspect
+
+from models import Product
+import menu_version
+
+# Eventos ao vivo do cardápio (Server-Sent Events).
+# Commits que mudam disponibilidade/preço de produtos viram eventos "product",
+# codificados uma única vez e distribuídos para a fila de cada cliente conectado.
+# O EventBroker não sabe nada de cardápio: o painel da cozinha usa outra instância
+# para os pedidos, e lá o "resync" faz o cliente recarregar a lista de pedidos.
+
+HEARTBEAT_SECONDS = 15
+QUEUE_SIZE = 64
+REPLAY_SIZE = 256
+WATCHED_FIELDS = ("is_available", "price")
+
+
+def encode_event(event_id, name, data) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {event_id}\nevent: {name}\ndata: {payload}\n\n".encode("utf-8")
+
+
+RESYNC = b"event: resync\ndata: {}\n\n"
+HEARTBEAT = b": ping\n\n"
+CLOSE = object()  # sentinela na fila: o stream termina (desligamento do servidor)
+
+
+class Subscriber:
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        # Cliente lento que estourou a fila: descarta o atrasado e pede resync
+        self.overflowed = False
+
+
+class EventBroker:
+    def __init__(self):
+        self._subscribers = set()
+        self._recent = collections.deque(maxlen=REPLAY_SIZE)  # (id, mensagem) para Last-Event-ID
+        self._last_id = 0
+        self._loop = None
+        self._closed = False
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self):
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber()
+        if self._closed:
+            subscriber.queue.put_nowait(CLOSE)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.discard(subscriber)
+
+    def replay_since(self, last_event_id):
+        # Eventos perdidos durante a reconexão; None se já saíram do buffer
+        # (ou se o id é de um processo anterior, após um restart)
+        if last_event_id > self._last_id:
+            return None
+        if last_event_id == self._last_id:
+            return []
+        if not self._recent or self._recent[0][0] > last_event_id + 1:
+            return None
+        return [message for event_id, message in self._recent if event_id > last_event_id]
+
+    def publish(self, name, data):
+        if self._loop is None:
+            return  # ninguém nunca se conectou
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._dispatch(name, data)
+        else:
+            # Commit feito fora do event loop (threadpool, scripts): agenda no loop
+            try:
+                self._loop.call_soon_threadsafe(self._dispatch, name, data)
+            except RuntimeError:
+                pass  # loop encerrado
+
+    def resync(self):
+        # Mudança feita por outro worker (sem os eventos "product"): clientes recarregam o menu
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._send_resync)
+
+    def close(self):
+        # Encerra todos os streams abertos (e os que chegarem depois). Pode ser
+        # chamado de um handler de sinal ou de outra thread
+        if self._loop is None:
+            self._closed = True
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._close)
+            except RuntimeError:
+                pass  # loop encerrado
+
+    def _close(self):
+        self._closed = True
+        for subscriber in self._subscribers:
+            subscriber.overflowed = False
+            while subscriber.queue.full():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(CLOSE)
+
+    def _send_resync(self):
+        for subscriber in self._subscribers:
+            if not subscriber.overflowed:
+                try:
+                    subscriber.queue.put_nowait(RESYNC)
+                except asyncio.QueueFull:
+                    subscriber.overflowed = True
+                    self.dropped += 1
+
+    def _dispatch(self, name, data):
+        self._last_id += 1
+        message = encode_event(self._last_id, name, data)
+        self._recent.append((self._last_id, message))
+        self.published += 1
+        for subscriber in self._subscribers:
+            if subscriber.overflowed:
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+                self.dropped += 1
+
+    async def stream(self, subscriber, last_event_id=None):
+        try:
+            if last_event_id is not None:
+                missed = self.replay_since(last_event_id)
+                if missed is None:
+                    yield RESYNC
+                else:
+                    for message in missed:
+                        yield message
+
+            while True:
+                if subscriber.overflowed:
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    subscriber.overflowed = False
+                    yield RESYNC
+                    continue
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if message is CLOSE:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def get_stats(self):
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "last_event_id": self._last_id,
+        }
+
+
+broker = EventBroker()
+
+
+def close_on_signals(*brokers):
+    # O uvicorn, no SIGTERM/SIGINT, espera as conexões abertas fecharem antes de
+    # rodar o shutdown do lifespan. Streams SSE não fecham sozinhos: o desligamento
+    # travaria (e a drenagem da fila de pedidos nunca rodaria). Encerra os streams
+    # já no sinal e repassa o sinal para o handler do servidor.
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            for broker in brokers:
+                broker.close()
+            previous(signum, frame)
+
+        try:
+            signal.signal(sig, handler)
+        except ValueError:
+            pass  # fora da thread principal: fica só o close() do shutdown
+
+
+def product_event(product):
+    return {"id": product.id, "is_available": bool(product.is_available), "price": product.price}
+
+
+def queue_product_event(session, data):
+    # Agenda um evento "product" para depois do commit da sessão (UPDATEs em
+    # massa não passam pelo flush, então quem os executa registra aqui)
+    session.info.setdefault("menu_events", {})[data["id"]] = data
+
+
+# Coleta as mudanças de disponibilidade/preço no flush e publica só após o commit
+def _collect_product_changes(session):
+    for obj in session.dirty:
+        if not isinstance(obj, Product):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[field].history.has_changes() for field in WATCHED_FIELDS):
+            queue_product_event(session, product_event(obj))
+
+
+def _publish_product_changes(session, version):
+    for data in session.info.pop("menu_events", {}).values():
+        broker.publish("product", data)
+
+
+def _discard_product_changes(session):
+    session.info.pop("menu_events", None)
+
+
+menu_version.subscribe("menu_events", on_flush=_collect_product_changes,
+                       on_commit=_publish_product_changes, on_rollback=_discard_product_changes)
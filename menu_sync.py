@@ -0,0 +1,259 @@
+import csv
+import json
+import os
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from models import Category, OrderItem, Product
+
+try:
+    import yaml
+except ImportError:  # YAML é opcional; JSON e CSV funcionam sem dependências
+    yaml = None
+
+# Sincronização declarativa do cardápio (python menu.py sync menu.json).
+# O arquivo descreve o cardápio inteiro; o banco é lido em duas queries, o diff é
+# calculado em memória e aplicado com INSERT/UPDATE/DELETE em lote numa única
+# transação. Rodar de novo com o mesmo arquivo não muda nada.
+#
+# Formato JSON/YAML:
+#   {"categories": [{"name": "Bebidas", "products": [{"name": "...", "price": 6.5, ...}]}]}
+# Formato CSV: uma linha por produto, colunas category,name + os SYNC_FIELDS desejados.
+#
+# Produtos são identificados pelo nome (único no cardápio), então trocar a
+# categoria de um item é um UPDATE. Campos ausentes no arquivo não são tocados,
+# e categorias nunca são removidas (só criadas). A ordem do arquivo é a ordem da
+# página: vira o display_order das categorias e dos produtos dentro de cada uma.
+
+SYNC_FIELDS = ("description", "price", "image_url", "is_available", "sub_category")
+DIFF_FIELDS = (*SYNC_FIELDS, "display_order")
+FIELD_DEFAULTS = {"description": None, "price": 0.0, "image_url": None, "is_available": True, "sub_category": None}
+
+
+class MenuFileError(ValueError):
+    pass
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "sim", "yes", "y", "s"):
+        return True
+    if text in ("0", "false", "não", "nao", "no", "n"):
+        return False
+    raise MenuFileError(f"Valor booleano inválido: {value!r}")
+
+
+def _normalize(category, raw):
+    name = str(raw.get("name") or "").strip()
+    if not name:
+        raise MenuFileError(f"Produto sem nome na categoria {category!r}")
+
+    entry = {"category": category, "name": name}
+    for field in SYNC_FIELDS:
+        if field not in raw:
+            continue
+        value = raw[field]
+        if value == "":
+            value = None
+        if field == "price":
+            try:
+                value = round(float(value), 2)
+            except (TypeError, ValueError):
+                raise MenuFileError(f"Preço inválido para {name!r}: {raw[field]!r}")
+        elif field == "is_available":
+            value = True if value is None else _parse_bool(value)
+        entry[field] = value
+    return entry
+
+
+def load_menu_file(path):
+    # -> (nomes das categorias na ordem do arquivo, lista de produtos normalizados na ordem do arquivo)
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if ext == ".csv":
+            rows = list(csv.DictReader(f))
+            categories = list(dict.fromkeys(row["category"].strip() for row in rows))
+            products = [_normalize(row["category"].strip(), row) for row in rows]
+        else:
+            if ext == ".json":
+                data = json.load(f)
+            elif ext in (".yaml", ".yml"):
+                if yaml is None:
+                    raise MenuFileError("Instale o PyYAML para ler arquivos .yaml")
+                data = yaml.safe_load(f)
+            else:
+                raise MenuFileError(f"Formato não suportado: {ext} (use .json, .yaml ou .csv)")
+            categories = [c["name"].strip() for c in data["categories"]]
+            products = [
+                _normalize(c["name"].strip(), p)
+                for c in data["categories"]
+                for p in c.get("products", [])
+            ]
+
+    seen = set()
+    positions = {}
+    for p in products:
+        if p["name"] in seen:
+            raise MenuFileError(f"Produto duplicado no arquivo: {p['name']!r}")
+        seen.add(p["name"])
+        positions[p["category"]] = p["display_order"] = positions.get(p["category"], 0) + 1
+    return categories, products
+
+
+class MenuDiff:
+    def __init__(self):
+        self.new_categories = []  # (nome, posição)
+        self.category_moves = []  # (id, nome, posição antiga, nova)
+        self.inserts = []  # produtos (dicts do arquivo)
+        self.updates = []  # (id, nome, {campo: (antes, depois)})
+        self.deletes = []  # (id, nome)
+        self.retired = set()  # ids com pedidos: ficam indisponíveis em vez de apagados
+
+    def is_empty(self):
+        return not (self.new_categories or self.category_moves or self.inserts or self.updates or self.deletes)
+
+    def summary(self):
+        return (f"{len(self.new_categories)} categorias novas, {len(self.category_moves)} reordenadas, "
+                f"{len(self.inserts)} inserções, "
+                f"{len(self.updates)} atualizações, {len(self.deletes)} remoções")
+
+    def lines(self):
+        for name, _ in self.new_categories:
+            yield f"+ categoria {name}"
+        for _, name, old, new in self.category_moves:
+            yield f"~ categoria {name}: display_order {old} -> {new}"
+        for p in self.inserts:
+            price = p.get("price", FIELD_DEFAULTS["price"])
+            yield f"+ {p['category']} / {p['name']} (R$ {price:.2f})"
+        for _, name, changes in self.updates:
+            detail = ", ".join(f"{field}: {old!r} -> {new!r}" for field, (old, new) in changes.items())
+            yield f"~ {name}: {detail}"
+        for product_id, name in self.deletes:
+            suffix = " (tem pedidos: marcado como indisponível)" if product_id in self.retired else ""
+            yield f"- {name}{suffix}"
+
+
+def diff_menu(db: Session, categories, products, delete_missing=True):
+    diff = MenuDiff()
+
+    current_categories = {row.name: row for row in db.execute(select(Category.id, Category.name, Category.display_order))}
+    for position, name in enumerate(categories, start=1):
+        row = current_categories.get(name)
+        if row is None:
+            diff.new_categories.append((name, position))
+        elif row.display_order != position:
+            diff.category_moves.append((row.id, name, row.display_order, position))
+    category_names = {row.id: name for name, row in current_categories.items()}
+
+    columns = [Product.id, Product.name, Product.category_id, *(getattr(Product, f) for f in DIFF_FIELDS)]
+    current = {}
+    duplicates = []
+    for row in db.execute(select(*columns).order_by(Product.id)):
+        if row.name in current:
+            duplicates.append(row)
+        else:
+            current[row.name] = row
+
+    for p in products:
+        row = current.pop(p["name"], None)
+        if row is None:
+            diff.inserts.append(p)
+            continue
+        changes = {}
+        if category_names.get(row.category_id) != p["category"]:
+            changes["category"] = (category_names.get(row.category_id), p["category"])
+        for field in DIFF_FIELDS:
+            if field not in p:
+                continue
+            old = getattr(row, field)
+            if field == "is_available":
+                old = bool(old)
+            elif field == "price" and old is not None:
+                old = round(old, 2)
+            if old != p[field]:
+                changes[field] = (old, p[field])
+        if changes:
+            diff.updates.append((row.id, row.name, changes))
+
+    if delete_missing:
+        missing = [*current.values(), *duplicates]
+        if missing:
+            # Produtos que aparecem em pedidos não podem sumir (FK em order_items):
+            # ficam indisponíveis, e os que já estão não entram mais no diff
+            diff.retired = set(db.scalars(
+                select(OrderItem.product_id).where(OrderItem.product_id.in_([row.id for row in missing])).distinct()
+            ))
+        diff.deletes = [(row.id, row.name) for row in missing
+                        if row.id not in diff.retired or row.is_available]
+    return diff
+
+
+def apply_diff(db: Session, diff: MenuDiff):
+    if diff.new_categories:
+        db.execute(insert(Category), [{"name": name, "display_order": position}
+                                      for name, position in diff.new_categories])
+    if diff.category_moves:
+        db.execute(update(Category), [{"id": cid, "display_order": new} for cid, _, _, new in diff.category_moves])
+    category_ids = {name: cid for cid, name in db.execute(select(Category.id, Category.name))}
+
+    if diff.inserts:
+        db.execute(insert(Product), [
+            {
+                **FIELD_DEFAULTS,
+                **{field: p[field] for field in DIFF_FIELDS if field in p},
+                "name": p["name"],
+                "category_id": category_ids[p["category"]],
+            }
+            for p in diff.inserts
+        ])
+
+    if diff.updates:
+        # UPDATE em lote por chave primária (executemany), agrupado por conjunto de colunas
+        rows = []
+        for product_id, _, changes in diff.updates:
+            row = {"id": product_id}
+            for field, (_, new) in changes.items():
+                if field == "category":
+                    row["category_id"] = category_ids[new]
+                else:
+                    row[field] = new
+            rows.append(row)
+        db.execute(update(Product), rows)
+
+    retired = [product_id for product_id, _ in diff.deletes if product_id in diff.retired]
+    removed = [product_id for product_id, _ in diff.deletes if product_id not in diff.retired]
+    if retired:
+        db.execute(update(Product).where(Product.id.in_(retired)).values(is_available=False)
+                   .execution_options(synchronize_session=False))
+    if removed:
+        db.execute(delete(Product).where(Product.id.in_(removed)).execution_options(synchronize_session=False))
+
+
+def sync_menu(db: Session, path, dry_run=False, delete_missing=True):
+    categories, products = load_menu_file(path)
+    with db.begin():
+        diff = diff_menu(db, categories, products, delete_missing)
+        if not dry_run and not diff.is_empty():
+            apply_diff(db, diff)
+    return diff
+
+
+def dump_menu(db: Session):
+    # Cardápio atual no formato do arquivo de sync (ponto de partida para o menu.json)
+    categories = db.scalars(select(Category).order_by(Category.display_order, Category.id)).all()
+    products = db.scalars(select(Product).order_by(Product.display_order, Product.id)).all()
+    return {
+        "categories": [
+            {
+                "name": c.name,
+                "products": [
+                    {"name": p.name, **{field: getattr(p, field) for field in SYNC_FIELDS}}
+                    for p in products if p.category_id == c.id
+                ],
+            }
+            for c in categories
+        ]
+    }
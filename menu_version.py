@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import os
+
+from sqlalchemy import Column, Integer, MetaData, Table, event, select, update
+from sqlalchemy.orm import Session
+
+# Versão do cardápio compartilhada entre processos (vários workers uvicorn/gunicorn).
+# Toda transação que altera Category/Product incrementa menu_version.version na
+# mesma transação; cada worker lê esse contador a cada
+# POLL_SECONDS e, se outro processo o avançou, descarta o cache local.
+# Funciona em SQLite e Postgres sem serviço externo; o atraso máximo para um
+# worker enxergar a mudança do admin é POLL_SECONDS.
+# Os listeners de Session ficam aqui (e não no menu_cache) porque database.py
+# importa este módulo: scripts avulsos também avançam o contador. Cache, busca e
+# eventos SSE não registram listeners próprios: assinam via subscribe().
+
+ROW_ID = 1
+MENU_TABLES = ("categories", "products")
+POLL_SECONDS = float(os.getenv("MENU_VERSION_POLL_SECONDS", "1"))
+
+logger = logging.getLogger(__name__)
+
+menu_version = Table(
+    "menu_version", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False, default=0),
+)
+
+_read = select(menu_version.c.version).where(menu_version.c.id == ROW_ID)
+
+# Quem reage às mudanças do cardápio, chamado sempre nesta ordem (independe da
+# ordem dos imports): o cache local avança a versão antes que o índice de busca
+# compare a sua com ela, e os eventos SSE saem por último, com os dois em dia.
+SUBSCRIBERS = ("menu_cache", "search", "menu_events")
+_subscribers = {}
+
+
+def subscribe(name, on_flush=None, on_bulk_write=None, on_commit=None, on_rollback=None):
+    # on_flush(session): flush com Category/Product novos, alterados ou removidos
+    # on_bulk_write(session, tabela): INSERT/UPDATE/DELETE em massa via session.execute()
+    # on_commit(session, versão): commit que mudou o cardápio (nova versão compartilhada)
+    # on_rollback(session): descarta o que foi guardado em session.info
+    if name not in SUBSCRIBERS:
+        raise ValueError(f"Assinante desconhecido: {name!r} (inclua em menu_version.SUBSCRIBERS)")
+    _subscribers[name] = {"on_flush": on_flush, "on_bulk_write": on_bulk_write,
+                          "on_commit": on_commit, "on_rollback": on_rollback}
+
+
+def _dispatch(hook, *args):
+    for name in SUBSCRIBERS:
+        callback = _subscribers.get(name, {}).get(hook)
+        if callback is not None:
+            callback(*args)
+
+
+def bump(connection):
+    # Chamado dentro da transação que muda o menu; devolve a nova versão
+    return connection.execute(
+        update(menu_version)
+        .where(menu_version.c.id == ROW_ID)
+        .values(version=menu_version.c.version + 1)
+        .returning(menu_version.c.version)
+    ).scalar()
+
+
+def read(connection):
+    return connection.execute(_read).scalar() or 0
+
+
+def _mark_menu_changed(session):
+    # Um incremento do contador por transação
+    if "menu_version" not in session.info:
+        session.info["menu_version"] = bump(session.connection())
+
+
+# Os únicos listeners de Session do cardápio: os módulos assinam via subscribe()
+@event.listens_for(Session, "after_flush")
+def _track_menu_changes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if getattr(obj, "__tablename__", None) in MENU_TABLES:
+            _mark_menu_changed(session)
+            _dispatch("on_flush", session)
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_menu_bulk_writes(orm_execute_state):
+    # INSERT/UPDATE/DELETE em massa via session.execute() não passam pelo flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.local_table.name in MENU_TABLES:
+            _mark_menu_changed(orm_execute_state.session)
+            _dispatch("on_bulk_write", orm_execute_state.session, mapper.local_table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_on_commit(session):
+    if "menu_version" in session.info:
+        _dispatch("on_commit", session, session.info.pop("menu_version"))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("menu_version", None)
+    _dispatch("on_rollback", session)
+
+
+class VersionWatcher:
+    # Uma query por PK a cada POLL_SECONDS; on_version(versão) decide se descarta o cache
+
+    def __init__(self, async_engine, on_version, interval=POLL_SECONDS):
+        self.async_engine = async_engine
+        self.on_version = on_version
+        self.interval = interval
+        self._task = None
+        self._failing = False
+        self.polls = 0
+        self.errors = 0
+
+    async def poll(self):
+        async with self.async_engine.connect() as conn:
+            version = (await conn.execute(_read)).scalar() or 0
+        self.polls += 1
+        return version
+
+    def start(self):
+        # O valor inicial do contador fica com quem cria o watcher (menu_cache.seed_shared_version)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.on_version(await self.poll())
+                self._failing = False
+            except Exception as e:
+                self.errors += 1
+                if not self._failing:  # loga só a primeira falha seguida
+                    logger.warning(f"Falha ao ler a versão do cardápio: {e}")
+                self._failing = True
+
+    def get_stats(self):
+        return {"interval": self.interval, "polls": self.polls, "errors": self.errors}
@@ -0,0 +1,213 @@
+import bisect
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Tempo por fase de cada requisição (Server-Timing) e histogramas por rota (/metrics).
+# Fases:
+#   db        tempo das queries no driver (eventos do Engine; vale para o async_engine)
+#   session   tempo com a sessão do get_db aberta
+#   render    montagem do HTML da página (fragmentos, abas, seções)
+#   serialize json.dumps das respostas da API
+#   app       tempo até os cabeçalhos da resposta
+# O cabeçalho Server-Timing sai com a resposta, então numa página transmitida em
+# streaming (cache frio) db/render acontecem depois dele; os histogramas registram
+# tudo no fim da requisição.
+#
+# Sem locks: tudo roda na thread do event loop, e cada observação é só um
+# bisect + incrementos de inteiros. Custo na casa de poucos microssegundos.
+
+# Limites dos buckets em segundos (mesmos para todas as fases)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ("db", "session", "render", "serialize")
+
+_current = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    __slots__ = ("phases", "queries")
+
+    def __init__(self):
+        self.phases = {}
+        self.queries = 0
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def header(self, app_seconds):
+        parts = []
+        for phase, seconds in self.phases.items():
+            part = f"{phase};dur={seconds * 1000:.2f}"
+            if phase == "db":
+                part += f';desc="{self.queries} queries"'
+            parts.append(part)
+        parts.append(f"app;dur={app_seconds * 1000:.2f}")
+        return ", ".join(parts).encode("latin-1")
+
+
+def record(phase, seconds):
+    timings = _current.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+class phase:
+    # with metrics.phase("render"): ...  (fora de uma requisição não faz nada)
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_start(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_end(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    starts = conn.info.get("query_start")
+    if timings is not None and starts:
+        timings.add("db", time.perf_counter() - starts.pop())
+        timings.queries += 1
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RouteStats:
+    __slots__ = ("duration", "phases", "statuses", "queries")
+
+    def __init__(self):
+        self.duration = Histogram()
+        self.phases = {name: Histogram() for name in PHASES}
+        self.statuses = {}
+        self.queries = 0
+
+
+_routes = {}  # (método, rota) -> RouteStats
+
+
+def route_name(scope):
+    # Template da rota ("/api/categories/{category_id}/products"), não o caminho:
+    # mantém a cardinalidade baixa
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def observe(method, route, status, seconds, timings):
+    stats = _routes.get((method, route))
+    if stats is None:
+        stats = _routes[(method, route)] = RouteStats()
+    stats.duration.observe(seconds)
+    for name, value in timings.phases.items():
+        histogram = stats.phases.get(name)
+        if histogram is None:
+            histogram = stats.phases[name] = Histogram()
+        histogram.observe(value)
+    stats.statuses[status] = stats.statuses.get(status, 0) + 1
+    stats.queries += timings.queries
+
+
+class TimingMiddleware:
+    # Middleware ASGI puro (sem BaseHTTPMiddleware, que custa uma task por requisição)
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        status = 500
+        streaming_events = False
+
+        async def send_with_timing(message):
+            nonlocal status, streaming_events
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", ()))
+                streaming_events = any(k == b"content-type" and v.startswith(b"text/event-stream") for k, v in headers)
+                headers.append((b"server-timing", timings.header(time.perf_counter() - start)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            # Conexões SSE duram minutos: entrariam no histograma como outliers
+            if not streaming_events:
+                observe(scope["method"], route_name(scope), status, time.perf_counter() - start, timings)
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+def _histogram_lines(name, histogram, labels):
+    cumulative = 0
+    for bound, count in zip((*BUCKETS, "+Inf"), histogram.counts):
+        cumulative += count
+        yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+    yield f"{name}_sum{{{labels}}} {histogram.sum:.6f}"
+    yield f"{name}_count{{{labels}}} {histogram.count}"
+
+
+def render(extra=()):
+    # Formato de exposição texto do Prometheus; extra: [(nome, tipo, ajuda, valor)]
+    routes = sorted(_routes.items())
+    lines = [
+        "# HELP http_request_duration_seconds Tempo total da requisição por rota",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), stats in routes:
+        lines.extend(_histogram_lines("http_request_duration_seconds", stats.duration, _labels(method=method, route=route)))
+
+    lines += [
+        "# HELP http_request_phase_seconds Tempo por fase (db, session, render, serialize)",
+        "# TYPE http_request_phase_seconds histogram",
+    ]
+    for (method, route), stats in routes:
+        for name, histogram in stats.phases.items():
+            if histogram.count:
+                lines.extend(_histogram_lines("http_request_phase_seconds", histogram,
+                                              _labels(method=method, route=route, phase=name)))
+
+    lines += ["# HELP http_requests_total Respostas por rota e status", "# TYPE http_requests_total counter"]
+    for (method, route), stats in routes:
+        for status, count in sorted(stats.statuses.items()):
+            lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+
+    lines += ["# HELP http_db_queries_total Queries executadas por rota", "# TYPE http_db_queries_total counter"]
+    for (method, route), stats in routes:
+        lines.append(f"http_db_queries_total{{{_labels(method=method, route=route)}}} {stats.queries}")
+
+    for name, kind, help_text, value in extra:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
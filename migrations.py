@@ -0,0 +1,192 @@
+import sys
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, insert, select, text
+
+from models import Base
+import menu_version
+
+# Migrações versionadas do schema (SQLite e Postgres).
+# Cada migração tem um número; a tabela schema_version guarda as já aplicadas.
+# No startup o app só consulta a versão (a tabela existe? MAX(version)) e só roda
+# upgrade() quando o banco está atrás — sem o create_all que refletia todas as
+# tabelas a cada boot.
+# Para aplicar manualmente: python migrations.py [status]
+#
+# As migrações são idempotentes (checam antes de criar), porque um banco novo já
+# nasce com o schema atual dos models na migração 1.
+
+MIGRATIONS = []
+
+schema_version = Table(
+    "schema_version", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String),
+    Column("applied_at", DateTime),
+)
+
+# Chave do pg_advisory_xact_lock: dois workers subindo juntos não migram ao mesmo tempo
+LOCK_KEY = 0x6361_6d70  # "camp"
+
+
+def migration(version, name):
+    def register(fn):
+        MIGRATIONS.append((version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+def _has_column(conn, table, column):
+    return column in {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def add_column(conn, table, column, ddl):
+    if not _has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def create_index(conn, name, table, columns, unique=False):
+    # IF NOT EXISTS funciona nos dois bancos
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(text(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+
+@migration(1, "initial_schema")
+def _initial_schema(conn):
+    tables = [Base.metadata.tables[name] for name in ("categories", "products", "orders")]
+    Base.metadata.create_all(conn, tables=tables)
+
+
+@migration(2, "products_is_available")
+def _products_is_available(conn):
+    # Antigo migrate_availability.py
+    add_column(conn, "products", "is_available", "BOOLEAN DEFAULT TRUE")
+
+
+@migration(3, "products_sub_category")
+def _products_sub_category(conn):
+    # Antigo migrate_sub_category.py
+    add_column(conn, "products", "sub_category", "VARCHAR")
+    create_index(conn, "ix_products_sub_category", "products", ["sub_category"])
+
+
+@migration(4, "order_items")
+def _order_items(conn):
+    # Antigo migrate_orders.py
+    add_column(conn, "orders", "public_id", "VARCHAR")
+    create_index(conn, "ix_orders_public_id", "orders", ["public_id"], unique=True)
+    Base.metadata.create_all(conn, tables=[Base.metadata.tables["order_items"]])
+
+
+@migration(5, "orders_status_created_at")
+def _orders_status_created_at(conn):
+    create_index(conn, "ix_orders_status_created_at", "orders", ["status", "created_at"])
+
+
+@migration(6, "products_category_available_sub")
+def _products_category_available_sub(conn):
+    create_index(conn, "ix_products_category_available_sub", "products", ["category_id", "is_available", "sub_category"])
+
+
+# Ordem fixa que o código usava antes da coluna display_order
+LEGACY_CATEGORY_ORDER = {"Espetinho": 1, "Bebidas": 2, "Acompanhamentos": 3, "Drinks": 4}
+
+
+@migration(7, "display_order")
+def _display_order(conn):
+    add_column(conn, "categories", "display_order", "INTEGER DEFAULT 0")
+    add_column(conn, "products", "display_order", "INTEGER DEFAULT 0")
+    # Preserva a ordem atual da página: categorias pela ordem antiga, o resto depois;
+    # produtos pelo id, numerados 1..n dentro de cada categoria (como o menu_sync grava)
+    conn.execute(text("UPDATE categories SET display_order = 100 + id"))
+    for name, position in LEGACY_CATEGORY_ORDER.items():
+        conn.execute(text("UPDATE categories SET display_order = :position WHERE name = :name"),
+                     {"position": position, "name": name})
+    conn.execute(text(
+        "UPDATE products SET display_order = ("
+        " SELECT ranked.position FROM ("
+        "  SELECT id, ROW_NUMBER() OVER (PARTITION BY category_id ORDER BY id) AS position FROM products"
+        " ) ranked WHERE ranked.id = products.id)"
+    ))
+
+
+@migration(8, "menu_version")
+def _menu_version(conn):
+    # Contador compartilhado entre workers para invalidar o cache do cardápio
+    menu_version.menu_version.create(conn, checkfirst=True)
+    if conn.execute(select(menu_version.menu_version.c.id)).first() is None:
+        conn.execute(insert(menu_version.menu_version).values(id=menu_version.ROW_ID, version=0))
+
+
+LATEST_VERSION = max(version for version, _, _ in MIGRATIONS)
+
+
+def current_version(conn):
+    # 0 quando a tabela de versão ainda não existe. Qualquer outro erro (conexão,
+    # permissão, tabela corrompida) sobe: tratar como banco vazio faria o startup
+    # rodar todas as migrações por cima de um banco que já tem dados
+    if not inspect(conn).has_table(schema_version.name):
+        return 0
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def upgrade(conn):
+    # Roda dentro de uma transação (engine.begin()); devolve as migrações aplicadas
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LOCK_KEY})
+    schema_version.create(conn, checkfirst=True)
+
+    current = conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    applied = []
+    for version, name, fn in MIGRATIONS:
+        if version <= current:
+            continue
+        fn(conn)
+        conn.execute(insert(schema_version).values(version=version, name=name, applied_at=datetime.utcnow()))
+        applied.append((version, name))
+    return applied
+
+
+def require_current(engine):
+    # Ferramentas de linha de comando (menu.py, link_images.py): só o app migra
+    # sozinho no startup; aqui um banco atrasado vira uma mensagem clara em vez de
+    # um OperationalError de coluna inexistente no meio do comando
+    with engine.connect() as conn:
+        version = current_version(conn)
+    if version < LATEST_VERSION:
+        raise SystemExit(f"❌ Schema do banco na versão {version} (esperada {LATEST_VERSION}). "
+                         f"Rode python migrations.py primeiro.")
+
+
+async def ensure_current(async_engine):
+    # Startup: uma query quando o schema está em dia
+    async with async_engine.connect() as conn:
+        version = await conn.run_sync(current_version)
+    if version >= LATEST_VERSION:
+        return []
+    async with async_engine.begin() as conn:
+        return await conn.run_sync(upgrade)
+
+
+def main(argv):
+    from database import engine
+
+    if argv and argv[0] == "status":
+        with engine.connect() as conn:
+            version = current_version(conn)
+        print(f"Schema na versão {version} (última: {LATEST_VERSION})")
+        for number, name, _ in MIGRATIONS:
+            print(f"  {'✔' if number <= version else ' '} {number:03d} {name}")
+        return 0
+
+    with engine.begin() as conn:
+        applied = upgrade(conn)
+    for number, name in applied:
+        print(f"Aplicada {number:03d} {name}")
+    print("Schema atualizado." if applied else "Nada a migrar.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -8,6 +8,7 @@ class Category(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
+    display_order = Column(Integer, default=0) # posição da aba na página (PUT /admin/categories/order)
     
     products = relationship("Product", back_populates="category")
 
@@ -22,9 +23,13 @@ class Product(Base):
     image_url = Column(String, nullable=True)
     is_available = Column(Boolean, default=True)
     sub_category = Column(String, nullable=True, index=True) # e.g., 'Cervejas', 'Refrigerantes', 'Águas'
+    display_order = Column(Integer, default=0) # posição dentro da categoria
 
     category = relationship("Category", back_populates="products")
 
+    # Cardápio por categoria, com filtro de disponibilidade/subcategoria sem varrer a tabela
+    __table_args__ = (Index("ix_products_category_available_sub", "category_id", "is_available", "sub_category"),)
+
 class Order(Base):
     __tablename__ = "orders"
 
@@ -34,3 +39,22 @@ class Order(Base):
     total_amount = Column(Float)
     status = Column(String, default="Pendente") # Pendente, Preparando, Pronto, Entregue
     created_at = Column(DateTime, default=datetime.utcnow)
+    public_id = Column(String, unique=True, index=True) # gerado na entrada do pedido, antes do INSERT
+
+    items = relationship("OrderItem", back_populates="order")
+
+    # Painel da cozinha: pedidos em aberto por status, em ordem de chegada
+    __table_args__ = (Index("ix_orders_status_created_at", "status", "created_at"),)
+
+class OrderItem(Base):
+    __tablename__ = "order_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
+    product_id = Column(Integer, ForeignKey("products.id"))
+    quantity = Column(Integer)
+    unit_price = Column(Float) # preço no momento do pedido
+    notes = Column(String, nullable=True)
+
+    order = relationship("Order", back_populates="items")
+    product = relationship("Product")
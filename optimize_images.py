@@ -0,0 +1,176 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import unicodedata
+
+from PIL import Image, ImageOps
+
+from image_variants import FORMATS, IMAGES_DIR, MANIFEST_PATH, STATIC_PREFIX, VARIANTS_DIR, load_manifest
+from link_images import IMAGE_EXTENSIONS, link_images
+
+# Gera variantes responsivas (AVIF/WebP em algumas larguras) de cada imagem em
+# images/ (subpastas por loja inclusive), com hash do conteúdo no nome do arquivo,
+# e grava o manifesto usado pelo render dos cards (srcset/sizes).
+# Uso: python optimize_images.py [--link] [--force]
+
+WIDTHS = (320, 640, 960)
+FALLBACK_WIDTH = 640
+QUALITY = {"avif": 55, "webp": 78}
+FAVICON = "Favicon.png"
+ICON_SIZES = (32, 180)
+
+
+def file_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def slugify(name: str) -> str:
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "img"
+
+
+def write_variant(image, slug, width, fmt):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), quality=QUALITY.get(fmt, 80))
+    data = buffer.getvalue()
+    filename = f"{slug}-{width}.{file_hash(data)}.{fmt}"
+    with open(os.path.join(VARIANTS_DIR, filename), "wb") as f:
+        f.write(data)
+    return {"width": width, "url": f"{STATIC_PREFIX}images/variants/{filename}", "bytes": len(data)}
+
+
+def resize(image, width):
+    if width >= image.width:
+        return image
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def image_files(root=IMAGES_DIR):
+    # Caminhos relativos ("loja/foto.jpg"), em ordem, sem a pasta das variantes
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d != os.path.basename(VARIANTS_DIR))
+        for filename in sorted(filenames):
+            if not filename.startswith(".") and filename.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, "/")
+
+
+def build_variants(path, rel, source_hash):
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    # Slug do caminho relativo: fotos de mesmo nome em lojas diferentes não se confundem
+    slug = slugify(os.path.splitext(rel)[0])
+
+    # Nunca amplia: larguras maiores que o original viram uma única variante do tamanho real
+    widths = sorted({min(w, image.width) for w in WIDTHS})
+    formats = {}
+    for fmt in FORMATS:
+        formats[fmt] = [write_variant(resize(image, w), slug, w, fmt) for w in widths]
+
+    fallback_width = min(FALLBACK_WIDTH, widths[-1])
+    fallback = next(v["url"] for v in formats["webp"] if v["width"] == fallback_width)
+    return {
+        "source": path.replace(os.sep, "/"),
+        "source_hash": source_hash,
+        "width": image.width,
+        "height": image.height,
+        "fallback": fallback,
+        "formats": formats,
+    }
+
+
+def build_icons(path):
+    with Image.open(path) as original:
+        image = original.convert("RGBA")
+    icons = {}
+    for size in ICON_SIZES:
+        icon = ImageOps.contain(image, (size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        icon.save(buffer, format="PNG", optimize=True)
+        data = buffer.getvalue()
+        filename = f"favicon-{size}.{file_hash(data)}.png"
+        with open(os.path.join(VARIANTS_DIR, filename), "wb") as f:
+            f.write(data)
+        icons[str(size)] = f"{STATIC_PREFIX}images/variants/{filename}"
+    return icons
+
+
+def variant_files(entry):
+    for variants in entry["formats"].values():
+        for v in variants:
+            yield os.path.basename(v["url"])
+
+
+def is_up_to_date(entry, source_hash):
+    if entry is None or entry.get("source_hash") != source_hash:
+        return False
+    return all(os.path.exists(os.path.join(VARIANTS_DIR, name)) for name in variant_files(entry))
+
+
+def optimize_images(force=False):
+    if not os.path.exists(IMAGES_DIR):
+        print("Pasta 'images' não encontrada.")
+        return
+    os.makedirs(VARIANTS_DIR, exist_ok=True)
+
+    manifest = load_manifest()
+    old_images = manifest.get("images", {})
+    images = {}
+    icons = manifest.get("icons", {})
+    generated = skipped = 0
+
+    for rel in image_files():
+        path = os.path.join(IMAGES_DIR, rel)
+        with open(path, "rb") as f:
+            source_hash = file_hash(f.read())
+
+        if rel == FAVICON:
+            if force or manifest.get("favicon_hash") != source_hash:
+                icons = build_icons(path)
+                manifest["favicon_hash"] = source_hash
+                print(f"Ícones gerados para '{rel}'")
+            continue
+
+        # Mesma chave que Product.image_url ("/static/images/loja/foto.jpg")
+        image_url = f"{STATIC_PREFIX}images/{rel}"
+        entry = old_images.get(image_url)
+        if not force and is_up_to_date(entry, source_hash):
+            images[image_url] = entry
+            skipped += 1
+            continue
+
+        images[image_url] = build_variants(path, rel, source_hash)
+        generated += 1
+        original_size = os.path.getsize(path)
+        smallest = min(v["bytes"] for v in images[image_url]["formats"]["avif"])
+        print(f"Variantes de '{rel}': {original_size // 1024} KB -> a partir de {smallest // 1024} KB")
+
+    manifest["images"] = images
+    manifest["icons"] = icons
+
+    # Remove variantes que não são mais referenciadas (imagem apagada ou alterada)
+    referenced = {name for entry in images.values() for name in variant_files(entry)}
+    referenced.update(os.path.basename(url) for url in icons.values())
+    referenced.add(os.path.basename(MANIFEST_PATH))
+    for name in os.listdir(VARIANTS_DIR):
+        if name not in referenced:
+            os.remove(os.path.join(VARIANTS_DIR, name))
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"Concluído: {generated} imagens processadas, {skipped} sem alterações.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera variantes responsivas das imagens do cardápio")
+    parser.add_argument("--link", action="store_true", help="vincula as imagens aos produtos antes (link_images.py)")
+    parser.add_argument("--force", action="store_true", help="regera todas as variantes")
+    args = parser.parse_args()
+
+    if args.link:
+        link_images()
+    optimize_images(force=args.force)
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import logging
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, OperationalError
+
+from database import async_engine
+from models import Order, OrderItem
+
+# Escrita dos pedidos em lote.
+# POST /orders só valida e enfileira; uma task em background drena a fila e grava
+# tudo o que acumulou numa única transação (INSERT multi-linha em orders e em
+# order_items). Sob rajada, o lote cresce sozinho enquanto o anterior é gravado,
+# então o número de commits no pooler fica baixo mesmo com centenas de pedidos/s.
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+MAX_PENDING = 10_000
+RETRY_DELAYS = (0.5, 1, 2, 5)
+MAX_REJECTED = 1000  # ids de pedidos recusados lembrados para o GET /orders/{id}
+
+
+def is_transient(error):
+    # Banco fora do ar, conexão derrubada, timeout: vale tentar de novo
+    if isinstance(error, DBAPIError):
+        return isinstance(error, OperationalError) or error.connection_invalidated
+    return isinstance(error, (OSError, TimeoutError))
+
+
+class OrderWriter:
+    def __init__(self, engine=async_engine):
+        self._engine = engine
+        self._queue = None
+        self._task = None
+        self._stopping = False
+        self._pending = {}  # public_id -> pedido ainda não gravado
+        self._rejected = {}  # public_id -> motivo (erro não transitório do banco)
+        self._listeners = []
+        self.written = 0
+        self.batches = 0
+        self.failed_attempts = 0
+        self.rejected = 0
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=MAX_PENDING)
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Encerra depois de gravar o que já está na fila
+        if self._task is None:
+            return
+        self._stopping = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def add_listener(self, callback):
+        # callback(pedidos) chamado após cada commit, com os ids do banco preenchidos
+        self._listeners.append(callback)
+
+    def submit(self, order, items):
+        # Levanta asyncio.QueueFull quando o banco não está dando conta
+        if self._queue is None or self._stopping:
+            raise asyncio.QueueFull
+        self._queue.put_nowait((order, items))
+        self._pending[order["public_id"]] = (order, items)
+
+    def pending(self, public_id):
+        return self._pending.get(public_id)
+
+    async def _run(self):
+        while True:
+            entry = await self._queue.get()
+            batch = [] if entry is None else [entry]
+            # Leva junto tudo o que chegou enquanto o lote anterior era gravado
+            while entry is not None and len(batch) < BATCH_SIZE and not self._queue.empty():
+                entry = self._queue.get_nowait()
+                if entry is not None:
+                    batch.append(entry)
+            if batch:
+                await self._write_with_retry(batch)
+            if entry is None:
+                return
+
+    async def _write_with_retry(self, batch):
+        attempt = 0
+        while True:
+            try:
+                orders = await self._write(batch)
+                break
+            except Exception as e:
+                self.failed_attempts += 1
+                if not is_transient(e):
+                    # Erro do próprio pedido (IntegrityError, DataError...): repetir não
+                    # adianta, e o lote não pode travar a fila. Grava um a um e
+                    # rejeita só os pedidos que falham sozinhos
+                    if len(batch) > 1:
+                        logger.warning(f"Lote de {len(batch)} pedidos recusado ({e}); gravando um a um")
+                        for entry in batch:
+                            await self._write_with_retry([entry])
+                    else:
+                        self._reject(batch[0], e)
+                    return
+                if self._stopping and attempt >= len(RETRY_DELAYS):
+                    # Desligando sem banco: registra os pedidos no log para recuperação manual
+                    logger.error(f"❌ {len(batch)} pedidos não gravados: {e}")
+                    for order, items in batch:
+                        logger.error("pedido perdido: " + json.dumps({"order": order, "items": items}, default=str))
+                        self._pending.pop(order["public_id"], None)
+                    return
+                delay = RETRY_DELAYS[min(attempt, len(RETRY_DELAYS) - 1)]
+                logger.warning(f"Falha ao gravar lote de {len(batch)} pedidos ({e}); nova tentativa em {delay}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+
+        for order in orders:
+            self._pending.pop(order["public_id"], None)
+        self.written += len(orders)
+        self.batches += 1
+        for callback in self._listeners:
+            try:
+                callback(orders)
+            except Exception as e:
+                logger.error(f"Erro no listener de pedidos: {e}")
+
+    def _reject(self, entry, error):
+        # Dead-letter no log (o pedido inteiro, para recuperação manual); GET /orders/{id}
+        # passa a responder que o pedido foi recusado em vez de "pendente"
+        order, items = entry
+        self.rejected += 1
+        logger.error(f"❌ Pedido {order['public_id']} recusado pelo banco: {error}")
+        logger.error("pedido rejeitado: " + json.dumps({"order": order, "items": items}, default=str))
+        self._pending.pop(order["public_id"], None)
+        self._rejected[order["public_id"]] = str(getattr(error, "orig", None) or error)
+        while len(self._rejected) > MAX_REJECTED:
+            self._rejected.pop(next(iter(self._rejected)))
+
+    def rejected_reason(self, public_id):
+        return self._rejected.get(public_id)
+
+    async def _write(self, batch):
+        async with self._engine.begin() as conn:
+            result = await conn.execute(
+                insert(Order.__table__).returning(Order.id, Order.public_id),
+                [order for order, _ in batch],
+            )
+            ids = {public_id: order_id for order_id, public_id in result.all()}
+
+            item_rows = [
+                {**item, "order_id": ids[order["public_id"]]}
+                for order, items in batch
+                for item in items
+            ]
+            await conn.execute(insert(OrderItem.__table__), item_rows)
+
+        return [{**order, "id": ids[order["public_id"]], "items": items} for order, items in batch]
+
+    def get_stats(self):
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "pending": len(self._pending),
+            "written": self.written,
+            "batches": self.batches,
+            "avg_batch": round(self.written / self.batches, 1) if self.batches else 0,
+            "failed_attempts": self.failed_attempts,
+            "rejected": self.rejected,
+        }
+
+
+writer = OrderWriter()
@@ -0,0 +1,130 @@
+import asyncio
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from database import get_db
+from models import Order, Product
+import menu_cache
+import order_writer
+
+# Entrada de pedidos (POST /orders).
+# A rota valida contra um catálogo em memória (preço/disponibilidade, recarregado
+# só quando a versão do menu muda), gera o id público e enfileira o pedido no
+# order_writer; a resposta sai sem esperar o INSERT.
+
+router = APIRouter()
+
+
+class OrderItemIn(BaseModel):
+    product_id: int
+    quantity: int = Field(gt=0, le=100)
+    notes: Optional[str] = Field(default=None, max_length=200)
+
+
+class OrderIn(BaseModel):
+    customer_name: str = Field(min_length=1, max_length=100)
+    customer_phone: str = Field(min_length=1, max_length=30)
+    items: List[OrderItemIn] = Field(min_length=1, max_length=50)
+
+
+# Catálogo {product_id: (nome, preço, disponível)} da versão atual do menu
+_catalog = {"version": None, "products": {}}
+
+
+def catalog_query():
+    return select(Product.id, Product.name, Product.price, Product.is_available)
+
+
+def order_query(public_id):
+    return select(Order).where(Order.public_id == public_id).options(selectinload(Order.items))
+
+
+async def load_catalog(db: AsyncSession):
+    version = menu_cache.current_version()
+    if _catalog["version"] != version:
+        rows = await db.execute(catalog_query())
+        _catalog["products"] = {row.id: (row.name, row.price, bool(row.is_available)) for row in rows}
+        _catalog["version"] = version
+    return _catalog["products"]
+
+
+def product_name(product_id):
+    product = _catalog["products"].get(product_id)
+    return product[0] if product else None
+
+
+def order_to_dict(order, items):
+    return {
+        "id": order["public_id"],
+        "customer_name": order["customer_name"],
+        "status": order["status"],
+        "total_amount": order["total_amount"],
+        "created_at": order["created_at"].isoformat(),
+        "items": [
+            {"product_id": i["product_id"], "quantity": i["quantity"], "unit_price": i["unit_price"], "notes": i["notes"]}
+            for i in items
+        ],
+    }
+
+
+@router.post("/orders", status_code=202)
+async def create_order(payload: OrderIn, db: AsyncSession = Depends(get_db)):
+    catalog = await load_catalog(db)
+
+    items = []
+    total = 0.0
+    for item in payload.items:
+        product = catalog.get(item.product_id)
+        if product is None:
+            raise HTTPException(status_code=400, detail=f"Produto inválido: {item.product_id}")
+        name, price, is_available = product
+        if not is_available:
+            raise HTTPException(status_code=409, detail=f"Produto indisponível: {name}")
+        items.append({"product_id": item.product_id, "quantity": item.quantity, "unit_price": price, "notes": item.notes})
+        total += price * item.quantity
+
+    order = {
+        "public_id": uuid.uuid4().hex,
+        "customer_name": payload.customer_name,
+        "customer_phone": payload.customer_phone,
+        "total_amount": round(total, 2),
+        "status": "Pendente",
+        "created_at": datetime.utcnow(),
+    }
+    try:
+        order_writer.writer.submit(order, items)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Muitos pedidos no momento, tente novamente",
+                            headers={"Retry-After": "2"})
+    return order_to_dict(order, items)
+
+
+@router.get("/orders/{public_id}")
+async def get_order(public_id: str, db: AsyncSession = Depends(get_db)):
+    pending = order_writer.writer.pending(public_id)
+    if pending is not None:
+        return order_to_dict(*pending)
+
+    order = await db.scalar(order_query(public_id))
+    if not order:
+        rejected = order_writer.writer.rejected_reason(public_id)
+        if rejected is not None:
+            raise HTTPException(status_code=409, detail=f"Pedido não pôde ser gravado: {rejected}")
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order_to_dict(
+        {c: getattr(order, c) for c in ("public_id", "customer_name", "status", "total_amount", "created_at")},
+        [{"product_id": i.product_id, "quantity": i.quantity, "unit_price": i.unit_price, "notes": i.notes}
+         for i in order.items],
+    )
+
+
+@router.get("/admin/orders/stats")
+async def order_writer_stats():
+    return order_writer.writer.get_stats()
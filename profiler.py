@@ -0,0 +1,205 @@
+import asyncio
+import collections
+import hmac
+import os
+import sys
+import threading
+import time
+
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+# Profiler sob demanda do processo em produção, só com a stdlib.
+#   POST /admin/profile/sample?seconds=5        amostra todas as threads (sys._current_frames)
+#   POST /admin/profile/requests?path=/&count=20 perfila as próximas N requisições (sys.setprofile)
+# Ambos devolvem stacks no formato "collapsed" (frame;frame;frame valor), pronto
+# para flamegraph.pl, speedscope ou inferno. Na amostragem o valor é o número de
+# amostras; no modo por requisição, microssegundos de tempo próprio.
+#
+# Desligado por padrão: as rotas respondem 404 sem PROFILER_ENABLED=1 e um
+# PROFILER_TOKEN, que cada chamada manda no cabeçalho X-Profiler-Token (os stacks
+# expõem o código e o perfil pesa no processo inteiro). Desarmado, o custo no
+# caminho da requisição é uma checagem de variável global.
+# No modo por requisição o sys.setprofile vale para a thread do event loop
+# inteira enquanto houver uma requisição perfilada em andamento, então
+# requisições concorrentes de outras rotas também aparecem no resultado.
+
+ENABLED = os.getenv("PROFILER_ENABLED", "").lower() in ("1", "true", "yes")
+TOKEN = os.getenv("PROFILER_TOKEN", "")
+MAX_SECONDS = 60
+DEFAULT_INTERVAL = 0.005
+MAX_DEPTH = 128
+
+router = APIRouter(prefix="/admin/profile")
+
+_busy = threading.Lock()  # um profiling por vez
+_armed = None  # RequestProfile aguardando/perfilando requisições
+
+
+def frame_label(code):
+    # "arquivo.py:função:linha", sem ';' nem espaços (separadores do formato collapsed)
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{name}:{code.co_firstlineno}".replace(";", ",").replace(" ", "_")
+
+
+def builtin_label(func):
+    module = getattr(func, "__module__", None) or "builtins"
+    name = getattr(func, "__qualname__", None) or repr(func)
+    return f"{module}:{name}".replace(";", ",").replace(" ", "_")
+
+
+def collapsed(counts):
+    lines = [f"{';'.join(stack)} {int(value)}" for stack, value in counts.most_common() if value >= 1]
+    return "\n".join(lines) + "\n"
+
+
+def sample_threads(seconds, interval=DEFAULT_INTERVAL):
+    # Roda numa thread própria: lê o frame atual de cada thread a cada intervalo
+    counts = collections.Counter()
+    own = threading.get_ident()
+    deadline = time.monotonic() + seconds
+    samples = 0
+    while time.monotonic() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(f"thread:{names.get(ident, ident)}".replace(" ", "_"))
+            counts[tuple(reversed(stack))] += 1
+        samples += 1
+        time.sleep(interval)
+    return counts, samples
+
+
+class RequestProfile:
+    # Perfil determinístico (sys.setprofile) das próximas N requisições para um caminho
+
+    def __init__(self, path, count):
+        self.path = path
+        self.remaining = count
+        self.active = 0
+        self.profiled = 0
+        self.stack = []  # [frame, builtin?, rótulo, início, tempo dos filhos]
+        self.totals = collections.Counter()
+        self.done = asyncio.Event()
+
+    def _unwind_to(self, frame):
+        # Trocas de greenlet (AsyncSession) e frames que entraram antes do profiler
+        # quebram o aninhamento call/return: descarta o que não é ancestral do frame
+        stack = self.stack
+        while stack and stack[-1][0] is not frame:
+            stack.pop()
+
+    def _pop(self, now):
+        entry = self.stack.pop()
+        elapsed = now - entry[3]
+        self.totals[tuple(e[2] for e in self.stack) + (entry[2],)] += (elapsed - entry[4]) * 1e6
+        if self.stack:
+            self.stack[-1][4] += elapsed
+
+    def _callback(self, frame, event, arg):
+        now = time.perf_counter()
+        stack = self.stack
+        if event == "call":
+            self._unwind_to(frame.f_back)
+            stack.append([frame, False, frame_label(frame.f_code), now, 0.0])
+        elif event == "c_call":
+            self._unwind_to(frame)
+            stack.append([frame, True, builtin_label(arg), now, 0.0])
+        elif event == "return":
+            for index in range(len(stack) - 1, -1, -1):
+                if stack[index][0] is frame and not stack[index][1]:
+                    del stack[index + 1:]
+                    self._pop(now)
+                    break
+        elif stack and stack[-1][1] and stack[-1][0] is frame:  # c_return / c_exception
+            self._pop(now)
+
+    def begin(self):
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        self.active += 1
+        if self.active == 1:
+            sys.setprofile(self._callback)
+        return True
+
+    def end(self):
+        self.active -= 1
+        self.profiled += 1
+        if self.active == 0:
+            sys.setprofile(None)
+            self.stack.clear()
+            if self.remaining <= 0:
+                self.done.set()
+
+
+class ProfileMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        profile = _armed
+        if profile is None or scope["type"] != "http" or scope["path"] != profile.path or not profile.begin():
+            return await self.app(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.end()
+
+
+def require_admin(token):
+    if not ENABLED or not TOKEN:
+        raise HTTPException(status_code=404, detail="Profiler desativado (defina PROFILER_ENABLED=1 e PROFILER_TOKEN)")
+    if not hmac.compare_digest((token or "").encode("utf-8"), TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Token do profiler inválido")
+    if not _busy.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="Já existe um profiling em andamento")
+
+
+def collapsed_response(counts, filename, **headers):
+    return PlainTextResponse(collapsed(counts), headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store",
+        **{f"X-Profile-{key.title()}": str(value) for key, value in headers.items()},
+    })
+
+
+@router.post("/sample")
+async def profile_sample(seconds: float = 5.0, interval: float = DEFAULT_INTERVAL,
+                         x_profiler_token: Optional[str] = Header(default=None)):
+    seconds = min(max(seconds, 0.1), MAX_SECONDS)
+    interval = max(interval, 0.001)
+    require_admin(x_profiler_token)
+    # A amostragem roda numa thread; o event loop segue atendendo (e aparece nas amostras).
+    # Se o cliente desconectar, a thread segue até o fim: o lock só é liberado quando
+    # ela termina, senão uma segunda amostragem rodaria junto com a primeira
+    sampling = asyncio.ensure_future(asyncio.to_thread(sample_threads, seconds, interval))
+    sampling.add_done_callback(lambda _: _busy.release())
+    counts, samples = await asyncio.shield(sampling)
+    return collapsed_response(counts, "profile-sample.collapsed", samples=samples, seconds=seconds)
+
+
+@router.post("/requests")
+async def profile_requests(path: str = "/", count: int = 10, timeout: float = 30.0,
+                           x_profiler_token: Optional[str] = Header(default=None)):
+    global _armed
+    require_admin(x_profiler_token)
+    profile = RequestProfile(path, min(max(count, 1), 1000))
+    try:
+        _armed = profile
+        try:
+            await asyncio.wait_for(profile.done.wait(), timeout=min(timeout, MAX_SECONDS))
+        except asyncio.TimeoutError:
+            pass  # devolve o que foi coletado até aqui
+    finally:
+        _armed = None
+        profile.remaining = 0
+        _busy.release()
+    return collapsed_response(profile.totals, "profile-requests.collapsed", requests=profile.profiled, unit="us")
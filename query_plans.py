@@ -0,0 +1,59 @@
+from sqlalchemy import select
+
+from models import Order, OrderItem, Product
+import api
+import kitchen
+import menu_data
+import orders
+
+# Auditoria dos planos de execução (python menu.py explain [--analyze]).
+# Lista as queries que o app emite, montadas pelas mesmas funções usadas nas
+# rotas, e imprime o EXPLAIN do banco configurado. Varreduras completas e
+# ordenações em tabela temporária são destacadas para aparecerem no review
+# quando o catálogo ou o histórico de pedidos crescerem.
+
+
+def audited_queries():
+    return [
+        ("cardápio (página / e /api/menu)", menu_data.menu_query()),
+        ("cardápio só disponíveis (/api/menu?available=true)", menu_data.menu_query(available=True)),
+        ("produtos da categoria (/api/categories/{id}/products)", api.category_products_query(1, available=True)),
+        ("catálogo de preços (POST /orders)", orders.catalog_query()),
+        ("pedido por id público (GET /orders/{id})", orders.order_query("0" * 32)),
+        ("itens dos pedidos (selectinload)", select(OrderItem).where(OrderItem.order_id.in_([1, 2, 3]))),
+        ("cozinha: pedidos em aberto (GET /kitchen/orders)", kitchen.open_orders_query()),
+        ("cozinha: status atual (409)", select(Order.status).where(Order.id == 1)),
+        ("admin: lote por subcategoria (PATCH /admin/products)",
+         select(Product.id, Product.name, Product.is_available, Product.price).where(Product.sub_category == "Cervejas")),
+    ]
+
+
+WARNING_MARKERS = ("SCAN ", "Seq Scan", "TEMP B-TREE", "Sort  ")
+
+
+def explain(conn, statement, analyze=False):
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql).all()
+        plan = [row[-1] for row in rows]
+    else:
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+        plan = [row[0] for row in conn.exec_driver_sql(prefix + sql).all()]
+    return sql, plan
+
+
+def print_report(engine, analyze=False, show_sql=False):
+    warnings = 0
+    with engine.connect() as conn:
+        print(f"Banco: {conn.dialect.name}")
+        for name, statement in audited_queries():
+            sql, plan = explain(conn, statement, analyze)
+            print(f"\n== {name}")
+            if show_sql:
+                print(sql)
+            for line in plan:
+                flagged = any(marker in line for marker in WARNING_MARKERS)
+                warnings += flagged
+                print(f"  {'⚠' if flagged else ' '} {line}")
+    print(f"\n{warnings} linha(s) com varredura completa ou ordenação temporária.")
+    return warnings
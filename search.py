@@ -0,0 +1,306 @@
+import asyncio
+import bisect
+import collections
+import heapq
+
+from starlette.concurrency import run_in_threadpool
+
+from models import Category, Product
+import menu_cache
+import menu_data
+import menu_version
+from text_match import fold, trigrams
+
+# Índice de busca de produtos em memória (GET /api/search?q=).
+# Cada produto vira tokens sem acento (nome, subcategoria, categoria, descrição,
+# com pesos diferentes); o vocabulário é indexado por trigramas de caracteres
+# para tolerar erros de digitação ("heiniken" -> "heineken") e em uma lista
+# ordenada para prefixos (busca enquanto digita). A consulta não vai ao banco.
+#
+# Atualização: commits que só tocam produtos pelo ORM (toggle, edição) são
+# aplicados no índice na hora, produto a produto. UPDATE/DELETE em massa,
+# mudanças de categoria ou de outro worker deixam o índice atrás da versão do
+# menu (menu_cache) e ele é reconstruído na próxima busca, com uma query.
+
+FIELD_WEIGHTS = (("name", 1.0), ("sub_category", 0.6), ("category", 0.5), ("description", 0.3))
+MIN_SIMILARITY = 0.3
+PREFIX_SIMILARITY = 0.85
+MAX_CANDIDATES = 20  # tokens do vocabulário aproveitados por termo da busca (os mais parecidos)
+MAX_COMBINATIONS = 200  # combinações de grupos examinadas numa busca com vários termos
+MIN_SCORE = 0.15  # corta casamentos fracos (ex.: termo parecido só na descrição)
+STOPWORDS = frozenset({"a", "o", "as", "os", "e", "de", "da", "do", "das", "dos", "com", "sem", "em", "no", "na", "um", "uma"})
+
+def tokenize(text):
+    return [token for token in fold(text).split() if token not in STOPWORDS]
+
+
+class SearchIndex:
+    def __init__(self):
+        self.version = None  # versão do menu_cache refletida no índice
+        self.docs = {}  # product_id -> dict (PRODUCT_FIELDS)
+        self.categories = {}  # category_id -> nome
+        self.unavailable = set()
+        self._product_tokens = {}  # product_id -> {token: peso}
+        # token -> {peso: {product_id: None}}; agrupar por peso deixa a pontuação
+        # de um termo em operações de dict/set feitas em C
+        self._postings = {}
+        self._trigrams = collections.defaultdict(set)  # trigrama -> tokens do vocabulário
+        self._vocabulary = []  # tokens ordenados (prefixos)
+
+    # --- manutenção ---
+
+    def _doc_tokens(self, doc):
+        weights = {}
+        texts = {"category": self.categories.get(doc["category_id"]), **doc}
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(texts.get(field)):
+                if weight > weights.get(token, 0.0):
+                    weights[token] = weight
+        return weights
+
+    def _add_doc(self, doc):
+        self.docs[doc["id"]] = doc
+        if not doc["is_available"]:
+            self.unavailable.add(doc["id"])
+        tokens = self._doc_tokens(doc)
+        self._product_tokens[doc["id"]] = tokens
+        new_tokens = []
+        for token, weight in tokens.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                new_tokens.append(token)
+            postings.setdefault(weight, {})[doc["id"]] = None
+        return new_tokens
+
+    def _index_token(self, token):
+        for gram in trigrams(token):
+            self._trigrams[gram].add(token)
+
+    def _drop_token(self, token):
+        del self._postings[token]
+        for gram in trigrams(token):
+            tokens = self._trigrams.get(gram)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._trigrams[gram]
+        index = bisect.bisect_left(self._vocabulary, token)
+        if index < len(self._vocabulary) and self._vocabulary[index] == token:
+            del self._vocabulary[index]
+
+    def remove(self, product_id):
+        self.docs.pop(product_id, None)
+        self.unavailable.discard(product_id)
+        for token, weight in self._product_tokens.pop(product_id, {}).items():
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            ids = postings.get(weight)
+            if ids is not None:
+                ids.pop(product_id, None)
+                if not ids:
+                    del postings[weight]
+            if not postings:
+                self._drop_token(token)
+
+    def upsert(self, doc):
+        self.remove(doc["id"])
+        for token in self._add_doc(doc):
+            self._index_token(token)
+            bisect.insort(self._vocabulary, token)
+
+    @classmethod
+    def build(cls, categories, docs, version):
+        self = cls()
+        self.categories = dict(categories)
+        for doc in docs:
+            self._add_doc(doc)
+        for token in self._postings:
+            self._index_token(token)
+        self._vocabulary = sorted(self._postings)
+        self.version = version
+        return self
+
+    # --- consulta ---
+
+    def _similar_tokens(self, term):
+        # {token do vocabulário: similaridade} para um termo da busca
+        found = {}
+        if term in self._postings:
+            found[term] = 1.0
+        start = bisect.bisect_left(self._vocabulary, term)
+        for token in self._vocabulary[start:start + MAX_CANDIDATES]:
+            if not token.startswith(term):
+                break
+            found.setdefault(token, PREFIX_SIMILARITY)
+        if len(term) < 3 or term.isdigit():
+            return found  # números (tamanhos, códigos) só casam exato ou por prefixo
+
+        grams = trigrams(term)
+        overlap = collections.Counter()
+        for gram in grams:
+            tokens = self._trigrams.get(gram)
+            if tokens:
+                overlap.update(tokens)
+        scored = []
+        for token, shared in overlap.items():
+            # Jaccard dos trigramas; |trigramas(token)| = len(token) + 1
+            similarity = shared / (len(grams) + len(token) + 1 - shared)
+            if similarity >= MIN_SIMILARITY:
+                scored.append((similarity, token))
+        for similarity, token in sorted(scored, reverse=True)[:MAX_CANDIDATES]:
+            if similarity > found.get(token, 0.0):
+                found[token] = similarity
+        return found
+
+    def _term_groups(self, term):
+        # [(pontuação, {product_id: None})] da maior pontuação para a menor. Um
+        # produto pode aparecer em mais de um grupo; vale o primeiro (o melhor)
+        return sorted(
+            ((similarity * weight, ids)
+             for token, similarity in self._similar_tokens(term).items()
+             for weight, ids in self._postings[token].items()
+             if similarity * weight >= MIN_SCORE),
+            key=lambda group: group[0], reverse=True,
+        )
+
+    def _full_matches(self, terms, limit, accept):
+        # Produtos que casam com todos os termos, na ordem da soma das pontuações.
+        # Enumera as combinações de grupos (um por termo) da maior soma para a
+        # menor, com um heap; cada combinação é uma interseção de sets (em C).
+        start = (0,) * len(terms)
+        heap = [(-sum(groups[0][0] for groups in terms), start)]
+        visited = {start}
+        found = {}
+        for _ in range(MAX_COMBINATIONS):
+            if not heap or len(found) >= limit:
+                break
+            negative, combo = heapq.heappop(heap)
+            # Do menor grupo para o maior: o custo é o tamanho do menor
+            groups = sorted((terms[i][j][1] for i, j in enumerate(combo)), key=len)
+            ids = groups[0].keys()
+            for group in groups[1:]:
+                ids = ids & group.keys()
+            for pid in sorted(ids):
+                if pid not in found and accept(pid):
+                    found[pid] = -negative
+            for i in range(len(terms)):
+                if combo[i] + 1 < len(terms[i]):
+                    successor = combo[:i] + (combo[i] + 1,) + combo[i + 1:]
+                    if successor not in visited:
+                        visited.add(successor)
+                        total = sum(terms[k][j][0] for k, j in enumerate(successor))
+                        heapq.heappush(heap, (-total, successor))
+        return found
+
+    def search(self, query, limit=20, available=None):
+        terms = [groups for groups in map(self._term_groups, dict.fromkeys(tokenize(query))) if groups]
+        if not terms:
+            return []
+
+        unavailable = self.unavailable
+        if available is None:
+            accept = lambda pid: True
+        else:
+            accept = lambda pid: (pid not in unavailable) == available
+
+        found = self._full_matches(terms, limit, accept) if len(terms) > 1 else {}
+        if len(found) < limit:
+            # Completa com quem casa com parte dos termos, grupo a grupo (maior
+            # pontuação primeiro, ordem do cardápio dentro do grupo). Só percorre
+            # o necessário para preencher o limite.
+            partial = {}
+            for score, ids in heapq.merge(*terms, key=lambda group: -group[0]):
+                for pid in ids:
+                    if pid not in found and pid not in partial and accept(pid):
+                        partial[pid] = sum(next((s for s, g in groups if pid in g), 0.0) for groups in terms)
+                        if len(found) + len(partial) >= limit:
+                            break
+                if len(found) + len(partial) >= limit:
+                    break
+            found.update(sorted(partial.items(), key=lambda item: -item[1]))
+
+        # Empate: disponíveis primeiro (sort estável mantém o resto da ordem)
+        ranked = sorted(found.items(), key=lambda item: (-item[1], item[0] in unavailable))
+        return [(self.docs[pid], score) for pid, score in ranked[:limit]]
+
+    def get_stats(self):
+        return {"version": self.version, "products": len(self.docs), "tokens": len(self._postings),
+                "trigrams": len(self._trigrams)}
+
+
+index = SearchIndex()
+_rebuild_lock = asyncio.Lock()
+
+
+async def ensure_current(db):
+    # Reconstrói quando o índice está atrás da versão do menu (uma query). Uma
+    # reconstrução por vez: quem chega durante ela espera e reaproveita o
+    # resultado. Tokens e postings são montados no threadpool, fora do event loop;
+    # o índice novo substitui o antigo de uma vez, buscas em andamento não veem meio-termo
+    global index
+    if index.version == menu_cache.current_version():
+        return False
+    async with _rebuild_lock:
+        version = menu_cache.current_version()
+        if index.version == version:
+            return False
+        categories, docs = {}, []
+        for cat, prod in (await db.execute(menu_data.menu_query())).all():
+            categories[cat.id] = cat.name
+            if prod is not None:
+                docs.append(menu_data.product_to_dict(prod))
+        index = await run_in_threadpool(SearchIndex.build, categories, docs, version)
+    return True
+
+
+# Atualização incremental: produtos alterados pelo ORM são guardados no flush e
+# aplicados depois do commit (o menu_cache, assinante anterior, já avançou a versão)
+def _collect_product_changes(session):
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, Product):
+            session.info.setdefault("search_changes", {})[obj.id] = menu_data.product_to_dict(obj)
+        elif isinstance(obj, Category):
+            session.info["search_stale"] = True
+    for obj in session.deleted:
+        if isinstance(obj, Product):
+            session.info.setdefault("search_changes", {})[obj.id] = None
+        elif isinstance(obj, Category):
+            session.info["search_stale"] = True
+
+
+def _track_bulk_writes(session, table):
+    session.info["search_stale"] = True
+
+
+def _apply_product_changes(session, shared_version):
+    changes = session.info.pop("search_changes", None)
+    stale = session.info.pop("search_stale", False)
+    if not changes or stale:
+        return
+    # Só é incremental se o índice estava em dia antes deste commit
+    version = menu_cache.current_version()
+    if index.version != version - 1:
+        return
+    for product_id, doc in changes.items():
+        if doc is None:
+            index.remove(product_id)
+        else:
+            index.upsert(doc)
+    index.version = version
+
+
+def _discard_product_changes(session):
+    session.info.pop("search_changes", None)
+    session.info.pop("search_stale", None)
+
+
+def mark_stale():
+    # Mudança de outro processo: a próxima busca reconstrói o índice
+    index.version = None
+
+
+menu_cache.add_remote_listener(mark_stale)
+menu_version.subscribe("search", on_flush=_collect_product_changes, on_bulk_write=_track_bulk_writes,
+                       on_commit=_apply_product_changes, on_rollback=_discard_product_changes)
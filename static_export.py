@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import os
+import time
+
+import compression
+import menu_cache
+
+# Snapshot estático do cardápio para CDN / servidor de arquivos.
+# Grava em um diretório a mesma página servida em "/" (index.html, com .gz/.br
+# pré-comprimidos) e os assets versionados em assets/<nome>.<hash>.<ext>, no
+# mesmo caminho usado pelas URLs da página. Assim o tráfego anônimo não passa
+# pelo uvicorn nem pelo banco; o app fica só para admin, pedidos e SSE.
+#   python menu.py export [diretório]
+# Com STATIC_EXPORT_DIR definido, o app refaz o snapshot a cada mudança do menu.
+
+EXPORT_DIR_ENV = "STATIC_EXPORT_DIR"
+# Espera após uma escrita antes de exportar: várias mudanças seguidas viram um snapshot só
+DEBOUNCE = 1.0
+
+logger = logging.getLogger(__name__)
+
+# Formato _headers (Netlify / Cloudflare Pages); outros CDNs usam regras equivalentes
+HEADERS_FILE = """/assets/*
+  Cache-Control: public, max-age=31536000, immutable
+/
+  Cache-Control: no-cache
+/index.html
+  Cache-Control: no-cache
+"""
+
+
+def _write_atomic(path, data: bytes):
+    # Quem está servindo o diretório nunca vê um arquivo pela metade
+    tmp = f"{path}.{os.getpid()}.tmp"  # vários workers podem exportar ao mesmo tempo
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _write_encoded(path, data: bytes):
+    # Variantes .gz/.br ao lado do original (gzip_static / brotli_static, CDNs)
+    for encoding, suffix in (("gzip", ".gz"), ("br", ".br")):
+        if encoding in compression.supported_encodings():
+            _write_atomic(path + suffix, compression.compress(data, encoding, static=True))
+
+
+def copy_assets(manifest, out_dir):
+    # Nome com hash = conteúdo imutável: arquivo que já existe não é copiado de novo.
+    # Versões antigas ficam no diretório para páginas ainda em cache no CDN.
+    copied = 0
+    for name, rel in manifest.hashed.items():
+        dest = os.path.join(out_dir, "assets", *name.split("/"))
+        if os.path.exists(dest):
+            continue
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(os.path.join(manifest.root, rel), "rb") as f:
+            body = f.read()
+        ext = os.path.splitext(dest)[1].lower()
+        if ext in compression.COMPRESSIBLE_EXTENSIONS and len(body) >= compression.MIN_SIZE:
+            _write_encoded(dest, body)
+        # O original por último: se existe, as variantes comprimidas também existem
+        _write_atomic(dest, body)
+        copied += 1
+    return copied
+
+
+def write_snapshot(html: str, manifest, out_dir):
+    # Assets antes da página: o index.html novo nunca aponta para um arquivo que ainda não existe
+    os.makedirs(out_dir, exist_ok=True)
+    copied = copy_assets(manifest, out_dir)
+    _write_atomic(os.path.join(out_dir, "_headers"), HEADERS_FILE.encode("utf-8"))
+    body = html.lstrip().encode("utf-8")
+    index = os.path.join(out_dir, "index.html")
+    _write_encoded(index, body)
+    _write_atomic(index, body)
+    return {"bytes": len(body), "assets": len(manifest.hashed), "copied": copied}
+
+
+class SnapshotExporter:
+    # Hook pós-escrita: cada nova versão do menu (commit do admin, toggle,
+    # menu sync no mesmo processo) agenda um novo snapshot. Roda em uma task
+    # única, então exports nunca se sobrepõem.
+
+    def __init__(self, render_page, manifest, out_dir):
+        self.render_page = render_page  # async () -> str
+        self.manifest = manifest
+        self.out_dir = out_dir
+        self._loop = None
+        self._pending = None
+        self._task = None
+        self._stats = {"exports": 0, "errors": 0, "last_export": None, "last_duration_ms": None}
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._pending = asyncio.Event()
+        self._pending.set()  # snapshot inicial no boot
+        self._task = asyncio.create_task(self._run())
+        menu_cache.add_listener(self.schedule)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def schedule(self):
+        # Listener do menu_cache; pode vir de outra thread (sessão síncrona)
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._pending.set)
+
+    async def export(self):
+        start = time.perf_counter()
+        html = await self.render_page()
+        result = await asyncio.to_thread(write_snapshot, html, self.manifest, self.out_dir)
+        self._stats["exports"] += 1
+        self._stats["last_export"] = time.time()
+        self._stats["last_duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    async def _run(self):
+        while True:
+            await self._pending.wait()
+            await asyncio.sleep(DEBOUNCE)
+            self._pending.clear()
+            try:
+                result = await self.export()
+                logger.info(f"📦 Snapshot estático atualizado em {self.out_dir} ({result['bytes']} bytes, "
+                            f"{result['copied']} assets novos)")
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Erro ao exportar snapshot estático: {e}")
+
+    def get_stats(self):
+        return {"out_dir": self.out_dir, "pending": bool(self._pending and self._pending.is_set()), **self._stats}
@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Os engines (database.py) leem DATABASE_URL no import: o banco de teste é
+# definido aqui, antes de qualquer import do app
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="campeao-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.pop("STATIC_EXPORT_DIR", None)
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from database import engine  # noqa: E402
+from models import Category, Product  # noqa: E402
+import migrations  # noqa: E402
+
+
+@pytest.fixture
+def menu_db():
+    # Banco migrado com um cardápio pequeno; devolve a URL
+    with engine.begin() as conn:
+        migrations.upgrade(conn)
+        conn.execute(delete(Product.__table__))
+        conn.execute(delete(Category.__table__))
+        conn.execute(insert(Category.__table__), [{"id": 1, "name": "Bebidas", "display_order": 1}])
+        conn.execute(insert(Product.__table__), [
+            {"id": 30, "name": "Água Sem Gás 500 Ml", "price": 4.0, "category_id": 1, "is_available": True},
+            {"id": 31, "name": "Água Com Gás 500 Ml", "price": 4.5, "category_id": 1, "is_available": True},
+            {"id": 32, "name": "Suco de Acerola", "price": 8.0, "category_id": 1, "is_available": True},
+        ])
+    return os.environ["DATABASE_URL"]
@@ -0,0 +1,74 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from database import SessionLocal
+from models import Product
+import main
+import menu_cache
+
+
+@pytest.fixture
+def client(menu_db):
+    # O menu_db grava direto pelo Core, sem passar pela invalidação do cache
+    menu_cache.bump_version()
+    return TestClient(main.app)
+
+
+def products():
+    with SessionLocal() as db:
+        return {p.id: (p.is_available, p.price) for p in db.scalars(select(Product))}
+
+
+def test_changes_by_id_in_one_update(client):
+    version = menu_cache.current_version()
+    response = client.patch("/admin/products", json={"changes": [
+        {"id": 30, "is_available": False},
+        {"id": 31, "price": 5.0},
+        {"id": 32, "price": 8.0},  # já é 8.0
+        {"id": 99, "price": 1.0},
+    ]})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["matched"] == 3
+    assert data["unchanged"] == 1
+    assert data["not_found"] == [99]
+    assert [(c["id"], c["before"], c["after"]) for c in data["changed"]] == [
+        (30, {"is_available": True, "price": 4.0}, {"is_available": False, "price": 4.0}),
+        (31, {"is_available": True, "price": 4.5}, {"is_available": True, "price": 5.0}),
+    ]
+    assert products() == {30: (False, 4.0), 31: (True, 5.0), 32: (True, 8.0)}
+    assert menu_cache.current_version() == version + 1
+    assert "R$ 5.00" in client.get("/").text
+
+
+def test_filter_and_set_changes_every_match(client):
+    response = client.patch("/admin/products", json={"filter": {"category_id": 1}, "set": {"is_available": False}})
+
+    assert response.json()["matched"] == 3
+    assert products() == {30: (False, 4.0), 31: (False, 4.5), 32: (False, 8.0)}
+
+    # Repetir não muda nada nem invalida o cardápio de novo
+    version = menu_cache.current_version()
+    response = client.patch("/admin/products", json={"filter": {"category_id": 1}, "set": {"is_available": False}})
+    assert response.json()["changed"] == []
+    assert response.json()["unchanged"] == 3
+    assert menu_cache.current_version() == version
+
+
+@pytest.mark.parametrize("payload", [
+    {},
+    {"filter": {}, "set": {"is_available": False}},
+    {"filter": {"category_id": 1}},
+    {"filter": {"category_id": 1}, "set": {"price": 1.0}, "changes": [{"id": 30, "price": 1.0}]},
+])
+def test_invalid_payloads_change_nothing(client, payload):
+    before = products()
+
+    assert client.patch("/admin/products", json=payload).status_code == 400
+    assert products() == before
+
+
+def test_negative_price_is_rejected(client):
+    assert client.patch("/admin/products", json={"changes": [{"id": 30, "price": -1}]}).status_code == 422
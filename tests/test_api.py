@@ -0,0 +1,54 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import menu_cache
+
+
+@pytest.fixture
+def client(menu_db):
+    # O menu_db grava direto pelo Core, sem passar pela invalidação do cache
+    menu_cache.bump_version()
+    return TestClient(main.app)
+
+
+def test_menu_etag_and_304_until_the_menu_changes(client):
+    response = client.get("/api/menu")
+    etag = response.headers["etag"]
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert client.get("/api/menu", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/admin/toggle/30")
+    response = client.get("/api/menu", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_field_projection_and_available_filter(client):
+    client.post("/admin/toggle/30")
+
+    data = client.get("/api/menu?available=true&fields=name,price").json()
+    assert data == {"categories": [{"id": 1, "name": "Bebidas", "products": [
+        {"id": 31, "name": "Água Com Gás 500 Ml", "price": 4.5},
+        {"id": 32, "name": "Suco de Acerola", "price": 8.0},
+    ]}]}
+
+    data = client.get("/api/categories/1/products?available=false&fields=is_available").json()
+    assert data == {"id": 1, "name": "Bebidas", "products": [{"id": 30, "is_available": False}]}
+
+
+def test_each_filter_combination_has_its_own_etag(client):
+    full = client.get("/api/menu").headers["etag"]
+    projected = client.get("/api/menu?fields=id,name").headers["etag"]
+
+    assert full != projected
+    assert client.get("/api/menu?fields=name,id", headers={"If-None-Match": projected}).status_code == 304
+
+
+def test_invalid_field_and_unknown_category(client):
+    response = client.get("/api/menu?fields=name,cost")
+    assert response.status_code == 400
+    assert "cost" in response.json()["detail"]
+    assert client.get("/api/categories/99/products").status_code == 404
@@ -0,0 +1,65 @@
+import os
+import re
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import assets
+
+
+def static_client(root):
+    manifest = assets.AssetManifest(root=str(root)).scan()
+    app = FastAPI()
+    app.mount("/static", assets.AssetFiles(manifest, hashed=False), name="static")
+    app.mount("/assets", assets.AssetFiles(manifest), name="assets")
+    return TestClient(app), manifest
+
+
+def test_static_serves_images_added_after_startup(tmp_path):
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / "Picanha.png").write_bytes(b"antiga")
+    client, manifest = static_client(tmp_path)
+
+    # Foto nova da ingestão: ainda fora do manifesto, a página usa /static/images/...
+    (tmp_path / "images" / "loja 2").mkdir()
+    (tmp_path / "images" / "loja 2" / "Água Com Gás 500 Ml.png").write_bytes(b"nova")
+    assert "images/loja 2/Água Com Gás 500 Ml.png" not in manifest.urls
+
+    response = client.get("/static/images/loja 2/Água Com Gás 500 Ml.png")
+    assert response.status_code == 200
+    assert response.content == b"nova"
+    assert response.headers["cache-control"] == "no-cache"
+    assert client.get("/static/images/Picanha.png").content == b"antiga"
+    # As URLs versionadas continuam só para o que está no manifesto
+    assert client.get("/assets/images/loja 2/Água Com Gás 500 Ml.png").status_code == 404
+
+
+def test_static_fallback_stays_inside_asset_sources(tmp_path):
+    (tmp_path / "images").mkdir()
+    (tmp_path / "campeao.db").write_bytes(b"banco")
+    (tmp_path / "main.py").write_text("segredo")
+    client, _ = static_client(tmp_path)
+    (tmp_path / "images" / ".rascunho.png").write_bytes(b"oculto")
+    os.symlink(tmp_path / "campeao.db", tmp_path / "images" / "atalho.png")
+
+    for path in ("campeao.db", "main.py", "images/../campeao.db", "images/%2e%2e/campeao.db",
+                 "images/.rascunho.png", "images/atalho.png"):
+        assert client.get(f"/static/{path}").status_code == 404, path
+
+
+def test_page_loads_fonts_from_the_tree_and_nothing_from_cdns(menu_db):
+    import main
+
+    client = TestClient(main.app)
+    page = client.get("/").text
+    assert not re.search(r'<(script|link)\b[^>]*(src|href)="(https?:)?//', page)
+
+    fonts_url = main.ASSETS.url("static/css/fonts.css")
+    assert f'href="{fonts_url}"' in page
+    fonts = re.findall(r"url\(\.\./fonts/([^)]+)\)", client.get(fonts_url).text)
+    assert fonts
+    for font in fonts:
+        response = client.get(f"/assets/static/fonts/{font}")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == assets.IMMUTABLE
+
@@ -0,0 +1,15 @@
+import pytest
+
+from database import to_async_url
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///./campeao.db", "sqlite+aiosqlite:///./campeao.db"),
+    ("postgres://u:p@db:5432/app", "postgresql+asyncpg://u:p@db:5432/app"),
+    ("postgresql://u:p%40x@db/app", "postgresql+asyncpg://u:p%40x@db/app"),
+    ("postgresql+psycopg2://u@db/app", "postgresql+asyncpg://u@db/app"),
+    ("postgresql+psycopg://u@db/app", "postgresql+asyncpg://u@db/app"),
+    ("postgresql+asyncpg://u@db/app", "postgresql+asyncpg://u@db/app"),
+])
+def test_async_url_always_uses_an_async_driver(url, expected):
+    assert to_async_url(url) == expected
@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+
+import main
+import menu_cache
+
+
+def cached_page(client):
+    # A primeira requisição renderiza (streaming, sem ETag) e guarda no cache;
+    # a segunda sai do cache, com os validadores
+    menu_cache.bump_version()
+    client.get("/")
+    return client.get("/")
+
+
+def test_page_has_etag_and_no_last_modified(menu_db):
+    response = cached_page(TestClient(main.app))
+
+    assert response.status_code == 200
+    assert response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+    assert "last-modified" not in response.headers
+
+
+def test_if_none_match_returns_304_until_the_menu_changes(menu_db):
+    client = TestClient(main.app)
+    etag = cached_page(client).headers["etag"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"outro", {etag}'):
+        response = client.get("/", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+    client.post("/admin/toggle/31")
+    client.get("/")
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_if_modified_since_alone_is_not_a_validator(menu_db):
+    client = TestClient(main.app)
+    cached_page(client)
+
+    response = client.get("/", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert response.status_code == 200
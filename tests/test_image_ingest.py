@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+
+from sqlalchemy import select
+
+from database import SessionLocal
+from models import Product
+import image_ingest
+
+from conftest import ROOT
+
+
+def test_com_and_sem_are_different_products():
+    index = image_ingest.NameIndex([(30, "Água Sem Gás 500 Ml"), (31, "Água Com Gás 500 Ml")])
+
+    assert index.match("Água Com Gás 500 Ml") == ([31], 1.0)
+    assert index.match("agua sem gas 500ml") == ([30], 1.0)
+
+
+def test_name_shared_by_two_products_is_ambiguous():
+    index = image_ingest.NameIndex([(1, "Coca-Cola 350ml"), (2, "Coca Cola 350 ml")])
+
+    assert index.match("coca cola 350ml") == ([1, 2], 1.0)
+
+
+def test_ingest_links_each_water_to_its_own_photo(menu_db, tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    (images / "Água Com Gás 500 Ml.png").write_bytes(b"com gas")
+    (images / "Água Sem Gás 500 Ml.webp").write_bytes(b"sem gas")
+
+    with SessionLocal() as db:
+        report = image_ingest.ingest_images(db, root=str(images), manifest_path=str(tmp_path / "manifest.json"))
+        urls = dict(db.execute(select(Product.id, Product.image_url).where(Product.id.in_([30, 31]))).all())
+
+    assert urls == {
+        30: "/static/images/Água Sem Gás 500 Ml.webp",
+        31: "/static/images/Água Com Gás 500 Ml.png",
+    }
+    assert report.ambiguous == []
+
+
+def test_ingest_reports_ambiguous_names_without_linking(menu_db, tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    (images / "Suco de Acerola.jpg").write_bytes(b"suco")
+    with SessionLocal() as db:
+        with db.begin():
+            db.add(Product(id=33, name="Suco de  acerola", price=8.0, category_id=1))
+
+        report = image_ingest.ingest_images(db, root=str(images), manifest_path=str(tmp_path / "manifest.json"))
+        urls = db.execute(select(Product.image_url).where(Product.id.in_([32, 33]))).scalars().all()
+
+    assert report.ambiguous == [("Suco de Acerola.jpg", ["Suco de Acerola", "Suco de  acerola"])]
+    assert urls == [None, None]
+
+
+def test_cli_does_not_load_the_web_app():
+    # link_images roda como script: nada de busca, cache do menu ou Starlette
+    code = "import sys, link_images; print([m for m in ('search', 'menu_cache', 'starlette') if m in sys.modules])"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=dict(os.environ),
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,40 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from database import engine
+from models import Order
+import main
+
+
+@pytest.fixture
+def order_id(menu_db):
+    with engine.begin() as conn:
+        return conn.execute(insert(Order.__table__).values(
+            public_id=uuid.uuid4().hex, customer_name="Teste", customer_phone="0000",
+            total_amount=4.0, status="Pendente", created_at=datetime.utcnow(),
+        )).inserted_primary_key[0]
+
+
+def test_second_screen_gets_409_instead_of_skipping_a_step(order_id):
+    client = TestClient(main.app)
+    url = f"/kitchen/orders/{order_id}/status"
+
+    assert client.post(url, json={"status": "Preparando"}).json() == {"id": order_id, "status": "Preparando"}
+    # Outra tela clicou no mesmo botão com a lista desatualizada
+    response = client.post(url, json={"status": "Preparando"})
+    assert response.status_code == 409
+    assert "Preparando" in response.json()["detail"]
+    # Pular direto para "Entregue" também não passa
+    assert client.post(url, json={"status": "Entregue"}).status_code == 409
+    assert client.post(url, json={"status": "Pronto"}).status_code == 200
+
+
+def test_unknown_order_and_invalid_status(order_id):
+    client = TestClient(main.app)
+
+    assert client.post("/kitchen/orders/999999/status", json={"status": "Preparando"}).status_code == 404
+    assert client.post(f"/kitchen/orders/{order_id}/status", json={"status": "Pendente"}).status_code == 400
@@ -0,0 +1,95 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from database import SessionLocal
+from models import Product
+import main
+import menu_cache
+
+
+@pytest.fixture
+def client(menu_db):
+    # O menu_db grava direto pelo Core, sem passar pela invalidação do cache
+    menu_cache.bump_version()
+    return TestClient(main.app)
+
+
+def test_page_is_rendered_once_per_menu_version(client):
+    before = menu_cache.get_stats()
+    first = client.get("/")
+    second = client.get("/")
+    stats = menu_cache.get_stats()
+
+    assert first.status_code == second.status_code == 200
+    assert first.text == second.text
+    assert stats["misses"] == before["misses"] + 1
+    assert stats["hits"] == before["hits"] + 1
+    assert stats["version"] == before["version"]
+
+
+def test_orm_commit_invalidates_the_page(client):
+    client.get("/")
+    with SessionLocal() as db:
+        db.get(Product, 32).name = "Suco de Caju"
+        db.commit()
+
+    page = client.get("/").text
+    assert "Suco de Caju" in page
+    assert "Suco de Acerola" not in page
+
+
+def test_bulk_update_invalidates_the_page(client):
+    client.get("/")
+    with SessionLocal() as db:
+        db.execute(update(Product).where(Product.id == 32).values(name="Suco de Uva"))
+        db.commit()
+
+    assert "Suco de Uva" in client.get("/").text
+
+
+def test_rollback_keeps_the_cached_page(client):
+    client.get("/")
+    version = menu_cache.current_version()
+    with SessionLocal() as db:
+        db.get(Product, 32).name = "Suco de Caju"
+        db.flush()
+        db.rollback()
+
+    hits = menu_cache.get_stats()["hits"]
+    assert "Suco de Acerola" in client.get("/").text
+    assert menu_cache.current_version() == version
+    assert menu_cache.get_stats()["hits"] == hits + 1
+
+
+def test_changing_one_product_rerenders_only_its_card(client):
+    client.get("/")  # aquece os fragmentos
+    cards, sections = menu_cache.cards.get_stats(), menu_cache.sections.get_stats()
+    with SessionLocal() as db:
+        db.get(Product, 31).price = 5.25
+        db.commit()
+
+    client.get("/")
+    assert menu_cache.cards.get_stats()["misses"] == cards["misses"] + 1
+    assert menu_cache.cards.get_stats()["hits"] == cards["hits"] + 2
+    assert menu_cache.sections.get_stats()["misses"] == sections["misses"] + 1
+
+
+def test_unchanged_menu_reuses_every_fragment(client):
+    client.get("/")
+    cards, sections = menu_cache.cards.get_stats(), menu_cache.sections.get_stats()
+    menu_cache.bump_version()  # página descartada, conteúdo igual
+
+    client.get("/")
+    assert menu_cache.cards.get_stats()["misses"] == cards["misses"]
+    assert menu_cache.sections.get_stats()["misses"] == sections["misses"]
+
+
+def test_removed_products_leave_the_fragment_cache(client):
+    client.get("/")
+    with SessionLocal() as db:
+        db.delete(db.get(Product, 32))
+        db.commit()
+
+    assert "Suco de Acerola" not in client.get("/").text
+    assert menu_cache.cards.get_stats()["entries"] == 2
@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import menu_cache
+import menu_data
+
+
+@pytest.fixture
+def client(menu_db):
+    # O menu_db grava direto pelo Core, sem passar pela invalidação do cache
+    menu_cache.bump_version()
+    return TestClient(main.app)
+
+
+def test_cold_page_is_streamed_and_cached(client):
+    response = client.get("/")
+
+    assert response.status_code == 200
+    assert "Suco de Acerola" in response.text
+    assert menu_cache.get_page(menu_cache.current_version()) is not None
+
+
+def test_database_error_before_the_first_byte_is_a_500(client, monkeypatch):
+    async def broken(db, available=None):
+        raise RuntimeError("senha=segredo")
+
+    monkeypatch.setattr(menu_data, "load_menu", broken)
+    response = client.get("/")
+
+    assert response.status_code == 500
+    assert "segredo" not in response.text
+    assert menu_cache.get_page(menu_cache.current_version()) is None
+
+
+def test_error_mid_stream_is_generic_and_not_cached(client, monkeypatch):
+    def broken(cat, is_active):
+        raise RuntimeError("senha=segredo")
+
+    monkeypatch.setattr(main, "render_tab_button", broken)
+    response = client.get("/")
+
+    # O 200 já tinha saído com o <head>; o corpo termina com o aviso
+    assert response.status_code == 200
+    assert response.text.endswith("<p>Erro ao carregar o site. Tente novamente em instantes.</p>")
+    assert "segredo" not in response.text
+    assert menu_cache.get_page(menu_cache.current_version()) is None
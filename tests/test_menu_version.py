@@ -0,0 +1,97 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from database import AsyncSessionLocal, SessionLocal, engine
+from models import Product
+import main
+import menu_cache
+import menu_version
+import search
+
+from conftest import ROOT
+
+
+def other_worker(code):
+    # Outro processo (outro worker do uvicorn) commitando pelo ORM no mesmo banco
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=dict(os.environ), check=True)
+
+
+def sync_with_counter():
+    # Como o VersionWatcher no startup: parte do valor atual do contador
+    with engine.connect() as conn:
+        menu_cache.seed_shared_version(menu_version.read(conn))
+
+
+def rebuild_search():
+    async def run():
+        async with AsyncSessionLocal() as db:
+            await search.ensure_current(db)
+    asyncio.run(run())
+
+
+def test_local_commit_is_not_remote(menu_db):
+    sync_with_counter()
+    before = menu_cache.get_stats()["remote_invalidations"]
+
+    with SessionLocal() as db:
+        db.get(Product, 30).price = 4.25
+        db.commit()
+
+    assert menu_cache.get_stats()["remote_invalidations"] == before
+
+
+def test_remote_change_between_polls_is_not_absorbed_by_local_commit(menu_db):
+    sync_with_counter()
+    rebuild_search()
+    resyncs = []
+    menu_cache.add_remote_listener(lambda: resyncs.append(True))
+    before = menu_cache.get_stats()["remote_invalidations"]
+
+    # A sessão local abre a transação; o outro worker commita no meio dela,
+    # antes de qualquer polling; depois a sessão local commita
+    with SessionLocal() as local:
+        product = local.get(Product, 30)
+        other_worker(
+            "from database import SessionLocal\n"
+            "from models import Product\n"
+            "with SessionLocal() as db:\n"
+            "    db.get(Product, 32).name = 'Suco de Caju'\n"
+            "    db.commit()\n"
+        )
+        product.price = 4.75
+        local.commit()
+
+    assert menu_cache.get_stats()["remote_invalidations"] == before + 1
+    assert resyncs == [True]
+    # O commit local não pode aplicar só a própria mudança no índice: o índice
+    # fica desatualizado e a próxima busca enxerga a mudança do outro worker
+    assert search.index.version is None
+    rebuild_search()
+    assert [doc["id"] for doc, _ in search.index.search("caju")] == [32]
+
+
+
+def test_worker_startup_is_not_a_remote_invalidation(menu_db):
+    # Outros workers já avançaram o contador antes deste processo subir
+    other_worker(
+        "from database import SessionLocal\n"
+        "from models import Product\n"
+        "for price in (4.6, 4.7):\n"
+        "    with SessionLocal() as db:\n"
+        "        db.get(Product, 31).price = price\n"
+        "        db.commit()\n"
+    )
+    before = menu_cache.get_stats()
+
+    async def boot():
+        await main.start_version_watcher()
+        await main.stop_version_watcher()
+    asyncio.run(boot())
+
+    stats = menu_cache.get_stats()
+    with engine.connect() as conn:
+        assert stats["shared_version"] == menu_version.read(conn)
+    assert stats["remote_invalidations"] == before["remote_invalidations"]
+    assert stats["version"] == before["version"]
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import shutil
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import migrations
+from conftest import ROOT
+
+
+def sqlite_engine(path):
+    return create_engine(f"sqlite:///{path}")
+
+
+def test_fresh_database_migrates_once(tmp_path):
+    engine = sqlite_engine(tmp_path / "novo.db")
+    with engine.connect() as conn:
+        assert migrations.current_version(conn) == 0
+
+    with engine.begin() as conn:
+        applied = migrations.upgrade(conn)
+    assert [number for number, _ in applied] == [number for number, _, _ in migrations.MIGRATIONS]
+
+    with engine.begin() as conn:
+        assert migrations.current_version(conn) == migrations.LATEST_VERSION
+        assert migrations.upgrade(conn) == []
+
+
+def test_shipped_database_keeps_its_data(tmp_path):
+    # O campeao.db do repositório é anterior às migrações
+    path = tmp_path / "campeao.db"
+    shutil.copy(os.path.join(ROOT, "campeao.db"), path)
+    engine = sqlite_engine(path)
+    with engine.connect() as conn:
+        products = conn.execute(text("SELECT id, name, price FROM products ORDER BY id")).all()
+
+    with engine.begin() as conn:
+        migrations.upgrade(conn)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT id, name, price FROM products ORDER BY id")).all() == products
+        assert "public_id" in {c["name"] for c in inspect(conn).get_columns("orders")}
+        assert inspect(conn).has_table("order_items")
+
+
+def test_broken_version_table_is_not_an_empty_database(tmp_path):
+    # Só a tabela inexistente vale 0; outro erro não pode disparar todas as migrações
+    engine = sqlite_engine(tmp_path / "quebrado.db")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE schema_version (name VARCHAR)"))
+
+    with engine.connect() as conn, pytest.raises(OperationalError):
+        migrations.current_version(conn)
+
+
+def test_cli_refuses_a_database_behind_the_code(tmp_path):
+    engine = sqlite_engine(tmp_path / "atrasado.db")
+    with pytest.raises(SystemExit, match="python migrations.py"):
+        migrations.require_current(engine)
+
+    with engine.begin() as conn:
+        migrations.upgrade(conn)
+    migrations.require_current(engine)
+
+
+def test_startup_only_upgrades_when_behind(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'startup.db'}")
+        try:
+            return await migrations.ensure_current(engine), await migrations.ensure_current(engine)
+        finally:
+            await engine.dispose()
+
+    first, second = asyncio.run(run())
+    assert len(first) == len(migrations.MIGRATIONS)
+    assert second == []
+
+
+def test_product_order_is_ranked_within_each_category(tmp_path):
+    # Mesma numeração do menu_sync: 1..n por categoria, na ordem dos ids
+    path = tmp_path / "campeao.db"
+    shutil.copy(os.path.join(ROOT, "campeao.db"), path)
+    engine = sqlite_engine(path)
+    with engine.begin() as conn:
+        migrations.upgrade(conn)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT category_id, display_order FROM products ORDER BY category_id, id")).all()
+    positions = {}
+    for category_id, display_order in rows:
+        positions[category_id] = positions.get(category_id, 0) + 1
+        assert display_order == positions[category_id]
+    assert len(positions) > 1
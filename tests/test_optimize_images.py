@@ -0,0 +1,34 @@
+import os
+
+from PIL import Image
+
+import image_variants
+import optimize_images
+
+
+def save_image(path, color, size=(400, 300)):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, color).save(path)
+
+
+def test_store_subfolders_get_variants(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    save_image(tmp_path / "images" / "Picanha.png", "red")
+    save_image(tmp_path / "images" / "loja 2" / "Picanha.png", "blue")
+    save_image(tmp_path / "images" / ".rascunho" / "Fraldinha.png", "green")
+
+    optimize_images.optimize_images()
+    manifest = image_variants.load_manifest()
+
+    assert sorted(manifest["images"]) == ["/static/images/Picanha.png", "/static/images/loja 2/Picanha.png"]
+    top, store = (manifest["images"][url] for url in sorted(manifest["images"]))
+    assert store["source"] == "images/loja 2/Picanha.png"
+    assert os.path.basename(store["fallback"]).startswith("loja-2-picanha-")
+    assert set(optimize_images.variant_files(top)).isdisjoint(optimize_images.variant_files(store))
+    for name in optimize_images.variant_files(store):
+        assert os.path.exists(os.path.join(image_variants.VARIANTS_DIR, name))
+
+    # Segunda execução: nada mudou, nada é regerado
+    capsys.readouterr()
+    optimize_images.optimize_images()
+    assert "0 imagens processadas, 2 sem alterações" in capsys.readouterr().out
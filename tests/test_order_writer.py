@@ -0,0 +1,75 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from database import AsyncSessionLocal
+from models import Order
+import order_writer
+
+
+def new_order(public_id=None):
+    order = {
+        "public_id": public_id or uuid.uuid4().hex,
+        "customer_name": "Teste",
+        "customer_phone": "0000",
+        "total_amount": 4.0,
+        "status": "Pendente",
+        "created_at": datetime.utcnow(),
+    }
+    return order, [{"product_id": 30, "quantity": 1, "unit_price": 4.0, "notes": None}]
+
+
+async def saved_public_ids(public_ids):
+    async with AsyncSessionLocal() as db:
+        return set((await db.execute(select(Order.public_id).where(Order.public_id.in_(public_ids)))).scalars())
+
+
+def test_bad_order_does_not_block_the_batch(menu_db):
+    async def run():
+        writer = order_writer.OrderWriter()
+        writer.start()
+        good = [new_order() for _ in range(3)]
+        duplicate = new_order(good[0][0]["public_id"])  # UNIQUE(public_id): IntegrityError
+        for order, items in (*good, duplicate):
+            writer.submit(order, items)  # tudo no mesmo lote: o writer só roda no próximo await
+        await asyncio.wait_for(writer.stop(), timeout=5)
+        return writer, await saved_public_ids([order["public_id"] for order, _ in good])
+
+    writer, saved = asyncio.run(run())
+
+    assert len(saved) == 3
+    assert writer.written == 3
+    assert writer.rejected == 1
+    assert writer.batches == 3  # o lote recusado foi regravado um a um
+    assert writer.get_stats()["pending"] == 0
+
+
+def test_transient_errors_are_retried(menu_db, monkeypatch):
+    monkeypatch.setattr(order_writer, "RETRY_DELAYS", (0, 0))
+
+    async def run():
+        writer = order_writer.OrderWriter()
+        write = writer._write
+        failures = iter([OperationalError("INSERT", {}, Exception("database is locked"))])
+
+        async def flaky(batch):
+            error = next(failures, None)
+            if error is not None:
+                raise error
+            return await write(batch)
+
+        writer._write = flaky
+        writer.start()
+        order, items = new_order()
+        writer.submit(order, items)
+        await asyncio.wait_for(writer.stop(), timeout=5)
+        return writer, await saved_public_ids([order["public_id"]])
+
+    writer, saved = asyncio.run(run())
+
+    assert len(saved) == 1
+    assert writer.failed_attempts == 1
+    assert writer.rejected == 0
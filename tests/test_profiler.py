@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import profiler
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(profiler, "ENABLED", True)
+    monkeypatch.setattr(profiler, "TOKEN", "segredo")
+    app = FastAPI()
+    app.include_router(profiler.router)
+    return TestClient(app)
+
+
+def test_disabled_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(profiler, "TOKEN", "")
+    response = client.post("/admin/profile/sample?seconds=0.1", headers={"X-Profiler-Token": ""})
+    assert response.status_code == 404
+
+
+def test_requires_the_admin_token(client):
+    assert client.post("/admin/profile/sample?seconds=0.1").status_code == 403
+    assert client.post("/admin/profile/sample?seconds=0.1", headers={"X-Profiler-Token": "errado"}).status_code == 403
+    assert not profiler._busy.locked()
+
+    response = client.post("/admin/profile/sample?seconds=0.1", headers={"X-Profiler-Token": "segredo"})
+    assert response.status_code == 200
+    assert int(response.headers["x-profile-samples"]) > 0
+
+
+def test_one_session_at_a_time(client):
+    profiler._busy.acquire()
+    try:
+        response = client.post("/admin/profile/requests?count=1", headers={"X-Profiler-Token": "segredo"})
+        assert response.status_code == 409
+    finally:
+        profiler._busy.release()
+
+
+def test_cancelled_sample_keeps_the_lock_until_the_thread_ends(monkeypatch):
+    monkeypatch.setattr(profiler, "ENABLED", True)
+    monkeypatch.setattr(profiler, "TOKEN", "segredo")
+
+    async def run():
+        # Cliente desconectou no meio: a thread de amostragem ainda está rodando
+        request = asyncio.ensure_future(profiler.profile_sample(seconds=0.3, x_profiler_token="segredo"))
+        await asyncio.sleep(0.05)
+        request.cancel()
+        await asyncio.sleep(0)
+        held = profiler._busy.locked()
+        await asyncio.sleep(0.5)
+        return held, profiler._busy.locked()
+
+    assert asyncio.run(run()) == (True, False)
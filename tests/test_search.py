@@ -0,0 +1,92 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from database import SessionLocal
+from models import Product
+import main
+import menu_cache
+import search
+
+CATEGORIES = {1: "Bebidas", 2: "Espetinho"}
+
+
+def product(id, name, category_id, description=None, sub_category=None, is_available=True):
+    return {"id": id, "name": name, "description": description, "price": 10.0, "category_id": category_id,
+            "image_url": None, "is_available": is_available, "sub_category": sub_category}
+
+
+@pytest.fixture
+def index():
+    return search.SearchIndex.build(CATEGORIES, [
+        product(1, "Heineken 600 Ml", 1, sub_category="Cervejas"),
+        product(2, "Suco de Acerola", 1, sub_category="Sucos"),
+        product(3, "Suco de Uva", 1, description="Uva com um toque de acerola", sub_category="Sucos"),
+        product(4, "Espetinho de Coração", 2),
+        product(5, "Espetinho de Picanha", 2),
+        product(6, "Picanha na Chapa", 2, is_available=False),
+        product(7, "Picanha Especial", 2),
+        product(8, "Água 500 Ml", 1),
+    ], version=1)
+
+
+def ids(results):
+    return [doc["id"] for doc, _ in results]
+
+
+def test_typos_accents_and_prefixes(index):
+    assert ids(index.search("heiniken")) == [1]
+    assert ids(index.search("coracao")) == [4]
+    assert ids(index.search("CORAÇÃO!")) == [4]
+    assert ids(index.search("acer"))[0] == 2
+
+
+def test_name_beats_description(index):
+    results = index.search("acerola")
+
+    assert ids(results) == [2, 3]
+    assert results[0][1] > results[1][1]
+
+
+def test_matching_every_term_beats_matching_one(index):
+    # "espetinho" está no nome de 4 e 5; "picanha" no de 5, 6 e 7
+    assert ids(index.search("espetinho picanha"))[0] == 5
+    assert ids(index.search("suco uva")) == [3, 2]
+
+
+def test_ties_put_available_products_first(index):
+    # 6 e 7 empatam em "picanha"; o indisponível vai depois do disponível
+    ranked = ids(index.search("picanha"))
+    assert ranked.index(7) < ranked.index(6)
+    assert 6 not in ids(index.search("picanha", available=True))
+    assert ids(index.search("picanha", available=False)) == [6]
+
+
+def test_numbers_match_exactly_or_by_prefix(index):
+    assert ids(index.search("600")) == [1]
+    assert ids(index.search("60")) == [1]
+    assert ids(index.search("601")) == []
+
+
+def test_incremental_update_ranks_like_a_rebuild(index):
+    index.upsert(product(2, "Suco de Maracujá", 1, sub_category="Sucos"))
+    index.remove(3)
+    rebuilt = search.SearchIndex.build(CATEGORIES, list(index.docs.values()), version=2)
+
+    assert ids(index.search("acerola")) == []
+    assert ids(index.search("maracuja")) == [2]
+    for query in ("suco", "sucos", "picanha", "espetinho picanha", "bebidas 500"):
+        assert index.search(query) == rebuilt.search(query), query
+
+
+def test_api_follows_orm_commits(menu_db):
+    menu_cache.bump_version()  # o menu_db grava direto pelo Core
+    client = TestClient(main.app)
+    assert sorted(r["id"] for r in client.get("/api/search?q=agua gas").json()["results"]) == [30, 31]
+
+    with SessionLocal() as db:
+        db.get(Product, 32).name = "Suco de Caju"
+        db.commit()
+
+    data = client.get("/api/search?q=caju&fields=id,name").json()
+    assert data["results"] == [{"id": 32, "name": "Suco de Caju", "score": 1.0}]
+    assert client.get("/api/search?q=acerola").json()["results"] == []
@@ -0,0 +1,21 @@
+import re
+import unicodedata
+
+# Normalização de texto para casar nomes digitados com o cardápio, compartilhada
+# pela busca (search.py) e pela ingestão de imagens (image_ingest.py). Só a stdlib:
+# ferramentas de linha de comando importam daqui sem carregar o app.
+
+_non_word = re.compile(r"[^0-9a-z]+")
+
+
+def fold(text):
+    # "Coração Gelado!" -> "coracao gelado"
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return _non_word.sub(" ", "".join(c for c in decomposed if not unicodedata.combining(c))).strip()
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}